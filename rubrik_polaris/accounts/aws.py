@@ -18,12 +18,15 @@
 #  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 
+from time import time
 from rubrik_polaris.exceptions import PolarisException
 
 """
 Collection of functions that manipulate AWS account components.
 """
 
+DEFAULT_ACCOUNT_MAP_TTL = 300
+
 
 def add_account_aws(self, aws_regions=[], all=False, aws_profiles=[], aws_access_key_id=None, aws_secret_access_key=None, cloud_account_features=None):
     """Add AWS account to Polaris
@@ -48,13 +51,16 @@ def add_account_aws(self, aws_regions=[], all=False, aws_profiles=[], aws_access
         >>> rubrik.add_account_aws(aws_regions = ["us-west-2"], all = True , cloud_account_features = ["CLOUD_NATIVE_PROTECTION"])
 
     """
-    if aws_access_key_id and aws_secret_access_key:
-        self._add_account_aws(aws_regions=aws_regions, aws_id=aws_access_key_id, aws_secret=aws_secret_access_key, cloud_account_features=cloud_account_features)
-    elif all or aws_profiles:
-        for profile in self._get_aws_profiles():
-            if profile in aws_profiles or (all and profile != 'default'):
-                self._add_account_aws(profile=profile, aws_regions=aws_regions, cloud_account_features=cloud_account_features)
-                #TODO: Should add above into a queque for threaded provisioning
+    try:
+        if aws_access_key_id and aws_secret_access_key:
+            self._add_account_aws(aws_regions=aws_regions, aws_id=aws_access_key_id, aws_secret=aws_secret_access_key, cloud_account_features=cloud_account_features)
+        elif all or aws_profiles:
+            for profile in self._get_aws_profiles():
+                if profile in aws_profiles or (all and profile != 'default'):
+                    self._add_account_aws(profile=profile, aws_regions=aws_regions, cloud_account_features=cloud_account_features)
+                    #TODO: Should add above into a queque for threaded provisioning
+    finally:
+        self._invalidate_account_map_aws()
 
 
 def _add_account_aws(self, aws_regions=[], cloud_account_features=None, profile='', aws_id=None, aws_secret=None):
@@ -96,7 +102,7 @@ def _add_account_aws(self, aws_regions=[], cloud_account_features=None, profile=
 def _add_account_aws_commit(self, aws_regions=None, cloud_account_features=None, account_name_list=None, aws_account_id=None, account_initiate_result=None):
     cloud_account_action = 'CREATE'
     query_name = "accounts_aws_add_commit"
-    self._validate(
+    context = self._validate(
         cloud_account_action=cloud_account_action,
         query_name=query_name,
         cloud_account_features=cloud_account_features,
@@ -109,10 +115,10 @@ def _add_account_aws_commit(self, aws_regions=None, cloud_account_features=None,
         "external_id": account_initiate_result['externalId'],
         "feature_versions": account_initiate_result['featureVersions'],
         "stack_name": account_initiate_result['stackName'],
-        "cloud_account_action": self.cloud_account_action,
-        "cloud_account_features": self.cloud_account_features
+        "cloud_account_action": context.cloud_account_action,
+        "cloud_account_features": context.cloud_account_features
     }
-    result = self._query(self.query_name, variables)
+    result = self._query(context.query_name, variables)
     if 'errorMessage' in result and result['errorMessage']:
         raise Exception("Account {} already added: {}".format(aws_account_id, result['errorMessage']))
     return result
@@ -121,7 +127,7 @@ def _add_account_aws_commit(self, aws_regions=None, cloud_account_features=None,
 def _add_account_aws_initiate(self, cloud_account_features=None, account_name_list=None, aws_account_id=None ):
     cloud_account_action = 'CREATE'
     query_name = "accounts_aws_add_initiate"
-    self._validate(
+    context = self._validate(
         cloud_account_action=cloud_account_action,
         query_name=query_name,
         cloud_account_features=cloud_account_features
@@ -129,10 +135,10 @@ def _add_account_aws_initiate(self, cloud_account_features=None, account_name_li
     variables = {
         "aws_account_id": aws_account_id,
         "account_name": " : ".join(account_name_list),
-        "cloud_account_action": self.cloud_account_action,
-        "cloud_account_features": self.cloud_account_features
+        "cloud_account_action": context.cloud_account_action,
+        "cloud_account_features": context.cloud_account_features
     }
-    result = self._query(self.query_name, variables)
+    result = self._query(context.query_name, variables)
     if 'errorMessage' in result and result['errorMessage']:
         raise Exception("Account {} already added: {}".format(aws_account_id, result['errorMessage']))
     return result
@@ -330,7 +336,7 @@ def _destroy_aws_stack(self, stack_region, stack_name, profile='', aws_id=None,
 
     client = boto3.client('cloudformation', region_name=stack_region)
     try:
-        self.delete_stack = client.delete_stack(StackName=stack_name)
+        client.delete_stack(StackName=stack_name)
     except Exception as e:
         print('Stack deletion failed with error:\n  {}'.format(str(e)))
 
@@ -364,12 +370,15 @@ def delete_account_aws(self, profiles=[], all=False, aws_access_key_id=None, aws
         >>> rubrik.delete_account_aws(aws_access_key_id='blah', aws_secret_access_key='blah')
         >>> rubrik.delete_account_aws(all = True )
     """
-    if aws_access_key_id and aws_secret_access_key:
-        self._delete_account_aws(aws_id=aws_access_key_id, aws_secret=aws_secret_access_key)
-    elif all or profiles:
-        for profile in self._get_aws_profiles():
-            if profile in profiles or (all and profile != 'default'):
-                self._delete_account_aws(profile = profile)
+    try:
+        if aws_access_key_id and aws_secret_access_key:
+            self._delete_account_aws(aws_id=aws_access_key_id, aws_secret=aws_secret_access_key)
+        elif all or profiles:
+            for profile in self._get_aws_profiles():
+                if profile in profiles or (all and profile != 'default'):
+                    self._delete_account_aws(profile = profile)
+    finally:
+        self._invalidate_account_map_aws()
 
 
 def _delete_account_aws(self, profile='', aws_id=None, aws_secret=None):
@@ -411,12 +420,15 @@ def _delete_account_aws(self, profile='', aws_id=None, aws_secret=None):
 def update_account_aws(self, regions=[], all=False, profiles=[], aws_access_key_id=None, aws_secret_access_key=None):
     """Updates AWS account if configured in Polaris (Under Development)
     """
-    if aws_access_key_id and aws_secret_access_key:
-        self._update_account_aws(aws_id=aws_access_key_id, aws_secret=aws_secret_access_key)
-    elif all or profiles:
-        for profile in self._get_aws_profiles():
-            if profile in profiles or (all and profile != 'default'):
-                self._update_account_aws(profile=profile)
+    try:
+        if aws_access_key_id and aws_secret_access_key:
+            self._update_account_aws(aws_id=aws_access_key_id, aws_secret=aws_secret_access_key)
+        elif all or profiles:
+            for profile in self._get_aws_profiles():
+                if profile in profiles or (all and profile != 'default'):
+                    self._update_account_aws(profile=profile)
+    finally:
+        self._invalidate_account_map_aws()
 
 
 def _update_account_aws_initiate(self, _feature, _polaris_account_id):
@@ -453,16 +465,55 @@ def _update_account_aws(self, profile=None, aws_id=None, aws_secret=None,  _aws_
 
 
 def _get_account_map_aws(self):
-    account_detail = self.get_accounts_aws_detail("")['awsCloudAccounts']
-    o = {}
-    for i in account_detail:
-        o[i['awsCloudAccount']['nativeId']] = {}
-        o[i['awsCloudAccount']['nativeId']]['id'] = i['awsCloudAccount']['id']
-        o[i['awsCloudAccount']['nativeId']]['account_name'] = i['awsCloudAccount']['accountName']
-        for f in i['featureDetails']:
-            if f['feature'] == 'CLOUD_NATIVE_PROTECTION':
-                o[i['awsCloudAccount']['nativeId']]['status'] = f['status']
-                o[i['awsCloudAccount']['nativeId']]['regions'] = {}
-                for r in f['awsRegions']:
-                    o[i['awsCloudAccount']['nativeId']]['regions'][r] = {}
-    return o
+    """ Return the AWS accounts of Polaris by account number, with their
+    Polaris id, name, and the status and regions of their cloud native
+    protection. The map is shared, it must not be modified.
+    """
+    return self._get_aws_accounts().accounts
+
+
+def _get_aws_accounts(self):
+    """ Return the AwsAccountMap of the client, listing the AWS accounts of
+    Polaris once every `account_map_ttl` seconds.
+    """
+    with self._aws_accounts_lock:
+        ttl = self._kwargs.get('account_map_ttl', DEFAULT_ACCOUNT_MAP_TTL)
+        if self._aws_accounts is None or time() - self._aws_accounts.built_at >= ttl:
+            self._aws_accounts = AwsAccountMap(self.get_accounts_aws_detail("")['awsCloudAccounts'])
+        return self._aws_accounts
+
+
+def _invalidate_account_map_aws(self):
+    """ Drop the AWS account map, the next lookup lists the accounts again. """
+    with self._aws_accounts_lock:
+        self._aws_accounts = None
+
+
+class AwsAccountMap:
+    """AWS accounts of Polaris, indexed by account number (the native id of
+    the account), by Polaris id and by the status of their cloud native
+    protection.
+
+    Args:
+        account_detail (list): `awsCloudAccounts` entries returned by `get_accounts_aws_detail`
+    """
+
+    def __init__(self, account_detail):
+        self.built_at = time()
+        self.accounts = {}
+        self.by_id = {}
+        self.by_status = {}
+        for i in account_detail:
+            account_number = i['awsCloudAccount']['nativeId']
+            account = {
+                'id': i['awsCloudAccount']['id'],
+                'account_name': i['awsCloudAccount']['accountName']
+            }
+            for f in i['featureDetails']:
+                if f['feature'] == 'CLOUD_NATIVE_PROTECTION':
+                    account['status'] = f['status']
+                    account['regions'] = {r: {} for r in f['awsRegions']}
+            self.accounts[account_number] = account
+            self.by_id[account['id']] = account_number
+            if 'status' in account:
+                self.by_status.setdefault(account['status'].lower(), []).append(account_number)
@@ -94,7 +94,7 @@ def set_account_azure_default_sa(
     """
     try:
         _query_name = "accounts_azure_default_sa_set"
-        self._validate(
+        context = self._validate(
             mutation_name=_query_name,
             azure_cloud_type=azure_cloud_type
         )
@@ -104,10 +104,10 @@ def set_account_azure_default_sa(
             "azure_app_tenant_id": azure_app_tenant_id,
             "azure_app_name": azure_app_name,
             "azure_tenant_domain_name": azure_tenant_domain_name,
-            "azure_cloud_type": self.azure_cloud_type,
+            "azure_cloud_type": context.azure_cloud_type,
             "should_replace": should_replace
         }
-        _request = self._query(self.mutation_name, _variables)
+        _request = self._query(context.mutation_name, _variables)
         return _request
     except Exception as e:
         raise PolarisException("Problem setting Azure App default SA: {}".format(e))
@@ -157,7 +157,7 @@ def add_account_azure(
     """
     try:
         _query_name = "accounts_azure_add"
-        self._validate(
+        context = self._validate(
             mutation_name=_query_name,
             azure_cloud_type=azure_cloud_type,
             cloud_account_features=cloud_account_features,
@@ -173,11 +173,11 @@ def add_account_azure(
 
         _variables = {
             "azure_tenant_domain_name": azure_tenant_domain_name,
-            "azure_cloud_type": self.azure_cloud_type,
+            "azure_cloud_type": context.azure_cloud_type,
             "feature": _feature,
             "subscription_name": azure_subscription_name,
             "subscription_id": azure_subscription_id,
-            "azure_regions": self.azure_regions,
+            "azure_regions": context.azure_regions,
         }
         _request = self._query(_query_name, _variables)
         return _request
@@ -210,7 +210,7 @@ def delete_account_azure(
         RequestException: If the query to Polaris returned an error
     Examples:
     """
-    self._validate(
+    context = self._validate(
         cloud_account_features=cloud_account_features,
     )
 
@@ -219,7 +219,7 @@ def delete_account_azure(
         # Get ID to delete subscription
         polaris_subscription_id, polaris_subscription_name = \
             self._get_native_subscription_id_and_name(azure_subscription_id=azure_subscription_id, \
-                                                      cloud_account_features=self.cloud_account_features)
+                                                      cloud_account_features=context.cloud_account_features)
 
         # Get ID to disable subscription
         suspect_subscriptions = self.get_accounts_azure_native(filter=polaris_subscription_name)
@@ -247,7 +247,7 @@ def delete_account_azure(
     try:
         _query_name = "accounts_azure_delete_subscription"
         _variables = {
-            "cloud_account_features": [self.cloud_account_features],
+            "cloud_account_features": [context.cloud_account_features],
             "azure_subscription_ids": [polaris_subscription_id]
         }
         _request = self._query(_query_name, _variables)
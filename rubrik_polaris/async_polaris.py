@@ -0,0 +1,328 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+import os
+import re
+import json
+import asyncio
+import logging
+from .exceptions import RequestException, AuthenticationException, ProxyException
+from .logger import logging_setup
+from .rubrik_polaris import PolarisClient
+from .common.connection import ERROR_MESSAGES, DEFAULT_POOL_SIZE, _build_request_body, _raise_for_errors
+
+"""Instantiates an asyncio Polaris connection context. Requires the optional `aiohttp` dependency.
+Args:
+    domain (str): Polaris domain identifier.
+    username (str): Polaris username
+    password (str): Polaris password
+    root_domain (str): Polaris root domain only if not *.my.rubrik.com
+    insecure (bool): Allow unverified SSL keys
+    json_keyfile (str): Service account credential file (used exclusive of first 4 options.
+    pool_size (int): Maximum number of simultaneous connections to Polaris (default 10)
+Returns:
+    object: Polaris asyncio connection context
+Raises:
+    RequestException: If the query to Polaris returned an error
+
+Examples:
+    >>> async with AsyncPolarisClient(json_keyfile='keyfile.json') as client:
+    ...     results = await asyncio.gather(*[client._query("core_snappable_snapshot", {"snapshot_id": i}) for i in ids])
+"""
+class AsyncPolarisClient:
+    # Private
+    from .common.graphql import _dump_nodes, _get_details_from_graphql_query
+
+    def __init__(self, domain=None, username=None, password=None, json_keyfile=None,
+                 logging_handler=logging.NullHandler(), logging_level=logging.WARNING, **kwargs):
+        from .common.graphql import _build_graphql_maps
+
+        self.logger = logging_setup(logging_handler, logging_level)
+
+        # Set credentials
+        self._domain = PolarisClient._get_cred('rubrik_polaris_domain', domain)
+        self._username = PolarisClient._get_cred('rubrik_polaris_username', username)
+        self._password = PolarisClient._get_cred('rubrik_polaris_password', password)
+        self._verify = not kwargs.get('insecure', False)
+        self._proxies = kwargs.get('proxies')
+        self._json_data = kwargs.get('json_data')
+        self._json_keyfile = json_keyfile
+
+        if (not self._domain or not self._username or not self._password) and not json_keyfile \
+                and not self._json_data:
+            self.logger.critical("Required credentials are missing!")
+            raise Exception('Required credentials are missing! Please pass in username, password and domain, directly'
+                            ' or through the OS environment, or .json key file, or JSON data.')
+
+        # Set base variables
+        self._kwargs = kwargs
+        self._data_path = "{}/graphql/".format(os.path.dirname(os.path.realpath(__file__)))
+
+        # Adjust Polaris domain if a custom root is defined
+        if 'root_domain' in self._kwargs and self._kwargs['root_domain'] is not None:
+            self._baseurl = "https://{}.{}/api".format(self._domain, self._kwargs['root_domain'])
+        else:
+            self._baseurl = "https://{}.my.rubrik.com/api".format(self._domain)
+
+        self._access_token = None
+        self._user_agent = self._kwargs.get('user_agent')
+
+        # The aiohttp session and the lock must be created inside the running event loop
+        self._session = None
+        self._auth_lock = None
+
+        if self._json_keyfile:
+            with open(self._json_keyfile) as f:
+                json_key = json.load(f)
+            self._baseurl = re.sub(r"/client_token", "", json_key['access_token_uri'])
+
+        elif self._json_data:
+            json_data = json.loads(self._json_data)
+            self._baseurl = re.sub(r"/client_token", "", json_data['access_token_uri'])
+
+        # Get graphql content
+        (self._graphql_query_map) = _build_graphql_maps(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close all pooled connections of the client."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self._kwargs.get('pool_size', DEFAULT_POOL_SIZE),
+                                             ssl=None if self._verify else False)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _get_proxy(self, url):
+        if not self._proxies:
+            return None
+        return self._proxies.get(url.split(':', 1)[0])
+
+    async def _post(self, url, body, headers, timeout):
+        import aiohttp
+
+        session = self._get_session()
+        async with session.post(url, json=body, headers=headers, proxy=self._get_proxy(url),
+                                timeout=aiohttp.ClientTimeout(total=timeout)) as raw_resp:
+            resp = await raw_resp.json(content_type=None)
+            return raw_resp, resp
+
+    async def authenticate(self):
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+
+        async with self._auth_lock:
+            # Concurrent callers wait for the first one to retrieve the token
+            if self._access_token:
+                return self._access_token
+
+            if self._json_keyfile:
+                with open(self._json_keyfile) as f:
+                    json_key = json.load(f)
+                self._access_token = await self._get_access_token_keyfile(json_key=json_key)
+                self.logger.info("Retrieved access token using json key file.")
+
+            elif self._json_data:
+                json_data = json.loads(self._json_data)
+                self._access_token = await self._get_access_token_keyfile(json_key=json_data)
+                self.logger.info("Retrieved access token using json data.")
+
+            elif self._username and self._password:
+                self._access_token = await self._get_access_token_basic()
+                del (self._username, self._password)
+                self.logger.info("Retrieved access token using username and password.")
+
+        return self._access_token
+
+    async def prepare_headers(self):
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+        if self._user_agent:
+            headers['User-Agent'] = self._user_agent
+
+        if self._access_token:
+            headers['Authorization'] = 'Bearer ' + self._access_token
+        else:
+            headers['Authorization'] = 'Bearer ' + await self.authenticate()
+
+        return headers
+
+    async def _query_paginated(self, query_name=None, variables=None, timeout=60):
+        """ Perform query against Polaris and return an async iterator of entries.
+        It handles responses that has more than one page of entries by requesting
+        consecutive pages as entries are read from the iterator.
+        """
+        q = self._graphql_query_map[query_name]
+        gql_query_name = q['gql_name']
+        variables = dict(variables or {})
+
+        api_response = {}
+        start = True
+        while start or \
+                (api_response['data'][gql_query_name]
+                 and not isinstance(api_response['data'][gql_query_name], bool)
+                 and 'pageInfo' in api_response['data'][gql_query_name]
+                 and api_response['data'][gql_query_name]['pageInfo']['hasNextPage']):
+            if not start:
+                variables['after'] = api_response['data'][gql_query_name]['pageInfo']['endCursor']
+            api_response = await self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
+            start = False
+            nodes = self._dump_nodes(api_response)
+            if isinstance(nodes, list):
+                for node in nodes:
+                    yield node
+            else:
+                yield nodes
+
+    async def _query(self, query_name=None, variables=None, timeout=60):
+        """ Perform query against Polaris
+        """
+        q = self._graphql_query_map[query_name]
+        api_response = await self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
+        if api_response['data'].get('pageInfo'):
+            raise Exception("use _query_paginated instead of _query for when expected response is paged")
+
+        return self._dump_nodes(api_response)
+
+    async def _named_raw_query(self, query_name=None, variables=None, timeout=60):
+        """ Perform query against Polaris and return the raw GraphQL response.
+        NOTE! This shouldn't be used in normal circumstances, use _query instead (or
+        _query_paginated when the response is paginated).
+        """
+        q = self._graphql_query_map[query_name]
+        return await self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
+
+    async def _query_raw(self, raw_query, operation_name, variables, timeout):
+        """ Perform raw GraphQL request and return the raw response in json format.
+        NOTE! This shouldn't be used in normal circumstances, use _query instead (or
+        _query_paginated when the response is paginated).
+        """
+        try:
+            raw_resp, resp = await self._post(
+                "{}/graphql".format(self._baseurl),
+                _build_request_body(raw_query, operation_name, variables),
+                await self.prepare_headers(),
+                timeout
+            )
+            _raise_for_errors(self, resp)
+
+            raw_resp.raise_for_status()
+
+            return resp
+
+        except Exception as e:
+            raise RequestException(e)
+
+    async def _get_access_token_basic(self):
+        import aiohttp
+
+        try:
+            session_url = "{}/session".format(self._baseurl)
+            payload = {
+                "username": self._username,
+                "password": self._password
+            }
+            headers = {
+                'Content-Type': 'application/json;charset=UTF-8',
+                'Accept': 'application/json, text/plain'
+            }
+            _, response_json = await self._post(session_url, payload, headers, 30)
+
+            del payload
+
+            if 'access_token' not in response_json:
+                self.logger.error(ERROR_MESSAGES["ACCESS_TOKEN_NOT_FOUND"])
+                raise AuthenticationException(ERROR_MESSAGES["ACCESS_TOKEN_NOT_FOUND"])
+            if response_json['access_token']:
+                return response_json['access_token']
+
+            if not response_json.get('mfa_token'):
+                self.logger.error(ERROR_MESSAGES["MFA_TOKEN_NOT_FOUND"])
+                raise AuthenticationException(ERROR_MESSAGES["MFA_TOKEN_NOT_FOUND"])
+
+            payload = {
+                "username": self._username,
+                "password": self._password,
+                "mfa_remember_token": response_json['mfa_token']
+            }
+            _, response_json = await self._post(session_url, payload, headers, 30)
+
+            if 'access_token' not in response_json:
+                self.logger.error(ERROR_MESSAGES["ACCESS_TOKEN_NOT_FOUND"])
+                raise AuthenticationException(ERROR_MESSAGES["ACCESS_TOKEN_NOT_FOUND"])
+
+            return response_json['access_token']
+
+        except aiohttp.ClientProxyConnectionError:
+            raise ProxyException(ERROR_MESSAGES['PROXY_ERROR'])
+        except aiohttp.ClientConnectionError:
+            raise RequestException(f"{ERROR_MESSAGES['HOST_CONNECTION_ERROR']}")
+        except aiohttp.ClientError as request_err:
+            raise RequestException(request_err)
+        except ValueError as value_err:
+            raise RequestException(value_err)
+        except Exception as err:
+            self.logger.error(err)
+            raise
+
+    async def _get_access_token_keyfile(self, json_key=None):
+        import aiohttp
+
+        try:
+            session_url = json_key['access_token_uri']
+            payload = {
+                "client_id": json_key['client_id'],
+                "client_secret": json_key['client_secret'],
+                "name": json_key['name']
+            }
+            headers = {
+                'Content-Type': 'application/json;charset=UTF-8',
+                'Accept': 'application/json, text/plain'
+            }
+            _, response_json = await self._post(session_url, payload, headers, 30)
+
+            if 'access_token' not in response_json:
+                self.logger.error(ERROR_MESSAGES["ACCESS_TOKEN_NOT_FOUND"])
+                raise AuthenticationException(ERROR_MESSAGES["ACCESS_TOKEN_NOT_FOUND"])
+
+            return response_json['access_token']
+
+        except aiohttp.ClientProxyConnectionError:
+            raise ProxyException(ERROR_MESSAGES['PROXY_ERROR'])
+        except aiohttp.ClientError as request_err:
+            raise RequestException(request_err)
+        except ValueError as value_err:
+            raise RequestException(value_err)
+        except Exception as err:
+            self.logger.error(err)
+            raise
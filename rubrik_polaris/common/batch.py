@@ -0,0 +1,208 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that batch point lookups into aliased GraphQL requests.
+
+A stored query such as
+
+    query Op($snapshot_id: UUID!) { polarisSnapshot(snapshotFid: $snapshot_id) { ... } }
+
+is repeated once per variable set, each copy under its own alias and with its
+own variables, so N lookups cost a single request:
+
+    query OpBatch($snapshot_id_0: UUID!, $snapshot_id_1: UUID!) {
+        b0_polarisSnapshot: polarisSnapshot(snapshotFid: $snapshot_id_0) { ... }
+        b1_polarisSnapshot: polarisSnapshot(snapshotFid: $snapshot_id_1) { ... }
+    }
+"""
+
+import re
+from functools import lru_cache
+
+DEFAULT_BATCH_SIZE = 50
+
+_TOKEN_RE = re.compile(r'"""(?:.|\n)*?"""|"(?:\\.|[^"\\])*"|#[^\n]*|\$?[_A-Za-z][_0-9A-Za-z]*|-?\d[\d.eE+-]*|\.\.\.|[^\s,]')
+_OPENING = '({['
+_CLOSING = ')}]'
+
+
+def _query_batch(self, query_name, variables_list, chunk_size=None, timeout=60):
+    """ Perform the same query for several variable sets, `chunk_size` variable
+    sets per request, and return one result per variable set, in order. Each
+    result is what `_query` would have returned, or the RequestException
+    raised by the lookup when only that part of the request failed.
+    """
+    from rubrik_polaris.common.connection import _error_to_exception, _raise_for_errors
+
+    q = self._graphql_query_map[query_name]
+    chunk_size = chunk_size or self._kwargs.get('batch_size', DEFAULT_BATCH_SIZE)
+    variables_list = list(variables_list)
+
+    results = []
+    for start in range(0, len(variables_list), chunk_size):
+        chunk = variables_list[start:start + chunk_size]
+        batch_query, operation_name, keys = _build_batch_query(q['query_text'], q['operation_name'], len(chunk))
+
+        variables = {}
+        for i, item_variables in enumerate(chunk):
+            for name, value in (item_variables or {}).items():
+                variables['{}_{}'.format(name, i)] = value
+
+        response = self._query_raw(batch_query, operation_name, variables, timeout, partial=True)
+
+        errors = {}
+        for error in response.get('errors') or []:
+            alias = (error.get('path') or [None])[0]
+            index = _alias_index(alias, keys)
+            if index is None:
+                # The error isn't tied to a single lookup, the whole request failed
+                _raise_for_errors(self, {'errors': [error]})
+            errors.setdefault(index, error)
+
+        data = response.get('data') or {}
+        for i in range(len(chunk)):
+            if i in errors:
+                self.logger.error(errors[i])
+                results.append(_error_to_exception(errors[i]))
+            else:
+                item_data = {key: data.get(_alias(i, key)) for key in keys}
+                results.append(self._dump_nodes({'data': item_data}))
+
+    return results
+
+
+def _alias(index, key):
+    return "b{}_{}".format(index, key)
+
+
+def _alias_index(alias, keys):
+    match = re.match(r'^b(\d+)_(.+)$', alias or '')
+    if not match or match.group(2) not in keys:
+        return None
+    return int(match.group(1))
+
+
+@lru_cache(maxsize=256)
+def _build_batch_query(query_text, operation_name, count):
+    """ Rewrite a stored query into `count` aliased copies of its top level
+    fields. Returns the batch query, its operation name and the response keys
+    of the original query.
+    """
+    tokens = [t for t in _TOKEN_RE.findall(query_text) if not t.startswith('#')]
+
+    start = next(i for i, t in enumerate(tokens) if t in ('query', 'mutation', 'subscription'))
+    keyword = tokens[start]
+    pos = start + 1
+    if pos < len(tokens) and tokens[pos] not in ('(', '{', '@'):
+        pos += 1  # Operation name
+
+    variable_definitions = []
+    if tokens[pos] == '(':
+        end = _skip_balanced(tokens, pos)
+        variable_definitions = _split_variable_definitions(tokens[pos + 1:end - 1])
+        pos = end
+
+    while tokens[pos] != '{':
+        pos += 1  # Operation directives are dropped from the batch
+    end = _skip_balanced(tokens, pos)
+    fields = _split_fields(tokens[pos + 1:end - 1])
+    fragments = tokens[:start] + tokens[end:]
+
+    variable_names = {definition[0] for definition in variable_definitions}
+    if any(t in variable_names for t in fragments):
+        raise ValueError("The fragments of '{}' use operation variables, it can't be batched".format(operation_name))
+
+    batch_definitions = []
+    batch_fields = []
+    for i in range(count):
+        suffix = '_{}'.format(i)
+        for definition in variable_definitions:
+            batch_definitions.append(' '.join([definition[0] + suffix] + definition[1:]))
+        for key, alias_pos, field in fields:
+            renamed = [t + suffix if t in variable_names else t for t in field]
+            if alias_pos is None:
+                renamed = [_alias(i, key), ':'] + renamed
+            else:
+                renamed[alias_pos] = _alias(i, key)
+            batch_fields.append(' '.join(renamed))
+
+    batch_operation_name = "{}Batch".format(operation_name)
+    batch_query = "{} {}{} {{\n{}\n}}\n{}".format(
+        keyword,
+        batch_operation_name,
+        "({})".format(", ".join(batch_definitions)) if batch_definitions else "",
+        "\n".join(batch_fields),
+        ' '.join(fragments)
+    )
+    return batch_query, batch_operation_name, tuple(key for key, _, _ in fields)
+
+
+def _skip_balanced(tokens, pos):
+    depth = 0
+    while True:
+        if tokens[pos] in _OPENING:
+            depth += 1
+        elif tokens[pos] in _CLOSING:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+
+
+def _split_variable_definitions(tokens):
+    definitions = []
+    depth = 0
+    for t in tokens:
+        if depth == 0 and t.startswith('$'):
+            definitions.append([t])
+            continue
+        if t in _OPENING:
+            depth += 1
+        elif t in _CLOSING:
+            depth -= 1
+        definitions[-1].append(t)
+    return definitions
+
+
+def _split_fields(tokens):
+    """ Split a selection set into its fields, as (response key, position of
+    the alias or None, tokens) tuples.
+    """
+    fields = []
+    depth = 0
+    previous = None
+    for t in tokens:
+        if depth == 0 and previous not in ('@', ':') and re.match(r'^[_A-Za-z]', t):
+            fields.append([t, None, [t]])
+        elif depth == 0 and t == '...':
+            raise ValueError("Fragment spreads at the root of a query can't be batched")
+        else:
+            if depth == 0 and previous == ':' and len(fields[-1][2]) == 2:
+                # `alias: field`, the response key is the alias
+                fields[-1][1] = 0
+            if t in _OPENING:
+                depth += 1
+            elif t in _CLOSING:
+                depth -= 1
+            fields[-1][2].append(t)
+        previous = t
+    return [tuple(field) for field in fields]
@@ -0,0 +1,139 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that coalesce the queries of concurrent callers.
+
+Enabled with the `coalesce` client option, `_query` then goes through a
+QueryCoalescer: callers asking for the same query and variables while a
+request is in flight share its result, and the distinct variable sets of a
+query submitted within `coalesce_window` seconds are resolved by a single
+batched request (see `rubrik_polaris.common.batch`). The window is only waited
+for when other queries are in flight, a lone caller sends its query at once.
+"""
+
+import copy
+import json
+import threading
+from time import sleep
+from concurrent.futures import Future
+
+DEFAULT_COALESCE_WINDOW = 0.005
+
+
+class QueryCoalescer:
+    """Deduplicates and batches the queries of concurrent callers of a client.
+
+    Args:
+        client (PolarisClient): Client the queries are sent with
+        window (float): Seconds the distinct variable sets of a query are collected for before being sent
+    """
+
+    def __init__(self, client, window=DEFAULT_COALESCE_WINDOW):
+        self._client = client
+        self._window = window
+        self._lock = threading.Lock()
+        self._callers = 0
+        self._in_flight = {}
+        self._pending = {}
+        self._batchable = {}
+
+    def accepts(self, query_name):
+        """Return whether the queries named `query_name` can be coalesced, mutations never are."""
+        from rubrik_polaris.common.batch import _build_batch_query
+
+        batchable = self._batchable.get(query_name)
+        if batchable is None:
+            q = self._client._graphql_query_map[query_name]
+            try:
+                batchable = q['query_text'].lstrip().startswith('query') and \
+                    bool(_build_batch_query(q['query_text'], q['operation_name'], 1))
+            except ValueError:
+                batchable = False
+            self._batchable[query_name] = batchable
+        return batchable
+
+    def load(self, query_name, variables, timeout):
+        """Return the result of a query, sharing the request with concurrent callers.
+
+        Args:
+            query_name (str): Name of the query in the GraphQL query map
+            variables (dict): Variables of the query
+            timeout (int): Request timeout in seconds
+
+        Returns:
+            The result `_query` returns for the query, each caller gets its own copy
+        """
+        key = (query_name, json.dumps(variables, sort_keys=True, default=str))
+        with self._lock:
+            self._callers += 1
+            future = self._in_flight.get(key)
+            owner = future is None
+            leader = wait = False
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                leader = query_name not in self._pending
+                wait = self._callers > 1
+                self._pending.setdefault(query_name, []).append((key, variables, future))
+
+        try:
+            if leader:
+                # The first caller of a tick collects the callers that arrive during the window and sends their
+                # request, without waiting when no other query is in flight
+                self._dispatch(query_name, timeout, wait)
+            result = future.result()
+        finally:
+            with self._lock:
+                self._callers -= 1
+        return result if owner else copy.deepcopy(result)
+
+    def _dispatch(self, query_name, timeout, wait):
+        from rubrik_polaris.common.connection import _query_direct
+
+        batch = results = error = None
+        try:
+            if wait:
+                sleep(self._window)
+            with self._lock:
+                batch = self._pending.pop(query_name)
+            if len(batch) == 1:
+                results = [_query_direct(self._client, query_name, batch[0][1], timeout)]
+            else:
+                results = self._client._query_batch(query_name, [variables for _, variables, _ in batch],
+                                                    timeout=timeout)
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                # Such as a KeyboardInterrupt, raised once the waiters are handed it as well
+                raise
+        finally:
+            if batch is None:
+                with self._lock:
+                    batch = self._pending.pop(query_name)
+            for i, (key, _, future) in enumerate(batch):
+                result = error if error is not None else results[i]
+                with self._lock:
+                    del self._in_flight[key]
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -26,6 +26,13 @@ Collection of methods that control connection with Polaris.
 import requests
 import http
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from time import sleep
+from timeit import default_timer as timer
+from rubrik_polaris.common.projection import _projected_query
+from rubrik_polaris.common.retry import _is_idempotent
 from rubrik_polaris.exceptions import RequestException, AuthenticationException, ProxyException
 from rubrik_polaris.logger import logging_setup
 
@@ -49,18 +56,51 @@ ERROR_MESSAGES = {
                            'credentials.',
     "HOST_CONNECTION_ERROR": 'Connection Failed: Invalid host while verifying \'Polaris Account\'. Please check '
                              'domain.',
-    "PROXY_ERROR": 'Proxy Error: Try removing the proxy parameter from the client or check the provided proxies.'
+    "PROXY_ERROR": 'Proxy Error: Try removing the proxy parameter from the client or check the provided proxies.',
+    "PREFETCH_AND_STREAM": "'prefetch' and 'stream' can't be used together."
 }
 
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_RETRIES = 3
+DEFAULT_PARTITION_WORKERS = 4
+DEFAULT_PARTITION_BUFFER = 1000
 
-def _query_paginated(self, query_name=None, variables=None, timeout=60):
+PAGINATION_STATS = ('pages', 'consumer_stalls', 'consumer_stall_seconds', 'producer_stalls', 'producer_stall_seconds')
+
+
+def _query_paginated(self, query_name=None, variables=None, timeout=60, prefetch=0, stream=False, fields=None):
     """ Perform query against Polaris and return an iterator of entries. It
     handles responses that has more than one page of entries by requesting
     consecutive pages as entries are read from the iterator.
-    """
 
-    q = self._graphql_query_map[query_name]
+    When `prefetch` is greater than 0 the pages are fetched by a background
+    worker, up to `prefetch` pages ahead of the entries being read.
+
+    When `stream` is set each page is decoded incrementally and its entries
+    are returned as they are parsed, so memory use doesn't grow with the page
+    size. It requires the optional `ijson` dependency.
+
+    When `fields` is set only those fields of the entries are requested (see
+    `rubrik_polaris.common.projection`). With the `adaptive_page_size` client
+    option the `first` variable is adjusted from one page to the next (see
+    `rubrik_polaris.common.paging`).
+
+    Failed pages are retried from their own cursor by `_query_raw`. When a
+    page still fails, the RequestException raised carries that cursor as
+    `cursor`, the `after` variable that resumes the sweep where it stopped.
+    """
+    if prefetch and stream:
+        raise ValueError(ERROR_MESSAGES['PREFETCH_AND_STREAM'])
+    if prefetch:
+        yield from _query_paginated_prefetch(self, query_name, variables, timeout, prefetch, fields)
+        return
+    if stream:
+        yield from _query_paginated_stream(self, query_name, variables, timeout, fields)
+        return
+
+    q = _projected_query(self, query_name, fields)
     gql_query_name = q['gql_name']
+    variables = _start_page_size(self, query_name, dict(variables or {}))
 
     api_response = {}
     start = True
@@ -71,7 +111,11 @@ def _query_paginated(self, query_name=None, variables=None, timeout=60):
             and api_response['data'][gql_query_name]['pageInfo']['hasNextPage']):
         if not start:
             variables['after'] = api_response['data'][gql_query_name]['pageInfo']['endCursor']
-        api_response = self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
+        try:
+            api_response = _query_page(self, q, query_name, variables, timeout)
+        except RequestException as e:
+            e.cursor = variables.get('after')
+            raise
         start = False
         nodes = self._dump_nodes(api_response)
         if isinstance(nodes, list):
@@ -80,10 +124,310 @@ def _query_paginated(self, query_name=None, variables=None, timeout=60):
             yield nodes
 
 
-def _query(self, query_name=None, variables=None, timeout=60):
-    """ Perform query against Polaris
+def _query_paginated_prefetch(self, query_name, variables, timeout, depth, fields=None):
+    """ Pipelined variant of _query_paginated. The next page is requested as
+    soon as the cursor of the current one is known and queued, so reading
+    the entries overlaps with the network round-trips.
+    """
+    q = _projected_query(self, query_name, fields)
+    gql_query_name = q['gql_name']
+    variables = _start_page_size(self, query_name, dict(variables or {}))
+
+    pages = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _put(item):
+        start = None
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                if start is None:
+                    start = timer()
+        if start is not None:
+            _record_pagination_stats(self, producer_stalls=1, producer_stall_seconds=timer() - start)
+
+    def _fetch_pages():
+        try:
+            while not stop.is_set():
+                api_response = _query_page(self, q, query_name, variables, timeout)
+                _put(('page', self._dump_nodes(api_response)))
+                result = api_response['data'][gql_query_name]
+                if not result or isinstance(result, bool) or 'pageInfo' not in result \
+                        or not result['pageInfo']['hasNextPage']:
+                    break
+                variables['after'] = result['pageInfo']['endCursor']
+        except Exception as e:
+            e.cursor = variables.get('after')
+            _put(('error', e))
+        _put(('done', None))
+
+    worker = threading.Thread(target=_fetch_pages, name="polaris-prefetch-{}".format(query_name), daemon=True)
+    worker.start()
+    try:
+        while True:
+            try:
+                kind, nodes = pages.get_nowait()
+            except queue.Empty:
+                start = timer()
+                kind, nodes = pages.get()
+                _record_pagination_stats(self, consumer_stalls=1, consumer_stall_seconds=timer() - start)
+            if kind == 'done':
+                break
+            if kind == 'error':
+                raise nodes
+            _record_pagination_stats(self, pages=1)
+            if isinstance(nodes, list):
+                yield from nodes
+            else:
+                yield nodes
+    finally:
+        stop.set()
+
+
+def _start_page_size(self, query_name, variables):
+    """ Return a copy of `variables` whose `first` is the page size to start
+    from, when page sizes are adapted.
+    """
+    if self._page_sizes is None or not variables or not variables.get('first'):
+        return variables
+    return dict(variables, first=self._page_sizes.start(query_name, variables['first']))
+
+
+def _query_page(self, q, query_name, variables, timeout):
+    """ Request a page of a paginated query. When page sizes are adapted the
+    `first` variable is updated for the next page, and a page that timed out
+    or failed with a server error is requested again with a smaller size.
+    """
+    if self._page_sizes is None or not variables.get('first'):
+        return self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
+
+    while True:
+        meta = {}
+        try:
+            api_response = self._query_raw(q['query_text'], q['operation_name'], variables, timeout, meta=meta)
+        except RequestException:
+            smaller = None
+            if meta.get('timeout') or meta.get('status', 0) >= 500:
+                smaller = self._page_sizes.shrink(query_name, variables['first'])
+            if smaller is None:
+                raise
+            self.logger.warning("Page of {} entries of '{}' failed, retrying with {}".format(
+                variables['first'], query_name, smaller))
+            variables['first'] = smaller
+            continue
+        variables['first'] = self._page_sizes.observe(query_name, variables['first'], meta['elapsed'], meta['bytes'])
+        return api_response
+
+
+def _query_paginated_partitioned(self, query_name, variables, partitions, max_workers=DEFAULT_PARTITION_WORKERS,
+                                 order_by=None, timeout=60, stream=False, fields=None,
+                                 buffer_size=DEFAULT_PARTITION_BUFFER):
+    """ Perform a paginated query as several independent queries, one per
+    partition, and return a single iterator of their entries. Each partition
+    is a dict of variables merged into `variables` (e.g. a filter on a single
+    cluster) and its cursor chain is walked by one of `max_workers` workers.
+
+    By default entries are returned as soon as their page is received. With
+    `order_by="partition"` the entries of each partition are returned in turn,
+    in the order of `partitions`. With a callable `order_by` the partitions,
+    which must each be sorted by that key, are merged into a sorted stream.
+
+    At most `buffer_size` entries are buffered per partition in the ordered
+    modes, a worker waits for its entries to be read before fetching more.
+    The merge reads every partition at once, so it walks all of them
+    concurrently whatever `max_workers`.
+    """
+    import heapq
+    from concurrent.futures import ThreadPoolExecutor
+
+    stop = threading.Event()
+    shared = queue.Queue(maxsize=buffer_size)
+    queues = [shared] * len(partitions) if order_by is None else \
+        [queue.Queue(maxsize=buffer_size) for _ in partitions]
+    if order_by not in (None, 'partition'):
+        max_workers = max(max_workers, len(partitions))
+
+    def _put(results, item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _walk(index, partition):
+        results = queues[index]
+        try:
+            partition_variables = _merge_variables(variables or {}, partition)
+            for node in self._query_paginated(query_name, partition_variables, timeout, stream=stream, fields=fields):
+                if not _put(results, ('node', node)):
+                    return
+        except Exception as e:
+            _put(results, ('error', e))
+        _put(results, ('done', None))
+
+    def _drain(results, count):
+        while count:
+            kind, node = results.get()
+            if kind == 'done':
+                count -= 1
+            elif kind == 'error':
+                raise node
+            else:
+                yield node
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="polaris-partition-{}".format(query_name))
+    futures = []
+    try:
+        for index, partition in enumerate(partitions):
+            futures.append(executor.submit(_walk, index, partition))
+
+        if order_by is None:
+            yield from _drain(shared, len(partitions))
+        elif order_by == 'partition':
+            for results in queues:
+                yield from _drain(results, 1)
+        else:
+            yield from heapq.merge(*[_drain(results, 1) for results in queues], key=order_by)
+    finally:
+        stop.set()
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _merge_variables(variables, override):
+    """ Return a copy of `variables` updated with `override`, nested dicts are merged.
+    """
+    merged = dict(variables)
+    for name, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(name), dict):
+            merged[name] = _merge_variables(merged[name], value)
+        else:
+            merged[name] = value
+    return merged
+
+
+def _query_paginated_stream(self, query_name, variables, timeout, fields=None):
+    """ Streaming variant of _query_paginated, the entries of every page are
+    returned one at a time while the response body is being read.
+    """
+    q = _projected_query(self, query_name, fields)
+    variables = dict(variables or {})
+
+    while True:
+        try:
+            page_info = yield from _query_raw_stream(self, q['query_text'], q['operation_name'], variables, timeout)
+        except RequestException as e:
+            e.cursor = variables.get('after')
+            raise
+        if not page_info or not page_info.get('hasNextPage'):
+            break
+        variables['after'] = page_info['endCursor']
+
+
+def _query_raw_stream(self, raw_query, operation_name, variables, timeout):
+    """ Perform raw GraphQL request and incrementally decode the response.
+    Yields the `node` of every `data.<name>.edges` entry as soon as it is
+    parsed and returns the `pageInfo` of the connection. GraphQL errors are
+    raised as soon as they are read. The request is sent with `_post_graphql`,
+    so it is retried, rate limited and re-authenticated before its body is read.
+    """
+    import ijson
+
+    try:
+        with _post_graphql(self, raw_query, operation_name, variables, timeout, stream=True) as raw_resp:
+            if raw_resp.status_code >= 400:
+                _raise_for_errors(self, raw_resp.json())
+                raw_resp.raise_for_status()
+
+            raw_resp.raw.decode_content = True
+            page_info = None
+            for prefix, value in _iter_stream_items(ijson.parse(raw_resp.raw, use_float=True)):
+                if prefix == 'errors.item':
+                    _raise_for_errors(self, {'errors': [value]})
+                elif prefix.endswith('.pageInfo'):
+                    page_info = value
+                else:
+                    yield value
+            return page_info
+
+    except RequestException:
+        raise
+    except Exception as e:
+        raise RequestException(e)
+
+
+def _iter_stream_items(events):
+    """ Assemble the objects of interest of a GraphQL response from a stream of
+    ijson parser events, yielding (prefix, object) tuples for the errors, the
+    connection nodes and the connection page info.
+    """
+    from ijson import ObjectBuilder
+
+    for prefix, event, value in events:
+        if not _is_stream_item(prefix):
+            continue
+        if event not in ('start_map', 'start_array'):
+            if event != 'map_key':
+                yield prefix, value
+            continue
+
+        builder = ObjectBuilder()
+        depth = 1
+        while depth:
+            builder.event(event, value)
+            _, event, value = next(events)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+        yield prefix, builder.value
+
+
+def _is_stream_item(prefix):
+    parts = prefix.split('.')
+    if parts == ['errors', 'item']:
+        return True
+    return len(parts) == 5 and parts[0] == 'data' and parts[2:] == ['edges', 'item', 'node'] or \
+        len(parts) == 3 and parts[0] == 'data' and parts[2] == 'pageInfo'
+
+
+def _record_pagination_stats(self, **increments):
+    with self._stats_lock:
+        for key, value in increments.items():
+            self._pagination_stats[key] += value
+
+
+def get_pagination_stats(self):
+    """Retrieve the counters of prefetching paginated queries.
+
+    Consumer stalls count the times the caller had to wait for a page to arrive, producer stalls count the
+    times the background worker had to wait because the prefetch queue was full.
+
+    Returns:
+        dict: Number of prefetched pages and the number and duration of consumer and producer stalls.
+    """
+    with self._stats_lock:
+        return dict(self._pagination_stats)
+
+
+def _query(self, query_name=None, variables=None, timeout=60, fields=None):
+    """ Perform query against Polaris, requesting only `fields` when set
     """
-    q = self._graphql_query_map[query_name]
+    if fields is None and self._coalescer is not None and self._coalescer.accepts(query_name):
+        return self._coalescer.load(query_name, variables, timeout)
+    return _query_direct(self, query_name, variables, timeout, fields)
+
+
+def _query_direct(self, query_name, variables, timeout, fields=None):
+    """ Perform query against Polaris with a request of its own.
+    """
+    q = _projected_query(self, query_name, fields)
     api_response = self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
     if api_response['data'].get('pageInfo'):
         raise Exception("use _query_paginated instead of _query for when expected response is paged")
@@ -91,66 +435,169 @@ def _query(self, query_name=None, variables=None, timeout=60):
     return self._dump_nodes(api_response)
 
 
-def _named_raw_query(self, query_name=None, variables=None, timeout=60):
+def _named_raw_query(self, query_name=None, variables=None, timeout=60, fields=None):
     """ Perform query against Polaris and return the raw GraphQL response.
     NOTE! This shouldn't be used in normal circumstances, use _query instead (or
     _query_paginated when the response is paginated).
     """
-    q = self._graphql_query_map[query_name]
+    q = _projected_query(self, query_name, fields)
     return self._query_raw(q['query_text'], q['operation_name'], variables, timeout)
 
 
-def _query_raw(self, raw_query, operation_name, variables, timeout):
+def _query_raw(self, raw_query, operation_name, variables, timeout, partial=False, meta=None):
     """ Perform raw GraphQL request and return the raw response in json format.
+    With `partial`, a response that has data is returned along with its errors
+    instead of raising, for requests that resolve several independent fields.
+    When a `meta` dict is given it is filled with the `elapsed` seconds, the
+    HTTP `status` and the body size in `bytes` of the response, or `timeout`
+    when none was received in time.
     NOTE! This shouldn't be used in normal circumstances, use _query instead (or
     _query_paginated when the response is paginated).
     """
+    start = timer()
     try:
-        body = {"query": "{}".format(raw_query)}
-        if variables:
-            body['variables'] = variables
-        if operation_name:
-            body['operationName'] = operation_name
-
-        raw_resp = requests.post(
-            "{}/graphql".format(self._baseurl),
-            headers=self.prepare_headers(),
-            json=body,
-            verify=self._verify,
-            proxies=self._proxies,
-            timeout=timeout
-        )
+        raw_resp = _post_graphql(self, raw_query, operation_name, variables, timeout)
+        if meta is not None:
+            meta.update(elapsed=timer() - start, status=raw_resp.status_code, bytes=len(raw_resp.content))
 
         resp = raw_resp.json()
-        if 'errors' in resp and len(resp['errors']) > 0:
-            error = resp['errors'][0]
-            self.logger.error(error)
-            status_code = error['extensions']['code']
-            trace_id = error['extensions'].get('trace') if error['extensions']['trace'].get('traceId', "N/A") else "N/A"
-            if error.get('path'):
-                raise RequestException(ERROR_MESSAGES['REQUEST_ERROR_WITH_PATH'].format(
-                    status_code,
-                    return_http_error_message(status_code),
-                    trace_id,
-                    error['path'], error['message']))
-            raise RequestException(ERROR_MESSAGES['REQUEST_ERROR_WITHOUT_PATH'].format(
-                status_code, return_http_error_message(status_code),
-                trace_id,
-                error['message']))
-
-        if 'code' in resp and 'message' in resp and resp['code'] >= 400:
-            raise RequestException(ERROR_MESSAGES['REQUEST_INVALID_STATUS'].format(resp['code'],
-                return_http_error_message(resp['code']),
-                resp['message']))
+        if not (partial and resp.get('data')):
+            _raise_for_errors(self, resp)
 
         raw_resp.raise_for_status()
 
         return resp
 
     except Exception as e:
+        if meta is not None and isinstance(e, requests.exceptions.Timeout):
+            meta.update(elapsed=timer() - start, timeout=True)
         raise RequestException(e)
 
 
+_request_recorder = threading.local()
+
+
+@contextmanager
+def _recording_requests(entries):
+    """ Append an entry to `entries` for every GraphQL request the current
+    thread sends, with its `operation` name, `seconds`, and HTTP `status` or
+    `error`. Recordings nest, a request is only recorded by the innermost one.
+    """
+    previous = getattr(_request_recorder, 'entries', None)
+    _request_recorder.entries = entries
+    try:
+        yield entries
+    finally:
+        _request_recorder.entries = previous
+
+
+def _record_request(operation_name, start, response, error):
+    entries = getattr(_request_recorder, 'entries', None)
+    if entries is None:
+        return
+    entry = {'operation': operation_name, 'seconds': timer() - start}
+    if response is not None:
+        entry['status'] = response.status_code
+    else:
+        entry['error'] = str(error)
+    entries.append(entry)
+
+
+def _post_graphql(self, raw_query, operation_name, variables, timeout, stream=False):
+    """ Post a GraphQL request and return the HTTP response. Transient
+    failures are retried according to the client's retry policy, mutations
+    only when Polaris didn't process them (see `rubrik_polaris.common.retry`).
+    A request rejected with a 401 is sent once more with a new access token.
+    With `stream`, the body of the response returned is left unread.
+    """
+    idempotent = _is_idempotent(raw_query)
+    attempt = 0
+    delay = None
+    replayed = False
+    while True:
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire()
+        attempt += 1
+        response = error = None
+        headers = self.prepare_headers()
+        start = timer()
+        try:
+            response = self._session.post(
+                "{}/graphql".format(self._baseurl),
+                headers=headers,
+                json=_build_request_body(raw_query, operation_name, variables),
+                verify=self._verify,
+                proxies=self._proxies,
+                timeout=timeout,
+                stream=stream
+            )
+        except requests.exceptions.RequestException as e:
+            error = e
+        _record_request(operation_name, start, response, error)
+
+        if response is not None and response.status_code == 401 and not replayed:
+            # The token expired or was revoked, the request is sent once more with a new one
+            replayed = True
+            response.close()
+            self._token_manager.invalidate(headers['Authorization'][len('Bearer '):])
+            continue
+
+        if self._retry_policy is None or \
+                not self._retry_policy.should_retry(attempt, idempotent, response=response, error=error):
+            if error is not None:
+                raise error
+            return response
+
+        delay = self._retry_policy.delay(delay, response)
+        if response is not None:
+            response.close()
+        self.logger.warning("Request {} failed ({}), attempt {} of {}, retrying in {:.1f}s".format(
+            operation_name, error or response.status_code, attempt, self._retry_policy.max_attempts, delay))
+        sleep(delay)
+
+
+def _build_request_body(raw_query, operation_name, variables):
+    """ Build the JSON body of a GraphQL request.
+    """
+    body = {"query": "{}".format(raw_query)}
+    if variables:
+        body['variables'] = variables
+    if operation_name:
+        body['operationName'] = operation_name
+    return body
+
+
+def _raise_for_errors(self, resp):
+    """ Raise a RequestException when a decoded GraphQL response reports an error.
+    """
+    if 'errors' in resp and len(resp['errors']) > 0:
+        error = resp['errors'][0]
+        self.logger.error(error)
+        raise _error_to_exception(error)
+
+    if 'code' in resp and 'message' in resp and resp['code'] >= 400:
+        raise RequestException(ERROR_MESSAGES['REQUEST_INVALID_STATUS'].format(resp['code'],
+            return_http_error_message(resp['code']),
+            resp['message']))
+
+
+def _error_to_exception(error):
+    """ Build the RequestException describing a single GraphQL error.
+    """
+    status_code = error['extensions']['code']
+    trace_id = error['extensions'].get('trace') if error['extensions']['trace'].get('traceId', "N/A") else "N/A"
+    if error.get('path'):
+        return RequestException(ERROR_MESSAGES['REQUEST_ERROR_WITH_PATH'].format(
+            status_code,
+            return_http_error_message(status_code),
+            trace_id,
+            error['path'], error['message']))
+    return RequestException(ERROR_MESSAGES['REQUEST_ERROR_WITHOUT_PATH'].format(
+        status_code, return_http_error_message(status_code),
+        trace_id,
+        error['message']))
+
+
 def _get_access_token_basic(self):
     try:
         session_url = "{}/session".format(self._baseurl)
@@ -162,7 +609,7 @@ def _get_access_token_basic(self):
             'Content-Type': 'application/json;charset=UTF-8',
             'Accept': 'application/json, text/plain'
         }
-        response = requests.post(
+        response = self._session.post(
             session_url,
             json=payload,
             headers=headers,
@@ -191,7 +638,7 @@ def _get_access_token_basic(self):
             "mfa_remember_token": mfa_token
         }
 
-        response = requests.post(
+        response = self._session.post(
             session_url,
             json=payload,
             headers=headers,
@@ -232,7 +679,7 @@ def _get_access_token_keyfile(self, json_key=None):
             'Content-Type': 'application/json;charset=UTF-8',
             'Accept': 'application/json, text/plain'
         }
-        response = requests.post(
+        response = self._session.post(
             session_url,
             json=payload,
             headers=headers,
@@ -259,6 +706,59 @@ def _get_access_token_keyfile(self, json_key=None):
         raise
 
 
+def _build_session(self):
+    """ Build the pooled, keep-alive HTTP session used for every request made by
+    the client, including the access token requests.
+
+    Transient failures, connection errors included, are retried by
+    `_post_graphql` according to the client's retry policy. Only without a
+    retry policy does the transport adapter retry connection errors, so a
+    failure is never retried by both.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    pool_size = self._kwargs.get('pool_size', DEFAULT_POOL_SIZE)
+    connect_retries = 0
+    if self._retry_policy is None:
+        connect_retries = self._kwargs.get('max_retries', DEFAULT_CONNECT_RETRIES)
+
+    retries = Retry(total=connect_retries, connect=connect_retries, read=0, status=0, redirect=0,
+                    backoff_factor=0.5, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not self._kwargs.get('keep_alive', True):
+        session.headers['Connection'] = 'close'
+
+    return session
+
+
+def get_connection_stats(self):
+    """Retrieve connection reuse counters of the client's HTTP connection pool.
+
+    Returns:
+        dict: Number of requests sent, connections opened and requests served over a reused connection.
+
+    Examples:
+        >>> client.get_connection_stats()
+        {'requests': 120, 'connections': 2, 'reused': 118}
+    """
+    stats = {'requests': 0, 'connections': 0}
+    for adapter in set(self._session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats['requests'] += pool.num_requests
+            stats['connections'] += pool.num_connections
+    stats['reused'] = max(stats['requests'] - stats['connections'], 0)
+    return stats
+
+
 def return_http_error_message(status_code):
     """
     Returns HTTP error message, either custom or standard based on the status code input
@@ -25,7 +25,10 @@ Collection of functions that interact with Polaris primitives.
 ERROR_MESSAGES = {
     'INVALID_FIELD_TYPE': "'{}' is an invalid value for '{}'. Value must be in {}.",
     'INVALID_FIRST': "'{}' is an invalid value for 'first'. Value must be an integer greater than 0.",
+    'PREFETCH_AND_MAX_WORKERS': "'prefetch' and 'max_workers' can't be used together.",
 }
+DEFAULT_TASK_STATUS_BATCH_SIZE = 100
+DEFAULT_SYNC_OVERLAP = 60
 
 
 def get_sla_domains(self, sla_domain_name=""):
@@ -197,6 +200,40 @@ def get_task_status(self, task_chain_id):
         raise
 
 
+def get_task_statuses(self, task_chain_ids, chunk_size=DEFAULT_TASK_STATUS_BATCH_SIZE):
+    """Retrieve the status of several tasks, `chunk_size` tasks per request
+
+    Args:
+        task_chain_ids (list): Task Chain UUIDs from requests
+        chunk_size (int): Maximum number of tasks resolved by a single request
+
+    Returns:
+        dict: Task state of each Task Chain UUID, "FAILED" when the status of a task couldn't be retrieved,
+        None when Polaris has no status for it yet, e.g. while it is queued
+
+    Raises:
+        RequestException: If the query to Polaris returned an error
+
+    Examples:
+        >>> client = PolarisClient()
+        >>> statuses = client.get_task_statuses(task_chain_ids)
+    """
+    task_chain_ids = list(dict.fromkeys(task_chain_ids))
+    variables_list = [{"filter": task_chain_id} for task_chain_id in task_chain_ids]
+    responses = self._query_batch("core_taskchain_status", variables_list, chunk_size)
+
+    statuses = {}
+    for task_chain_id, response in zip(task_chain_ids, responses):
+        if isinstance(response, Exception):
+            statuses[task_chain_id] = "FAILED"
+        elif not response or not response.get('taskchain'):
+            # An unknown status isn't terminal, the task is polled again
+            statuses[task_chain_id] = None
+        else:
+            statuses[task_chain_id] = response['taskchain']
+    return statuses
+
+
 def _get_snapshot(self, snapshot_id=None):
     try:
         query_name = "core_snappable_snapshot"
@@ -211,6 +248,21 @@ def _get_snapshot(self, snapshot_id=None):
         raise
 
 
+def _get_snapshots(self, snapshot_ids):
+    """ Retrieve the details of several snapshots with batched requests, as a
+    dict of snapshot id to details ({} when a snapshot isn't found).
+    """
+    snapshot_ids = list(dict.fromkeys(snapshot_ids))
+    responses = self._query_batch("core_snappable_snapshot",
+                                  [{"snapshot_id": snapshot_id} for snapshot_id in snapshot_ids])
+    snapshots = {}
+    for snapshot_id, response in zip(snapshot_ids, responses):
+        if isinstance(response, Exception):
+            raise response
+        snapshots[snapshot_id] = response or {}
+    return snapshots
+
+
 def get_snapshots(self, snappable_id=None, recovery_point=None):
     """Retrieve Snapshots for a Snappable from Polaris
 
@@ -264,7 +316,8 @@ def get_snapshots(self, snappable_id=None, recovery_point=None):
         raise
 
 
-def get_event_series_list(self, object_type=[], status=[], activity_type=[], severity=[], cluster_ids=[], start_time=None, end_time = None):
+def get_event_series_list(self, object_type=[], status=[], activity_type=[], severity=[], cluster_ids=[], start_time=None, end_time = None,
+                          fields=None):
     """Retrieve Events from Polaris
 
     Args:
@@ -275,6 +328,7 @@ def get_event_series_list(self, object_type=[], status=[], activity_type=[], sev
         cluster_ids (list): List of Cluster IDs (UUID)
         start_date (datetime): Timestamp to start return set from
         end_date (datetime): Timestamp to end return set from
+        fields (list|str): Optional dotted paths of the event series fields to request, or a projection profile such as "ids-only"
 
     Returns:
         list: A list of dictionaries of Event Data
@@ -298,30 +352,139 @@ def get_event_series_list(self, object_type=[], status=[], activity_type=[], sev
                 "objectName": ""
             }
         }
-        response = self._query(query_name, variables)
+        response = self._query(query_name, variables, fields=fields)
         return response
     except Exception:
         raise
 
 
-def get_report_data(self, object_type=[], cluster_ids=[]):
+def sync_event_series(self, state_path, filters=None, start_date=None, first=100, overlap=DEFAULT_SYNC_OVERLAP):
+    """Retrieve the event series that are new or were updated since the previous sync
+
+    The time of the latest update returned is kept in the `state_path` JSON file along with the series updated within
+    `overlap` seconds of it. The next sync only requests the series updated after that time, minus `overlap` seconds
+    to account for late writes, and skips the series it already returned. The state is only saved once every series
+    was retrieved, so when a sync fails the next one returns the same series again.
+
+    Args:
+        state_path (str): Path of the JSON file holding the sync state, created on the first sync
+        filters (dict): Additional `ActivitySeriesFilter` filters, if any, to filter events to retrieve.
+        start_date (str): Start date of events to retrieve on the first sync, all events when not provided
+        first (int): Number of event series retrieved per request
+        overlap (int): Number of seconds before the last update time that are requested again
+
+    Returns:
+        list: A list of dictionaries of Event series, sorted by last update time
+
+    Raises:
+        RequestException: If the query to Polaris returned an error
+
+    Examples:
+        >>> client = PolarisClient()
+        >>> for event_series in client.sync_event_series("events.state.json"):
+        ...     forward(event_series)
+    """
+    from datetime import timedelta
+    from dateutil.parser import parse
+
+    state = _load_sync_state(state_path)
+    last_updated = state.get('last_updated') or start_date
+    seen = {tuple(key) for key in state.get('seen', [])}
+
+    filters_ = dict(filters or {})
+    if last_updated:
+        filters_['lastUpdatedTimeGt'] = _format_event_time(parse(last_updated) - timedelta(seconds=overlap))
+    variables = {
+        "first": first,
+        "filters": filters_,
+        "sortBy": "LastUpdated",
+        "sortOrder": "Asc"
+    }
+
+    event_series_list = []
+    for event_series in self._query_paginated("core_event_series_list", variables):
+        key = (event_series['activitySeriesId'], event_series['lastUpdated'])
+        if key in seen:
+            continue
+        seen.add(key)
+        event_series_list.append(event_series)
+        if not last_updated or parse(event_series['lastUpdated']) > parse(last_updated):
+            last_updated = event_series['lastUpdated']
+
+    _save_sync_state(state_path, last_updated, seen, overlap)
+    return event_series_list
+
+
+def _format_event_time(timestamp):
+    from dateutil.tz import tzutc
+
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=tzutc())
+    return timestamp.astimezone(tzutc()).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _load_sync_state(state_path):
+    import json
+
+    try:
+        with open(state_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_sync_state(state_path, last_updated, seen, overlap):
+    """ Atomically write the sync state, only the series within `overlap`
+    seconds of the last update can be requested again so older ones are dropped.
+    """
+    import os
+    import json
+    import tempfile
+    from datetime import timedelta
+    from dateutil.parser import parse
+
+    if last_updated:
+        boundary = parse(last_updated) - timedelta(seconds=overlap)
+        seen = [key for key in seen if parse(key[1]) >= boundary]
+    state = {"last_updated": last_updated, "seen": sorted(seen)}
+
+    directory = os.path.dirname(os.path.abspath(state_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def get_report_data(self, object_type=[], cluster_ids=[], prefetch=0, stream=False, max_workers=0, order_by=None,
+                    fields=None):
     """Retrieve Report Data from Polaris
 
     Args:
         object_type (list): List of object type
         cluster_ids (list): List of cluster id's
+        prefetch (int): Number of pages to fetch ahead in the background while entries are read, 0 to disable,
+            can't be combined with `max_workers`
+        stream (bool): Decode each page incrementally to keep memory use constant, requires `ijson`
+        max_workers (int): Number of clusters, or of object types when a single cluster is given, whose report
+            data is fetched concurrently, 0 to fetch all the report data with a single cursor
+        order_by: With `max_workers`, "partition" returns the entries cluster by cluster (or object type by object
+            type) instead of as they are received
+        fields (list|str): Optional dotted paths of the fields to request, or a projection profile such as "ids-only"
 
     Returns:
         list: A list of dictionaries of Report data
 
     Raises:
         RequestException: If the query to Polaris returned an error
+        ValueError: If both `prefetch` and `max_workers` are provided
     """
     try:
+        if prefetch and max_workers:
+            raise ValueError(ERROR_MESSAGES['PREFETCH_AND_MAX_WORKERS'])
         query_name = "core_report_data"
         variables = {
             "first": 1000,
-            "filters": {
+            "filter": {
                 "objectType": object_type,
                 "complianceStatus": [],
                 "protectionStatus": [],
@@ -330,7 +493,18 @@ def get_report_data(self, object_type=[], cluster_ids=[]):
                 },
             },
         }
-        response = self._query_paginated(query_name, variables)
+        if max_workers:
+            if len(cluster_ids) > 1:
+                partitions = [{"filter": {"cluster": {"id": [cluster_id]}}} for cluster_id in cluster_ids]
+            elif len(object_type) > 1:
+                partitions = [{"filter": {"objectType": [object_type_]}} for object_type_ in object_type]
+            else:
+                partitions = None
+            if partitions:
+                return self._query_paginated_partitioned(query_name, variables, partitions, max_workers=max_workers,
+                                                         order_by=order_by, stream=stream, fields=fields)
+
+        response = self._query_paginated(query_name, variables, prefetch=prefetch, stream=stream, fields=fields)
         return response
     except Exception:
         raise
@@ -338,7 +512,7 @@ def get_report_data(self, object_type=[], cluster_ids=[]):
 
 def list_event_series(self, activity_status=None, activity_type=None, object_name=None, object_type=None,
                       start_date=None, end_date=None, severity=None, cluster_id=None, sort_by=None,
-                      sort_order=None, after=None, first: int = 20, filters=None):
+                      sort_order=None, after=None, first: int = 20, filters=None, fields=None):
     """
     Retrieve the series event list from Rubrik.
 
@@ -356,6 +530,8 @@ def list_event_series(self, activity_status=None, activity_type=None, object_nam
         sort_order (str): Sorting the events to retrieve in specific order.
         after (str): The cursor token to retrieve the next set of results.
         filters (dict): Additional filters, if any, to filter events to retrieve.
+        fields (list|str): Dotted paths of the event series fields to retrieve, or a projection profile such as
+            "ids-only". All the fields are retrieved if not provided.
 
     Returns:
         dict: Response from the API
@@ -391,12 +567,12 @@ def list_event_series(self, activity_status=None, activity_type=None, object_nam
         if cluster_id:
             cluster_id = [x.strip() for x in cluster_id.split(',')]
 
-        sort_by_enum = self.get_enum_values("ActivitySeriesSortField")
+        sort_by_enum = self.get_enum_values("ActivitySeriesSortField", values=[sort_by])
         if sort_by and sort_by not in sort_by_enum:
             raise ValueError(ERROR_MESSAGES['INVALID_FIELD_TYPE'].format(
                     sort_by, "sort_by", sort_by_enum))
 
-        sort_order_enum = self.get_enum_values("SortOrder")
+        sort_order_enum = self.get_enum_values("SortOrder", values=[sort_order])
         if sort_order and sort_order not in sort_order_enum:
             raise ValueError(ERROR_MESSAGES['INVALID_FIELD_TYPE'].format(
                 sort_order, "sort_order", sort_order_enum))
@@ -421,6 +597,6 @@ def list_event_series(self, activity_status=None, activity_type=None, object_nam
         if sort_order:
             variables['sortOrder'] = sort_order
 
-        return self._named_raw_query(query_name="core_event_series_list", variables=variables)
+        return self._named_raw_query(query_name="core_event_series_list", variables=variables, fields=fields)
     except Exception:
         raise
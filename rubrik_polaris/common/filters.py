@@ -0,0 +1,154 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that match listed objects against attribute and tag criteria.
+
+Besides their top level attributes, objects can be matched on `account_id`,
+the id of their AWS account, Azure subscription or GCP project, and on
+`sla_id`, the id of their effective SLA domain.
+
+When `object_index_ttl` is set, the index of a listing is kept by the client
+for that many seconds, so the lookups that follow reuse it instead of listing
+the objects again. By default every lookup lists the objects.
+"""
+
+import json
+from time import monotonic
+
+DEFAULT_OBJECT_INDEX_TTL = 0
+
+
+class ObjectIndex:
+    """Inverted indexes of a listing of objects, from each top level attribute
+    value and each tag to the ids of the objects that have it.
+
+    The indexes are built once, in a single pass over the objects, so every
+    match is answered with set intersections (all criteria) or unions (any
+    criterion) whatever the number of objects.
+
+    Args:
+        objects (list): Objects as returned by Polaris, each with an `id`
+
+    Examples:
+        >>> index = ObjectIndex(client.get_compute_ec2())
+        >>> index.match({"region": "US_EAST_1", "tags": {"env": "prod"}})
+    """
+
+    def __init__(self, objects):
+        self._ids = []
+        self._positions = {}
+        self._attributes = {}
+        self._tags = {}
+        for obj in objects:
+            object_id = obj['id']
+            self._positions.setdefault(object_id, len(self._ids))
+            self._ids.append(object_id)
+            for key, value in _object_attributes(obj):
+                if key == 'tags':
+                    for tag in value or []:
+                        self._tags.setdefault((tag['key'], tag['value']), set()).add(object_id)
+                else:
+                    self._attributes.setdefault((key, _encode(value)), set()).add(object_id)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def match(self, criteria, match_all=True):
+        """Return the ids of the objects matching the criteria.
+
+        Args:
+            criteria (dict): Top level attribute values to match, `tags` being a dict of tag key to value
+            match_all (bool): Match all the criteria, or any of them when False
+
+        Returns:
+            list: Ids of the matching objects, in the order of the listing. When any
+            criterion matches, this includes the objects that match all of them.
+        """
+        matches = []
+        for key, value in criteria.items():
+            if key == 'tags':
+                matches.extend(self._tags.get((tag_key, tag_value), set()) for tag_key, tag_value in value.items())
+            else:
+                matches.append(self._attributes.get((key, _encode(value)), set()))
+
+        if not matches:
+            return list(self._ids) if match_all else []
+
+        if match_all:
+            # Intersect from the most selective criterion
+            matches.sort(key=len)
+            object_ids = set(matches[0]).intersection(*matches[1:])
+        else:
+            object_ids = set().union(*matches)
+        return sorted(object_ids, key=self._positions.get)
+
+
+def _get_object_index(self, kind, load, filters=None):
+    """ Return the ObjectIndex of the listing of `kind` objects filtered by
+    `filters`. With `object_index_ttl` set, it is reused for that many seconds,
+    or until the objects of `kind` are invalidated.
+    """
+    ttl = self._kwargs.get('object_index_ttl', DEFAULT_OBJECT_INDEX_TTL)
+    key = (kind, json.dumps(filters, sort_keys=True))
+    with self._object_indexes_lock:
+        cached = self._object_indexes.get(key)
+    if cached is not None and monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    index = ObjectIndex(load(filters=filters) if filters else load())
+    if ttl:
+        now = monotonic()
+        with self._object_indexes_lock:
+            # Drop the expired indexes of other listings along the way
+            for expired in [k for k, (built_at, _) in self._object_indexes.items() if now - built_at >= ttl]:
+                del self._object_indexes[expired]
+            self._object_indexes[key] = (now, index)
+    return index
+
+
+def _invalidate_object_indexes(self, kind=None):
+    """ Drop the cached indexes of the listings of `kind` objects, or of every kind.
+    """
+    with self._object_indexes_lock:
+        for key in [key for key in self._object_indexes if kind is None or key[0] == kind]:
+            del self._object_indexes[key]
+
+
+def _object_attributes(obj):
+    """ Return the (key, value) pairs of the attributes an object can be matched on.
+    """
+    attributes = list(obj.items())
+    account = obj.get('awsNativeAccount') or (obj.get('resourceGroup') or {}).get('subscription') \
+        or obj.get('gcpNativeProject')
+    sla_domain = obj.get('effectiveSlaDomain')
+    if account and 'account_id' not in obj:
+        attributes.append(('account_id', account.get('id')))
+    if sla_domain and 'sla_id' not in obj:
+        attributes.append(('sla_id', sla_domain.get('id') or sla_domain.get('fid')))
+    return attributes
+
+
+def _encode(value):
+    # Dicts and lists aren't hashable, they are compared by their JSON encoding
+    if isinstance(value, (dict, list)):
+        return 'json', json.dumps(value, sort_keys=True)
+    return value
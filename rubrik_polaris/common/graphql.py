@@ -24,8 +24,28 @@ Collection of methods that interact with the raw GraphQL.
 """
 
 import re
+import threading
+from time import monotonic
+
+DEFAULT_ENUM_CACHE_TTL = 3600
+
+_graphql_maps = {}
+_graphql_maps_lock = threading.Lock()
 
 def _build_graphql_maps(self):
+    """ Return the GraphQL query/mutation map of the client's data path. The
+    files are read and parsed once per process, later clients share the map
+    so it must be treated as read-only.
+    """
+    with _graphql_maps_lock:
+        graphql_details = _graphql_maps.get(self._data_path)
+        if graphql_details is None:
+            graphql_details = _read_graphql_files(self)
+            _graphql_maps[self._data_path] = graphql_details
+    return graphql_details
+
+
+def _read_graphql_files(self):
     from os import listdir
     from os.path import isfile, join
 
@@ -120,11 +140,91 @@ def _dump_nodes(self, request):
     return nodes
 
 
-def get_enum_values(self, name=None):
-    """ Retrieve Enum Values via Introspection """
+def get_enum_values(self, name=None, offline=True, values=None):
+    """ Retrieve Enum Values via Introspection, values are cached for `enum_cache_ttl` seconds.
+    When the client has a `schema_path` the values are read from the offline schema index
+    instead, unless `offline` is False or the enum isn't part of that schema. When the
+    offline schema doesn't know some of `values`, the values the caller is about to check,
+    it may be outdated, so the values are asked to Polaris.
+    """
     try:
+        cached = _get_cached_enum_values(self, name)
+        if cached is not None:
+            return cached
+
+        if offline:
+            schema_index = self._get_schema_index()
+            if schema_index is not None and name in schema_index['enums']:
+                enum_values = list(schema_index['enums'][name])
+                if not any(value and value not in enum_values for value in values or []):
+                    return enum_values
+
         query_name = "graphql_enum_values"
         variables = {"enum_name": name}
-        return self._query(query_name, variables)
+        enum_values = self._query(query_name, variables)
+        _set_cached_enum_values(self, {name: enum_values})
+        return enum_values
     except Exception:
         raise
+
+
+def warm_enum_cache(self):
+    """Retrieve the values of every enum of the schema in a single introspection query and cache them.
+
+    Returns:
+        int: Number of cached enums
+
+    Raises:
+        RequestException: If the query to Polaris returned an error
+
+    Examples:
+        >>> client.warm_enum_cache()
+        1204
+    """
+    try:
+        query_name = "graphql_all_enum_values"
+        response = self._query(query_name, None)
+        enums = {}
+        for graphql_type in response['types']:
+            if graphql_type['kind'] == 'ENUM':
+                enums[graphql_type['name']] = [value['name'] for value in graphql_type['enumValues'] or []]
+        _set_cached_enum_values(self, enums)
+        return len(enums)
+    except Exception:
+        raise
+
+
+def invalidate_enum_cache(self, name=None):
+    """Remove cached enum values so they are retrieved again on next use.
+
+    Args:
+        name (str): Enum to remove from the cache, all enums are removed if not given
+    """
+    with self._enum_cache_lock:
+        if name is None:
+            self._enum_cache.clear()
+        else:
+            self._enum_cache.pop(name, None)
+
+
+def _get_cached_enum_values(self, name):
+    with self._enum_cache_lock:
+        cached = self._enum_cache.get(name)
+        if cached is None:
+            return None
+        expires_at, values = cached
+        if expires_at <= monotonic():
+            del self._enum_cache[name]
+            return None
+        return list(values)
+
+
+def _set_cached_enum_values(self, enums):
+    ttl = self._kwargs.get('enum_cache_ttl', DEFAULT_ENUM_CACHE_TTL)
+    if not ttl:
+        return
+    expires_at = monotonic() + ttl
+    with self._enum_cache_lock:
+        for name, values in enums.items():
+            if isinstance(values, list):
+                self._enum_cache[name] = (expires_at, list(values))
@@ -0,0 +1,199 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that keep a local SQLite inventory of compute and storage objects.
+
+Enabled with the `inventory_path` client option, the object-ID lookups
+(`get_compute_object_ids_ec2`, `get_storage_object_ids_ebs`, ...) then match
+their criteria with indexed queries against the inventory, which is only
+listed again from Polaris once it is older than `inventory_ttl` seconds.
+
+Every top level attribute of an object is indexed by its JSON encoded value,
+along with the `account_id` and `sla_id` of the object, so any criterion the
+lookups accept is answered from the index, and tags are indexed by key and value.
+"""
+
+import json
+import threading
+from time import time
+from rubrik_polaris.common.filters import _object_attributes
+
+DEFAULT_INVENTORY_TTL = 900
+INVENTORY_FORMAT_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (kind TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL,
+                                    PRIMARY KEY (kind, id));
+CREATE TABLE IF NOT EXISTS attributes (kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS attributes_value ON attributes (kind, key, value);
+CREATE INDEX IF NOT EXISTS attributes_id ON attributes (kind, id);
+CREATE TABLE IF NOT EXISTS tags (kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT, id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS tags_value ON tags (kind, key, value);
+CREATE INDEX IF NOT EXISTS tags_id ON tags (kind, id);
+CREATE TABLE IF NOT EXISTS refreshes (kind TEXT PRIMARY KEY, refreshed_at REAL NOT NULL);
+"""
+
+
+class InventoryStore:
+    """SQLite store of the objects listed from Polaris, indexed by attribute and tag.
+
+    Args:
+        path (str): Path of the SQLite database, ":memory:" to keep the inventory in memory
+        ttl (int): Number of seconds after which the objects of a kind are listed again
+    """
+
+    def __init__(self, path=":memory:", ttl=DEFAULT_INVENTORY_TTL):
+        import sqlite3
+
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != INVENTORY_FORMAT_VERSION:
+                # Inventories written by another version are rebuilt on the next lookup
+                self._db.executescript("DROP TABLE IF EXISTS objects; DROP TABLE IF EXISTS attributes; "
+                                       "DROP TABLE IF EXISTS tags; DROP TABLE IF EXISTS refreshes;")
+            self._db.executescript(_SCHEMA)
+            self._db.execute("PRAGMA user_version = {}".format(INVENTORY_FORMAT_VERSION))
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def is_fresh(self, kind):
+        """Return whether the objects of `kind` were refreshed less than `ttl` seconds ago."""
+        with self._lock:
+            row = self._db.execute("SELECT refreshed_at FROM refreshes WHERE kind = ?", (kind,)).fetchone()
+        return row is not None and time() - row[0] < self._ttl
+
+    def invalidate(self, kind=None):
+        """Mark the objects of `kind`, or of every kind, as stale so the next lookup lists them again."""
+        with self._lock, self._db:
+            if kind is None:
+                self._db.execute("DELETE FROM refreshes")
+            else:
+                self._db.execute("DELETE FROM refreshes WHERE kind = ?", (kind,))
+
+    def refresh(self, kind, objects):
+        """Replace the inventory of `kind` with `objects`. Only the objects that
+        were added, changed or removed since the previous refresh are written.
+
+        Args:
+            kind (str): Kind of objects, e.g. "aws_ec2"
+            objects (list): Objects as returned by Polaris, each with an `id`
+
+        Returns:
+            int: Number of objects added, changed or removed
+        """
+        with self._lock, self._db:
+            current = dict(self._db.execute("SELECT id, data FROM objects WHERE kind = ?", (kind,)))
+            latest = {str(obj['id']): obj for obj in objects}
+
+            changed = [object_id for object_id, obj in latest.items()
+                       if current.get(object_id) != _encode(obj)]
+            removed = [object_id for object_id in current if object_id not in latest]
+
+            for object_id in changed + removed:
+                self._db.execute("DELETE FROM attributes WHERE kind = ? AND id = ?", (kind, object_id))
+                self._db.execute("DELETE FROM tags WHERE kind = ? AND id = ?", (kind, object_id))
+            self._db.executemany("DELETE FROM objects WHERE kind = ? AND id = ?",
+                                 [(kind, object_id) for object_id in removed])
+
+            for object_id in changed:
+                obj = latest[object_id]
+                self._db.execute("INSERT OR REPLACE INTO objects (kind, id, data) VALUES (?, ?, ?)",
+                                 (kind, object_id, _encode(obj)))
+                self._db.executemany("INSERT INTO attributes (kind, key, value, id) VALUES (?, ?, ?, ?)",
+                                     [(kind, key, _encode(value), object_id) for key, value in _object_attributes(obj)
+                                      if key != 'tags'])
+                self._db.executemany("INSERT INTO tags (kind, key, value, id) VALUES (?, ?, ?, ?)",
+                                     [(kind, tag['key'], tag['value'], object_id) for tag in obj.get('tags') or []])
+
+            self._db.execute("INSERT OR REPLACE INTO refreshes (kind, refreshed_at) VALUES (?, ?)", (kind, time()))
+            return len(changed) + len(removed)
+
+    def find(self, kind, criteria, match_all=True):
+        """Return the ids of the objects of `kind` matching the criteria.
+
+        Args:
+            kind (str): Kind of objects
+            criteria (dict): Top level attribute values to match, `tags` being a dict of tag key to value
+            match_all (bool): Match all the criteria, or any of them when False
+
+        Returns:
+            list: Ids of the matching objects, in the order they were stored. When any
+            criterion matches, this includes the objects that match all of them.
+        """
+        queries = []
+        parameters = []
+        for key, value in criteria.items():
+            if key == 'tags':
+                for tag_key, tag_value in value.items():
+                    queries.append("SELECT id FROM tags WHERE kind = ? AND key = ? AND value = ?")
+                    parameters.extend([kind, tag_key, tag_value])
+            else:
+                queries.append("SELECT id FROM attributes WHERE kind = ? AND key = ? AND value = ?")
+                parameters.extend([kind, key, _encode(value)])
+
+        if not queries and not match_all:
+            return []
+        if queries:
+            matches = (" INTERSECT " if match_all else " UNION ").join(queries)
+            sql = "SELECT id FROM objects WHERE kind = ? AND id IN ({}) ORDER BY rowid".format(matches)
+        else:
+            sql = "SELECT id FROM objects WHERE kind = ? ORDER BY rowid"
+
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, [kind] + parameters)]
+
+
+def _encode(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def _get_inventory(self):
+    """ Return the inventory store configured with the `inventory_path` client
+    option, or None when object lookups list the objects from Polaris.
+    """
+    if self._inventory is None and self._kwargs.get('inventory_path'):
+        with self._inventory_lock:
+            if self._inventory is None:
+                self._inventory = InventoryStore(self._kwargs['inventory_path'],
+                                                 self._kwargs.get('inventory_ttl', DEFAULT_INVENTORY_TTL))
+    return self._inventory
+
+
+def invalidate_inventory(self, kind=None):
+    """Mark the local inventory of `kind` objects, or of every kind, as stale, along with the cached object indexes
+
+    Args:
+        kind (str): Kind of objects ("aws_ec2", "aws_ebs", "azure_vm", "gcp_gce" or "vsphere_vm"), all when omitted
+
+    Examples:
+        >>> client = PolarisClient(json_keyfile='keyfile.json', inventory_path='inventory.db')
+        >>> client.invalidate_inventory("aws_ec2")
+    """
+    self._invalidate_object_indexes(kind)
+    inventory = self._get_inventory()
+    if inventory is not None:
+        inventory.invalidate(kind)
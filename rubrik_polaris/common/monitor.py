@@ -23,56 +23,123 @@
 Collection of methods that monitor tasks
 """
 
-from multiprocessing.pool import ThreadPool
+import heapq
 from time import sleep
 from timeit import default_timer as timer
 from rubrik_polaris.exceptions import PolarisException
+from rubrik_polaris.common.core import DEFAULT_TASK_STATUS_BATCH_SIZE
 
+DEFAULT_POLL_INTERVAL = 3
+DEFAULT_MAX_POLL_INTERVAL = 30
+DEFAULT_MONITOR_WORKERS = 8
+BACKOFF_FACTOR = 1.5
+TERMINAL_STATES = ("SUCCEEDED", "FAILED")
 
-# Threader setup
-def _monitor_threader(self, tasks, thread_count, monitor_job):
-    if not isinstance(tasks, list):
-        tasks = [tasks]
-
-    task_list = [(self, t) for t in tasks]
-
-    thread_pool = ThreadPool(thread_count)
-
-    pool_instance = thread_pool.map_async(monitor_job, task_list, chunksize=1)
-    while not pool_instance.ready():
-        sleep(3)
-
-    thread_pool.close()
-    thread_pool.join()
 
-    return pool_instance.get()
+def monitor_tasks(self, tasks, callback=None, max_workers=DEFAULT_MONITOR_WORKERS, poll_interval=DEFAULT_POLL_INTERVAL,
+                  max_poll_interval=DEFAULT_MAX_POLL_INTERVAL, batch_size=DEFAULT_TASK_STATUS_BATCH_SIZE):
+    """Monitor taskchains until they complete, returning each task as soon as it succeeds or fails.
 
+    A single scheduler tracks all the taskchains. Each one is polled with an interval starting at `poll_interval`
+    and growing up to `max_poll_interval` while it is running. The tasks due at the same time are resolved together,
+    `batch_size` tasks per request, with at most `max_workers` status requests in flight.
 
-# Worker thread
-def _monitor_job(job):
+    Args:
+        tasks (list): Tasks to monitor, dicts with a `taskchainUuid` or `jobId` key, or taskchain UUIDs
+        callback (callable): Optional function called with each task as it completes
+        max_workers (int): Maximum number of concurrent status requests
+        poll_interval (float): Initial number of seconds between two status checks of a task
+        max_poll_interval (float): Maximum number of seconds between two status checks of a task
+        batch_size (int): Maximum number of tasks resolved by a single status request
 
-    self, task = job
-    try:
-        if 'jobId' in task:
-            task['taskchainUuid'] = task['jobId']
-        start = timer()
-        task_status = self.get_task_status(task['taskchainUuid'])
-        while task_status is None or task_status['state'] not in ["SUCCEEDED", "FAILED"]:
-            task_status = self.get_task_status(task['taskchainUuid'])
-            sleep(3)
-        task['status'] = task_status['state']
-        task['elapsed'] = timer() - start
-        return task
+    Returns:
+        iterator: The completed tasks, in completion order, with their `status` and `elapsed` seconds set
 
-    except Exception as err:
-        raise PolarisException("Failed to get status of task {}".format(task['taskchainUuid']))
+    Raises:
+        PolarisException: If the status of a task can't be retrieved
 
+    Examples:
+        >>> for task in client.monitor_tasks(task_chain_ids):
+        ...     print(task['taskchainUuid'], task['status'])
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-# Start threader
+    if not isinstance(tasks, list):
+        tasks = [tasks]
+    tasks = [_normalize_task(task) for task in tasks]
+
+    start = timer()
+    # Entries are (next poll time, task position, poll interval)
+    schedule = [(start, position, poll_interval) for position in range(len(tasks))]
+    heapq.heapify(schedule)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while schedule:
+            now = timer()
+            if schedule[0][0] > now:
+                sleep(schedule[0][0] - now)
+                continue
+
+            due = []
+            while schedule and schedule[0][0] <= now:
+                due.append(heapq.heappop(schedule))
+
+            states = _get_task_states(self, [tasks[position]['taskchainUuid'] for _, position, _ in due], executor,
+                                      batch_size)
+            for (_, position, interval), state in zip(due, states):
+                task = tasks[position]
+                if state in TERMINAL_STATES:
+                    task['status'] = state
+                    task['elapsed'] = timer() - start
+                    if callback:
+                        callback(task)
+                    yield task
+                else:
+                    heapq.heappush(schedule, (timer() + interval, position,
+                                              min(interval * BACKOFF_FACTOR, max_poll_interval)))
+
+
+def _normalize_task(task):
+    if isinstance(task, str):
+        return {'taskchainUuid': task}
+    if 'jobId' in task:
+        task['taskchainUuid'] = task['jobId']
+    return task
+
+
+def _get_task_states(self, task_chain_ids, executor, batch_size):
+    # Each worker resolves a whole batch of tasks with a single request
+    batches = [task_chain_ids[i:i + batch_size] for i in range(0, len(task_chain_ids), batch_size)]
+    futures = [(batch, executor.submit(self.get_task_statuses, batch, batch_size)) for batch in batches]
+    states = []
+    for batch, future in futures:
+        try:
+            task_statuses = future.result()
+        except Exception:
+            raise PolarisException("Failed to get status of tasks {}".format(", ".join(batch)))
+        states.extend(_get_task_state(task_statuses.get(task_chain_id)) for task_chain_id in batch)
+    return states
+
+
+def _get_task_state(task_status):
+    if isinstance(task_status, dict):
+        return task_status.get('state')
+    return task_status
+
+
+# Wait for all tasks to complete
 def _monitor_task(self, tasks):
-    outcome = (_monitor_threader(self, tasks, len(tasks), _monitor_job))
+    if not isinstance(tasks, list):
+        tasks = [tasks]
+    if not tasks:
+        return []
+    tasks = [_normalize_task(task) for task in tasks]
+
+    # The completed tasks are updated in place, so the outcome keeps the order of the request
+    for _ in self.monitor_tasks(tasks):
+        pass
 
-    if len(outcome) > 1:
-        return outcome
+    if len(tasks) > 1:
+        return tasks
 
-    return outcome[0]
+    return tasks[0]
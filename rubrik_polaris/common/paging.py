@@ -0,0 +1,128 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that size the pages of paginated queries.
+
+Enabled with the `adaptive_page_size` client option, `_query_paginated`
+adjusts the `first` variable of a query from one page to the next: it is
+doubled while pages come back well under `target_page_latency` seconds and
+`target_page_bytes` bytes, scaled down when a page exceeds either target, and
+halved before retrying a page that timed out or failed with a 5xx error. The
+size reached for a query is kept for the next paginated calls of the session.
+"""
+
+import threading
+
+DEFAULT_MIN_PAGE_SIZE = 10
+DEFAULT_MAX_PAGE_SIZE = 1000
+DEFAULT_TARGET_PAGE_LATENCY = 2.0
+DEFAULT_TARGET_PAGE_BYTES = 4 * 1024 * 1024
+
+# Pages under this share of both targets make the next page grow
+GROWTH_THRESHOLD = 0.5
+
+
+class PageSizeController:
+    """Page sizes of the paginated queries of a client, per query name.
+
+    Args:
+        min_size (int): Smallest page size, a page failing at this size isn't retried
+        max_size (int): Largest page size
+        target_latency (float): Seconds a page should take to be received
+        target_bytes (int): Size in bytes a page body should stay under
+    """
+
+    def __init__(self, min_size=DEFAULT_MIN_PAGE_SIZE, max_size=DEFAULT_MAX_PAGE_SIZE,
+                 target_latency=DEFAULT_TARGET_PAGE_LATENCY, target_bytes=DEFAULT_TARGET_PAGE_BYTES):
+        self._min_size = min_size
+        self._max_size = max_size
+        self._target_latency = target_latency
+        self._target_bytes = target_bytes
+        self._lock = threading.Lock()
+        self._sizes = {}
+
+    def sizes(self):
+        """Return the page size reached by each query name."""
+        with self._lock:
+            return dict(self._sizes)
+
+    def start(self, query_name, requested):
+        """Return the size of the first page of `query_name`, the one reached
+        previously in the session or else `requested`."""
+        with self._lock:
+            return self._clamp(self._sizes.get(query_name, requested))
+
+    def observe(self, query_name, size, elapsed, body_bytes):
+        """Record a page of `size` entries received in `elapsed` seconds and
+        return the size of the next page.
+
+        Args:
+            query_name (str): Name of the query in the GraphQL query map
+            size (int): Page size the page was requested with
+            elapsed (float): Seconds the page took to be received
+            body_bytes (int): Size of the response body
+
+        Returns:
+            int: Size of the next page
+        """
+        latency_ratio = elapsed / self._target_latency
+        bytes_ratio = body_bytes / self._target_bytes
+        if latency_ratio > 1 or bytes_ratio > 1:
+            next_size = int(size / max(latency_ratio, bytes_ratio))
+        elif latency_ratio < GROWTH_THRESHOLD and bytes_ratio < GROWTH_THRESHOLD:
+            next_size = size * 2
+        else:
+            next_size = size
+        return self._record(query_name, next_size)
+
+    def shrink(self, query_name, size):
+        """Return the size to retry a page of `size` entries that failed with,
+        or None when it can't get any smaller."""
+        if size <= self._min_size:
+            return None
+        return self._record(query_name, size // 2)
+
+    def _record(self, query_name, size):
+        size = self._clamp(size)
+        with self._lock:
+            self._sizes[query_name] = size
+        return size
+
+    def _clamp(self, size):
+        return max(self._min_size, min(self._max_size, size))
+
+
+def get_page_sizes(self):
+    """Retrieve the page sizes reached by the paginated queries of this client
+
+    Returns:
+        dict: Page size of each query name, empty unless the `adaptive_page_size` client option is set
+
+    Examples:
+        >>> client = PolarisClient(json_keyfile='keyfile.json', adaptive_page_size=True)
+        >>> list(client.get_report_data())
+        >>> client.get_page_sizes()
+        {'core_report_data': 1000}
+    """
+    if self._page_sizes is None:
+        return {}
+    return self._page_sizes.sizes()
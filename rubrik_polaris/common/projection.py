@@ -0,0 +1,225 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that project stored queries onto the fields a caller needs.
+
+A projection is a list of dotted field paths, relative to the `node` of each
+entry for a connection and to the returned object otherwise, or the name of a
+profile of PROJECTION_PROFILES. The stored query is rewritten to select only
+those fields, e.g. with `["id", "cluster.name"]`
+
+    activitySeriesConnection(...) { edges { node { id cluster { name } } } pageInfo { ... } }
+
+The `pageInfo` and `cursor` of connections are always kept so projected
+queries can still be paginated, the fragments the projection no longer
+spreads and the variables it no longer uses are dropped.
+"""
+
+from functools import lru_cache
+from rubrik_polaris.common.batch import _TOKEN_RE, _skip_balanced, _split_variable_definitions
+
+# Profile name -> paths of which the query selects at least one
+PROJECTION_PROFILES = {
+    "ids-only": ("id", "fid"),
+}
+
+_CONNECTION_KEPT = ('pageInfo', 'cursor')
+
+
+def _projected_query(self, query_name, fields=None):
+    """ Return the query map entry of `query_name`, its query text projected
+    onto `fields` when provided.
+    """
+    q = self._graphql_query_map[query_name]
+    if not fields:
+        return q
+    if isinstance(fields, str):
+        if fields not in PROJECTION_PROFILES:
+            raise ValueError("Unknown projection profile '{}', expected one of {}".format(
+                fields, sorted(PROJECTION_PROFILES)))
+        query_text = _project_query(q['query_text'], PROJECTION_PROFILES[fields], strict=False)
+    else:
+        query_text = _project_query(q['query_text'], tuple(sorted(set(fields))))
+    return dict(q, query_text=query_text)
+
+
+@lru_cache(maxsize=256)
+def _project_query(query_text, fields, strict=True):
+    """ Rewrite a stored query to select only `fields`. With `strict` every
+    field must be selected by the query, otherwise at least one of them.
+    """
+    tokens = [t for t in _TOKEN_RE.findall(query_text) if not t.startswith('#')]
+    paths = {tuple(field.split('.')) for field in fields}
+
+    fragments = {}
+    operation = None
+    pos = 0
+    while pos < len(tokens):
+        if tokens[pos] == 'fragment':
+            end = _skip_balanced(tokens, tokens.index('{', pos))
+            selections, _ = _parse_selections(tokens, tokens.index('{', pos))
+            fragments[tokens[pos + 1]] = (tokens[pos:end], tokens[pos + 3], selections)
+            pos = end
+        elif tokens[pos] in ('query', 'mutation', 'subscription', '{'):
+            start = pos
+            while tokens[pos] != '{':
+                pos = _skip_balanced(tokens, pos) if tokens[pos] == '(' else pos + 1
+            header = tokens[start:pos]
+            selections, pos = _parse_selections(tokens, pos)
+            operation = (header, selections)
+        else:
+            pos += 1
+
+    header, selections = operation
+    matched = set()
+    projected = []
+    for item in selections:
+        if item['children'] is None or item['kind'] != 'field':
+            projected.append(item)
+        elif any(child['key'] in ('edges', 'nodes') for child in item['children']):
+            projected.append(dict(item, children=_project_connection(item['children'], paths, fragments, matched)))
+        else:
+            projected.append(dict(item, children=_project(item['children'], paths, fragments, matched, ())))
+
+    missing = paths - matched
+    if (strict and missing) or not matched:
+        raise ValueError("The query doesn't select the field(s) {}".format(", ".join(
+            sorted('.'.join(path) for path in (missing if strict else paths)))))
+
+    body = _render(projected)
+    used_fragments = _used_fragments(body, fragments)
+    fragment_tokens = [t for name in sorted(used_fragments) for t in fragments[name][0]]
+    used_variables = {t for t in body + fragment_tokens if t.startswith('$')}
+    return ' '.join(_project_header(header, used_variables) + ['{'] + body + ['}'] + fragment_tokens)
+
+
+def _parse_selections(tokens, pos):
+    """ Parse the selection set opening at `pos` into a list of fields, inline
+    fragments and fragment spreads. Returns the selections and the position
+    following the selection set.
+    """
+    selections = []
+    pos += 1
+    while tokens[pos] != '}':
+        item_start = pos
+        if tokens[pos] == '...' and tokens[pos + 1] not in ('on', '@', '{'):
+            kind, key = 'spread', tokens[pos + 1]
+            pos += 2
+        elif tokens[pos] == '...':
+            kind, key = 'inline', None
+            pos += 3 if tokens[pos + 1] == 'on' else 1
+        else:
+            kind, key = 'field', tokens[pos]
+            pos += 3 if tokens[pos + 1] == ':' else 1
+        while tokens[pos] in ('(', '@'):
+            if tokens[pos] == '@':
+                pos += 2
+            else:
+                pos = _skip_balanced(tokens, pos)
+        head = tokens[item_start:pos]
+        children = None
+        if tokens[pos] == '{' and kind != 'spread':
+            children, pos = _parse_selections(tokens, pos)
+        selections.append({'kind': kind, 'key': key, 'head': head, 'children': children})
+    return selections, pos + 1
+
+
+def _project_connection(selections, paths, fragments, matched):
+    projected = []
+    for item in selections:
+        if item['key'] in _CONNECTION_KEPT:
+            projected.append(item)
+        elif item['key'] == 'nodes' and item['children'] is not None:
+            projected.append(dict(item, children=_project(item['children'], paths, fragments, matched, ())))
+        elif item['key'] == 'edges' and item['children'] is not None:
+            projected.append(dict(item, children=_project_connection(item['children'], paths, fragments, matched)))
+        elif item['key'] == 'node' and item['children'] is not None:
+            projected.append(dict(item, children=_project(item['children'], paths, fragments, matched, ())))
+    return projected
+
+
+def _project(selections, paths, fragments, matched, prefix):
+    """ Keep the selections on `paths`, fragment spreads on the way are
+    replaced with inline fragments so only the selected part is kept.
+    """
+    projected = []
+    for item in selections:
+        if item['kind'] == 'spread':
+            _, type_condition, children = fragments[item['key']]
+            item = {'kind': 'inline', 'key': None, 'head': ['...', 'on', type_condition], 'children': children}
+        if item['kind'] == 'inline':
+            children = _project(item['children'], paths, fragments, matched, prefix)
+            if _selects_fields(children):
+                projected.append(dict(item, children=children))
+            continue
+        if item['key'] == '__typename':
+            projected.append(item)
+            continue
+
+        if (item['key'],) in paths:
+            matched.add(prefix + (item['key'],))
+            projected.append(item)
+        elif item['children'] is not None:
+            sub_paths = {path[1:] for path in paths if len(path) > 1 and path[0] == item['key']}
+            if sub_paths:
+                children = _project(item['children'], sub_paths, fragments, matched, prefix + (item['key'],))
+                if _selects_fields(children):
+                    projected.append(dict(item, children=children))
+    return projected if _selects_fields(projected) else []
+
+
+def _selects_fields(selections):
+    return any(item['kind'] != 'field' or item['key'] != '__typename' for item in selections)
+
+
+def _render(selections):
+    tokens = []
+    for item in selections:
+        tokens.extend(item['head'])
+        if item['children'] is not None:
+            tokens.append('{')
+            tokens.extend(_render(item['children']))
+            tokens.append('}')
+    return tokens
+
+
+def _used_fragments(tokens, fragments):
+    used = set()
+    pending = [tokens]
+    while pending:
+        current = pending.pop()
+        for i, t in enumerate(current[:-1]):
+            if t == '...' and current[i + 1] in fragments and current[i + 1] not in used:
+                used.add(current[i + 1])
+                pending.append(fragments[current[i + 1]][0][4:])
+    return used
+
+
+def _project_header(header, used_variables):
+    """ Drop the definitions of the variables the projected query no longer uses. """
+    if '(' not in header:
+        return header
+    start = header.index('(')
+    end = _skip_balanced(header, start)
+    definitions = [' '.join(d) for d in _split_variable_definitions(header[start + 1:end - 1])
+                   if d[0] in used_variables]
+    return header[:start] + (['(' + ', '.join(definitions) + ')'] if definitions else []) + header[end:]
@@ -0,0 +1,163 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that retry failed requests and pace requests to Polaris.
+
+`_query_raw` retries a request that failed transiently according to the
+client's RetryPolicy (`retry_policy` client option):
+
+- queries are retried on connection errors, read timeouts and 429, 502,
+  503 and 504 responses, as they can safely be sent again
+- mutations are only retried when Polaris didn't process them: on 429
+  responses and on errors raised before the request was sent
+
+Retries wait with decorrelated jitter, each delay drawn between the base
+delay and three times the previous one, or for as long as the `Retry-After`
+header of the response asks. With the `rate_limit` client option all the
+requests of a client, retries included, also go through a token bucket.
+"""
+
+import random
+import re
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import sleep, monotonic
+
+import requests
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30
+RETRY_STATUSES = (429, 502, 503, 504)
+
+_MUTATION_RE = re.compile(r'^\s*(?:#[^\n]*\n\s*)*mutation\b')
+
+
+class RetryPolicy:
+    """How failed requests are retried.
+
+    Args:
+        max_attempts (int): Number of times a request is sent at most, 1 to disable retries
+        base_delay (float): Smallest delay in seconds before a retry
+        max_delay (float): Largest delay in seconds before a retry, `Retry-After` included
+        statuses (tuple): HTTP statuses retried for queries, mutations are only retried on 429
+
+    Examples:
+        >>> client = PolarisClient(json_keyfile='keyfile.json', retry_policy=RetryPolicy(max_attempts=10))
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = tuple(statuses)
+
+    def should_retry(self, attempt, idempotent, response=None, error=None):
+        """Return whether a request sent `attempt` times should be sent again.
+
+        Args:
+            attempt (int): Number of times the request was sent
+            idempotent (bool): Whether the request can be processed twice safely, i.e. it isn't a mutation
+            response (requests.Response): Response received, if any
+            error (Exception): Error raised while sending the request, if any
+
+        Returns:
+            bool: True when the request should be retried
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if response is not None:
+            if response.status_code == 429:
+                return True
+            return idempotent and response.status_code in self.statuses
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError)):
+            return idempotent
+        return False
+
+    def delay(self, previous_delay, response=None):
+        """Return the seconds to wait before the next attempt.
+
+        Args:
+            previous_delay (float): Delay waited before the previous attempt, None for the first retry
+            response (requests.Response): Response of the failed attempt, if any
+
+        Returns:
+            float: Seconds to wait
+        """
+        delay = random.uniform(self.base_delay, max(self.base_delay, (previous_delay or self.base_delay) * 3))
+        retry_after = _parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.max_delay)
+
+
+class TokenBucket:
+    """Paces requests to `rate` per second on average, allowing bursts of `capacity` requests.
+
+    Args:
+        rate (float): Number of tokens added per second
+        capacity (int): Largest number of tokens the bucket holds
+    """
+
+    def __init__(self, rate, capacity=None):
+        self._rate = rate
+        self._capacity = capacity or max(1, int(rate))
+        self._tokens = self._capacity
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, waiting for one to be added when the bucket is empty."""
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0
+        if wait:
+            sleep(wait)
+
+
+def _parse_retry_after(value):
+    """ Return the seconds a `Retry-After` header asks to wait, given in
+    seconds or as an HTTP date, or None when it isn't set or valid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_idempotent(raw_query):
+    """ Return whether a GraphQL request can safely be sent again, i.e. it isn't a mutation. """
+    return not _MUTATION_RE.match(raw_query or "")
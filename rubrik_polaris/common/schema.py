@@ -0,0 +1,271 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that build an offline index of the Polaris GraphQL schema (SDL).
+
+The index holds the values of every enum and the fields of every input and
+output type, so enums can be validated without an introspection request. It
+is stored as JSON in a cache directory keyed by the checksum of the schema
+file, so the SDL is parsed once. It can also be built ahead of time with:
+
+    python -m rubrik_polaris.common.schema schema.graphql schema-index.json
+
+Stored indexes are plain JSON with a format header, so reading one never runs
+code even when the cache directory is writable by other processes.
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import tempfile
+import threading
+
+INDEX_FORMAT = 'rubrik_polaris.schema_index'
+INDEX_FORMAT_VERSION = 2
+
+_TOKEN_RE = re.compile(r'"""(?:.|\n)*?"""|"(?:\\.|[^"\\])*"|#[^\n]*|[_A-Za-z][_0-9A-Za-z]*|-?\d[\d.eE+-]*|\.\.\.|[^\s,]')
+_index_memo = {}
+_index_lock = threading.Lock()
+
+
+def parse_schema(schema_text):
+    """Parse a GraphQL schema definition (SDL) into an index.
+
+    Args:
+        schema_text (str): GraphQL schema definition
+
+    Returns:
+        dict: `enums` maps enum names to their non deprecated values, `inputs` and `types` map input and output
+            type names to a dict of field name to field type.
+    """
+    tokens = [t for t in _TOKEN_RE.findall(schema_text) if not t.startswith('#')]
+    index = {'enums': {}, 'inputs': {}, 'types': {}}
+
+    pos = 0
+    while pos < len(tokens):
+        keyword = tokens[pos]
+        if keyword == 'extend':
+            pos += 1
+            continue
+        if keyword not in ('enum', 'input', 'type', 'interface'):
+            pos += 1
+            continue
+
+        name = tokens[pos + 1]
+        pos += 2
+        while pos < len(tokens) and tokens[pos] != '{':
+            if tokens[pos] in ('enum', 'input', 'type', 'interface', 'scalar', 'union', 'schema', 'directive'):
+                break
+            pos += 1
+        if pos >= len(tokens) or tokens[pos] != '{':
+            continue
+        pos += 1
+
+        if keyword == 'enum':
+            values = index['enums'].setdefault(name, [])
+            while tokens[pos] != '}':
+                if _is_description(tokens[pos]):
+                    pos += 1
+                    continue
+                value = tokens[pos]
+                pos, deprecated = _skip_directives(tokens, pos + 1)
+                if not deprecated:
+                    values.append(value)
+        else:
+            fields = index['inputs' if keyword == 'input' else 'types'].setdefault(name, {})
+            while tokens[pos] != '}':
+                if _is_description(tokens[pos]):
+                    pos += 1
+                    continue
+                field = tokens[pos]
+                pos += 1
+                if tokens[pos] == '(':
+                    pos = _skip_balanced(tokens, pos)
+                pos += 1  # ':'
+                field_type, pos = _read_type(tokens, pos)
+                if tokens[pos] == '=':
+                    pos = _skip_value(tokens, pos + 1)
+                pos, _ = _skip_directives(tokens, pos)
+                fields[field] = field_type
+        pos += 1
+
+    return index
+
+
+def _is_description(token):
+    return token.startswith('"')
+
+
+def _read_type(tokens, pos):
+    if tokens[pos] == '[':
+        item_type, pos = _read_type(tokens, pos + 1)
+        field_type = '[{}]'.format(item_type)
+        pos += 1
+    else:
+        field_type = tokens[pos]
+        pos += 1
+    if pos < len(tokens) and tokens[pos] == '!':
+        field_type += '!'
+        pos += 1
+    return field_type, pos
+
+
+def _skip_balanced(tokens, pos):
+    pairs = {'(': ')', '[': ']', '{': '}'}
+    closing = pairs[tokens[pos]]
+    opening = tokens[pos]
+    depth = 0
+    while True:
+        if tokens[pos] == opening:
+            depth += 1
+        elif tokens[pos] == closing:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+
+
+def _skip_value(tokens, pos):
+    if tokens[pos] in ('(', '[', '{'):
+        return _skip_balanced(tokens, pos)
+    return pos + 1
+
+
+def _skip_directives(tokens, pos):
+    deprecated = False
+    while pos < len(tokens) and tokens[pos] == '@':
+        deprecated = deprecated or tokens[pos + 1] == 'deprecated'
+        pos += 2
+        if pos < len(tokens) and tokens[pos] == '(':
+            pos = _skip_balanced(tokens, pos)
+    return pos, deprecated
+
+
+def _default_cache_dir():
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                        'rubrik_polaris')
+
+
+def load_schema_index(schema_path, cache_dir=None):
+    """Load the index of a GraphQL schema file, parsing it only if no cached index matches its content.
+
+    Args:
+        schema_path (str): Path to the schema definition (SDL), or to an index built with `build_schema_index`
+        cache_dir (str): Directory where parsed indexes are kept, defaults to ~/.cache/rubrik_polaris
+
+    Returns:
+        dict: Schema index, see `parse_schema`
+
+    Raises:
+        ValueError: If `schema_path` is a JSON file that isn't an index of a supported format version
+    """
+    schema_path = os.path.realpath(schema_path)
+    with _index_lock:
+        if schema_path in _index_memo:
+            return _index_memo[schema_path]
+
+        with open(schema_path, 'rb') as f:
+            content = f.read()
+
+        # A schema definition never starts with a brace, an index always does
+        if content.lstrip().startswith(b'{'):
+            index = _decode_index(content)
+            if index is None:
+                raise ValueError("'{}' is not a schema index of format version {}.".format(
+                    schema_path, INDEX_FORMAT_VERSION))
+        else:
+            checksum = hashlib.sha256(content).hexdigest()
+            cache_path = os.path.join(cache_dir or _default_cache_dir(),
+                                      'schema-{}-{}.json'.format(INDEX_FORMAT_VERSION, checksum))
+            index = _read_cached_index(cache_path)
+            if index is None:
+                index = parse_schema(content.decode('utf-8'))
+                _write_cached_index(cache_path, index)
+
+        _index_memo[schema_path] = index
+        return index
+
+
+def build_schema_index(schema_path, index_path):
+    """Parse a GraphQL schema file and write its JSON index to `index_path`."""
+    with open(schema_path, encoding='utf-8') as f:
+        index = parse_schema(f.read())
+    _write_cached_index(index_path, index)
+    return index
+
+
+def _read_cached_index(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            return _decode_index(f.read())
+    except OSError:
+        return None
+
+
+def _decode_index(content):
+    """ Return the index stored in `content`, or None when it isn't an index
+    of the current format version.
+    """
+    try:
+        stored = json.loads(content.decode('utf-8'))
+    except ValueError:
+        return None
+    if not isinstance(stored, dict) or stored.get('format') != INDEX_FORMAT or \
+            stored.get('version') != INDEX_FORMAT_VERSION:
+        return None
+    index = {key: stored.get(key) for key in ('enums', 'inputs', 'types')}
+    if not all(isinstance(value, dict) for value in index.values()):
+        return None
+    return index
+
+
+def _write_cached_index(cache_path, index):
+    # The cache is best effort, a read-only location only costs a parse per process
+    try:
+        directory = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(dict(index, format=INDEX_FORMAT, version=INDEX_FORMAT_VERSION), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def _get_schema_index(self):
+    """ Return the offline schema index configured with the `schema_path`
+    client option, or None when the client validates against the server.
+    """
+    schema_path = self._kwargs.get('schema_path')
+    if not schema_path:
+        return None
+    return load_schema_index(schema_path, self._kwargs.get('schema_cache_dir'))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m rubrik_polaris.common.schema <schema.graphql> <index.json>")
+    built = build_schema_index(sys.argv[1], sys.argv[2])
+    print("Indexed {} enums, {} input types and {} types".format(
+        len(built['enums']), len(built['inputs']), len(built['types'])))
@@ -0,0 +1,276 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+"""
+Collection of methods that manage the access token of a client.
+
+The TokenManager of a client fetches its access token once, whatever the
+number of threads asking for it, and reads its expiry from the `exp` claim
+of the JWT. Once the token is within `token_refresh_margin` seconds of its
+expiry a new one is fetched in the background while the current one is
+still used, and a request rejected with a 401 is sent once more with a
+new token.
+
+With the `token_cache` client option the tokens are also shared between
+processes, in a JSON file (its path) or in the system keyring ("keyring",
+which requires the optional `keyring` dependency), under a key derived from
+the Polaris account and the user or service account. Fetching a token then
+holds a lock on the cache so parallel workers fetch it once between them.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from time import time
+
+DEFAULT_TOKEN_REFRESH_MARGIN = 300
+# Tokens this close to their expiry aren't sent anymore
+TOKEN_EXPIRY_SKEW = 30
+KEYRING_SERVICE = "rubrik_polaris"
+
+
+class TokenManager:
+    """Fetches, caches and refreshes an access token.
+
+    Args:
+        fetch (callable): Returns a new access token
+        cache (TokenFileCache|TokenKeyringCache): Optional cache shared with other processes
+        cache_key (str): Key of the token in the cache
+        refresh_margin (int): Seconds before expiry from which the token is refreshed in the background
+        logger (logging.Logger): Logger the background refresh failures are reported to
+    """
+
+    def __init__(self, fetch, cache=None, cache_key=None, refresh_margin=DEFAULT_TOKEN_REFRESH_MARGIN, logger=None):
+        self._fetch = fetch
+        self._cache = cache
+        self._cache_key = cache_key
+        self._refresh_margin = refresh_margin
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = None
+        self._refreshing = False
+
+    def get(self):
+        """Return a valid access token, fetching one if needed.
+
+        Returns:
+            str: Access token
+        """
+        with self._lock:
+            if self._token is None or self._expires_within(TOKEN_EXPIRY_SKEW):
+                self._set(self._fetch_shared(stale=self._token))
+            elif self._expires_within(self._refresh_margin) and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, name="polaris-token-refresh",
+                                 daemon=True).start()
+            return self._token
+
+    def refresh(self):
+        """Fetch a new access token and return it.
+
+        Returns:
+            str: Access token
+        """
+        with self._lock:
+            self._set(self._fetch_shared(stale=self._token))
+            return self._token
+
+    def invalidate(self, token):
+        """Stop using `token`, e.g. after Polaris rejected it. The next call to
+        `get` fetches a new token unless another thread already did."""
+        with self._lock:
+            if token == self._token:
+                self._token = None
+                self._expires_at = None
+        if self._cache is not None:
+            with self._cache.lock(self._cache_key):
+                if (self._cache.get(self._cache_key) or {}).get('token') == token:
+                    self._cache.discard(self._cache_key)
+
+    def _set(self, token):
+        self._token = token
+        self._expires_at = _decode_expiry(token)
+
+    def _expires_within(self, seconds):
+        return self._expires_at is not None and time() >= self._expires_at - seconds
+
+    def _fetch_shared(self, stale=None):
+        """ Return the cached token unless it is `stale` or about to expire,
+        else fetch a new one and cache it. """
+        if self._cache is None:
+            return self._fetch()
+
+        with self._cache.lock(self._cache_key):
+            entry = self._cache.get(self._cache_key)
+            if entry and entry.get('token') != stale and \
+                    (entry.get('expires_at') is None or time() < entry['expires_at'] - self._refresh_margin):
+                return entry['token']
+            token = self._fetch()
+            self._cache.put(self._cache_key, {"token": token, "expires_at": _decode_expiry(token)})
+            return token
+
+    def _refresh_in_background(self):
+        try:
+            with self._lock:
+                stale = self._token
+            token = self._fetch_shared(stale=stale)
+            with self._lock:
+                if self._token == stale:
+                    self._set(token)
+        except Exception as e:
+            # The current token is used until it expires, it is then fetched by the caller of `get`
+            if self._logger is not None:
+                self._logger.warning("Failed to refresh the access token: {}".format(e))
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class TokenFileCache:
+    """Access tokens shared between processes through a JSON file, readable by its owner only.
+
+    Args:
+        path (str): Path of the JSON file, a `.lock` file is created alongside it
+    """
+
+    def __init__(self, path):
+        self._path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lock(self, key):
+        """Hold an exclusive lock on the cache, across threads and processes."""
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            with open(self._path + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """Return the cached entry of `key`, or None."""
+        return self._read().get(key)
+
+    def put(self, key, entry):
+        """Cache `entry` under `key`."""
+        entries = self._read()
+        entries[key] = entry
+        self._write(entries)
+
+    def discard(self, key):
+        """Remove the entry of `key`."""
+        entries = self._read()
+        if entries.pop(key, None) is not None:
+            self._write(entries)
+
+    def _read(self):
+        try:
+            with open(self._path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        temp_path = "{}.{}.tmp".format(self._path, os.getpid())
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self._path)
+
+
+class TokenKeyringCache:
+    """Access tokens shared between processes through the system keyring.
+
+    Args:
+        service (str): Keyring service the tokens are stored under
+    """
+
+    def __init__(self, service=KEYRING_SERVICE):
+        import keyring
+
+        self._keyring = keyring
+        self._service = service
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lock(self, key):
+        """Hold a lock on the cache, across the threads of this process only."""
+        with self._lock:
+            yield
+
+    def get(self, key):
+        """Return the cached entry of `key`, or None."""
+        value = self._keyring.get_password(self._service, key)
+        try:
+            return json.loads(value) if value else None
+        except ValueError:
+            return None
+
+    def put(self, key, entry):
+        """Cache `entry` under `key`."""
+        self._keyring.set_password(self._service, key, json.dumps(entry))
+
+    def discard(self, key):
+        """Remove the entry of `key`."""
+        try:
+            self._keyring.delete_password(self._service, key)
+        except self._keyring.errors.PasswordDeleteError:
+            pass
+
+
+def _decode_expiry(token):
+    """ Return the expiry timestamp of a JWT access token, or None when the
+    token isn't a JWT or has no `exp` claim. The signature isn't verified,
+    Polaris does it.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _build_token_cache(token_cache):
+    """ Return the cache of the `token_cache` client option, or None. """
+    if not token_cache:
+        return None
+    if token_cache == "keyring":
+        return TokenKeyringCache()
+    return TokenFileCache(token_cache)
+
+
+def _token_cache_key(token_uri, account):
+    """ Return the cache key of the tokens of `account` (user or service account) on a Polaris account. """
+    return hashlib.sha256("{}|{}".format(token_uri, account).encode()).hexdigest()
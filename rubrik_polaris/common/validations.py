@@ -18,7 +18,12 @@
 #  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 
+import threading
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor
+from rubrik_polaris.common.connection import _recording_requests
 from rubrik_polaris.exceptions import ValidationException
+from types import SimpleNamespace
 from uuid import UUID
 
 ERROR_MESSAGES = {
@@ -32,144 +37,380 @@ ERROR_MESSAGES = {
 }
 
 
-def _validate(self, **kwargs):
+# Enum each validation checks its values against
+ENUM_VALIDATIONS = {
+    'aws_region': "AwsNativeRegion",
+    'aws_regions': "AwsNativeRegion",
+    'aws_instance_type': "AwsNativeEc2InstanceType",
+    'azure_cloud_type': "AzureCloudType",
+    'azure_regions': "AzureCloudAccountRegion",
+    'cloud_account_action': "CloudAccountAction",
+    'cloud_account_features': "CloudAccountFeature",
+    'kupr_cluster_type': "K8sClusterProtoType",
+}
+
+# Validations that look the AWS accounts up
+ACCOUNT_VALIDATIONS = ('aws_account_number', 'aws_native_account_id', 'aws_vpc')
+
+MAX_PREFETCH_WORKERS = 4
+
+
+class ValidationFacts:
+    """Remote facts looked up to validate arguments (snapshots, enums, accounts,
+    VPCs, ...), each fetched once and shared by the validators that need it.
+
+    Every fetch is recorded in `loads`, as a dict with the `fact` name, its
+    `args` and the `seconds` it took, along with the `error` when it failed.
+    Every GraphQL request a fetch sent is recorded in `trace`, as a dict with
+    the `fact` name and `args`, the request `operation` name, its `seconds`,
+    and its HTTP `status` or `error`, so a fetch answered from a client cache
+    has no request and a batched fetch of several facts has a single one.
+    The facts of one `_validate` call are shared with the validations it
+    nests, and a bulk operation can share them across its items.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._loading = {}
+        self.loads = []
+        self.trace = []
+
+    def get(self, key, load):
+        """Return the fact named by `key`, a tuple of the fact name and its
+        arguments, fetching it with `load` unless it was already fetched.
+        A failed fetch raises its exception again for every validator.
+        """
+        value, error = self._load(key, load)
+        if error is not None:
+            raise error
+        return value
+
+    def peek(self, key):
+        """Return the fact named by `key` if it was fetched successfully, None otherwise."""
+        with self._lock:
+            value, error = self._values.get(key, (None, None))
+        return value if error is None else None
+
+    def put(self, key, value):
+        """Record a fact fetched outside of the store."""
+        with self._lock:
+            self._values.setdefault(key, (value, None))
+
+    def load_many(self, name, ids, load):
+        """Fetch the facts `(name, id)` of several ids with a single batched
+        `load`, called with the ids not fetched yet and returning a dict of
+        id to fact. When the batch fails nothing is recorded, each fact is
+        then fetched on its own by `get`.
+        """
+        with self._lock:
+            ids = [i for i in dict.fromkeys(ids) if (name, i) not in self._values and (name, i) not in self._loading]
+        if not ids:
+            return
+        value, error, elapsed, requests = _timed_load(lambda: load(ids))
+        with self._lock:
+            if error is None:
+                for i, fact in value.items():
+                    self._values.setdefault((name, i), (fact, None))
+            self._record(name, (), elapsed, error, requests, count=len(ids))
+
+    def prefetch(self, loads):
+        """Fetch the facts of `loads`, a dict of key to loader that don't
+        depend on each other, concurrently when there are several.
+        """
+        with self._lock:
+            loads = {key: load for key, load in loads.items() if key not in self._values}
+        if len(loads) == 1:
+            self._load(*next(iter(loads.items())))
+        elif loads:
+            with ThreadPoolExecutor(max_workers=min(len(loads), MAX_PREFETCH_WORKERS)) as executor:
+                list(executor.map(lambda item: self._load(*item), loads.items()))
+
+    def _load(self, key, load):
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            loading = self._loading.get(key)
+            owner = loading is None
+            if owner:
+                loading = self._loading[key] = threading.Event()
+        if not owner:
+            # Concurrent validations sharing the store wait for the fetch in flight
+            loading.wait()
+            with self._lock:
+                return self._values[key]
+
+        value, error, elapsed, requests = _timed_load(load)
+        with self._lock:
+            self._values.setdefault(key, (value, error))
+            self._record(key[0], key[1:], elapsed, error, requests)
+            del self._loading[key]
+        loading.set()
+        return self._values[key]
+
+    def _record(self, name, args, elapsed, error, requests, count=None):
+        entry = {'fact': name, 'args': args, 'seconds': elapsed}
+        if count is not None:
+            entry['count'] = count
+        if error is not None:
+            entry['error'] = str(error)
+        self.loads.append(entry)
+        self.trace.extend(dict(request, fact=name, args=args) for request in requests)
+
+
+def _timed_load(load):
+    """ Call `load`, returning its value or error, the seconds it took and
+    the GraphQL requests it sent from this thread.
+    """
+    start = monotonic()
+    value, error = None, None
+    with _recording_requests([]) as requests:
+        try:
+            value = load()
+        except Exception as e:
+            error = e
+    return value, error, monotonic() - start, requests
+
+
+class ValidationContext(SimpleNamespace):
+    """Values checked by a single `_validate` call, as attributes named after
+    its keyword arguments, along with the details looked up to check them
+    (e.g. `snapshot_details`, `aws_account_map`). Each call has its own
+    context, so concurrent calls on a shared client don't see each other's.
+
+    The remote facts the validators looked up are kept in `facts`, and the
+    GraphQL requests they sent in `trace`.
+    """
+
+    def __init__(self, facts=None):
+        super().__init__()
+        self.facts = facts if facts is not None else ValidationFacts()
+
+    @property
+    def trace(self):
+        return self.facts.trace
+
+
+def _validate(self, facts=None, **kwargs):
+    """ Validate each keyword argument with its `_<name>_validation` function,
+    in order, and return the ValidationContext of the validated values.
+
+    The remote facts the validations need are planned up front: the ones that
+    are independent of each other are fetched concurrently, then the ones that
+    depend on them, and each is fetched once whatever the number of validators
+    reading it. `facts` shares the facts of an enclosing validation.
+    """
+    context = ValidationContext(facts)
+    context.facts.prefetch(_plan_facts(self, kwargs))
+    context.facts.prefetch(_plan_dependent_facts(self, context.facts, kwargs))
     for validation in kwargs:
         if not kwargs[validation]:
             kwargs[validation] = "NONE"
         if isinstance(kwargs[validation], list):
             for test in kwargs[validation]:
-                setattr(self, validation, globals()['_' + validation + '_validation'](self, test_variable=test))
+                setattr(context, validation,
+                        globals()['_' + validation + '_validation'](self, context, test_variable=test))
         else:
-            setattr(self, validation,
-                    globals()['_' + validation + '_validation'](self, test_variable=kwargs[validation]))
+            setattr(context, validation,
+                    globals()['_' + validation + '_validation'](self, context, test_variable=kwargs[validation]))
+    return context
+
 
+def _plan_facts(self, kwargs):
+    """ Return the facts the validations of `kwargs` need that don't depend on other facts.
+    """
+    loads = {}
+    snapshot_id = kwargs.get('snapshot_id')
+    if snapshot_id:
+        loads[('snapshot', snapshot_id)] = lambda: self._get_snapshot(snapshot_id=snapshot_id)
+    if any(validation in kwargs for validation in ACCOUNT_VALIDATIONS):
+        loads[('aws_accounts',)] = self._get_aws_accounts
+    for validation, enum_name in ENUM_VALIDATIONS.items():
+        if validation in kwargs:
+            values = kwargs[validation] if isinstance(kwargs[validation], list) else [kwargs[validation]]
+            loads.setdefault(('enum', enum_name), _enum_loader(self, enum_name, values))
+    return loads
+
+
+def _plan_dependent_facts(self, facts, kwargs):
+    """ Return the facts the validations of `kwargs` need that depend on the
+    facts of `_plan_facts`, once those are fetched.
+    """
+    loads = {}
+    snapshot = facts.peek(('snapshot', kwargs.get('snapshot_id')))
+    if snapshot and any(validation in kwargs and not kwargs[validation]
+                        for validation in ('aws_instance_name', 'aws_instance_type')):
+        loads[('ec2_instance', snapshot['snappableId'])] = _ec2_instance_loader(self, snapshot['snappableId'])
+    aws_accounts = facts.peek(('aws_accounts',))
+    account = aws_accounts and aws_accounts.accounts.get(kwargs.get('aws_account_number'))
+    if 'aws_vpc' in kwargs and account and kwargs.get('aws_region'):
+        loads[('aws_vpcs', kwargs['aws_region'], account['id'])] = \
+            _aws_vpcs_loader(self, facts, kwargs['aws_region'], account['id'])
+    return loads
 
-def _mutation_name_validation(self, test_variable=None):
+
+def _enum_loader(self, enum_name, values):
+    return lambda: _get_enum_values_for(self, enum_name, values)
+
+
+def _ec2_instance_loader(self, object_id):
+    return lambda: self.get_compute_ec2(object_id=object_id)
+
+
+def _aws_vpcs_loader(self, facts, aws_region, aws_native_account_id):
+    return lambda: self._get_aws_region_vpcs(aws_region, aws_native_account_id, facts=facts)
+
+
+def _enum_values(self, context, enum_name, test_variable):
+    return context.facts.get(('enum', enum_name), _enum_loader(self, enum_name, [test_variable]))
+
+
+def _ec2_instance(self, context):
+    object_id = context.snapshot_details['snappableId']
+    return context.facts.get(('ec2_instance', object_id), _ec2_instance_loader(self, object_id))
+
+
+def _get_enum_values_for(self, enum_name, values):
+    """ Return the values of an enum. When the offline schema index doesn't know
+    some of `values` it may be outdated, so the values are asked to Polaris.
+    """
+    return self.get_enum_values(name=enum_name, values=values)
+
+
+def _mutation_name_validation(self, context, test_variable=None):
     if test_variable not in self._graphql_query_map:
         raise ValidationException("mutation_name not found : {}".format(test_variable))
     return test_variable
 
 
-def _query_name_validation(self, test_variable=None):
+def _query_name_validation(self, context, test_variable=None):
     if test_variable not in self._graphql_query_map:
         raise ValidationException("query_name not found : {}".format(test_variable))
     return test_variable
 
 
-def _aws_native_account_id_validation(self, test_variable=None):
-    self.aws_account_map = self._get_account_map_aws()
-    for aws_account in self.aws_account_map:
-        if self.aws_account_map[aws_account]['id'] == test_variable:
-            return test_variable
+def _aws_native_account_id_validation(self, context, test_variable=None):
+    aws_accounts = context.facts.get(('aws_accounts',), self._get_aws_accounts)
+    context.aws_account_map = aws_accounts.accounts
+    if test_variable in aws_accounts.by_id:
+        return test_variable
     raise ValidationException("aws_native_account_id not found: {}".format(test_variable))
 
 
-def _aws_account_number_validation(self, test_variable=None):
-    self.aws_account_map = self._get_account_map_aws()
-    connected_accounts = []
-    if not test_variable or test_variable not in self.aws_account_map or self.aws_account_map[test_variable][
-        'status'].lower() != 'connected':
-        for account in self.aws_account_map:
-            if self.aws_account_map[account]['status'].lower() == 'connected':
-                connected_accounts.append(account)
+def _aws_account_number_validation(self, context, test_variable=None):
+    aws_accounts = context.facts.get(('aws_accounts',), self._get_aws_accounts)
+    context.aws_account_map = aws_accounts.accounts
+    connected_accounts = aws_accounts.by_status.get('connected', [])
+    if test_variable not in connected_accounts:
         raise ValidationException(
             "{} not found or not connected, valid account numbers are {}".format(test_variable, connected_accounts))
     return test_variable
 
 
-def _snapshot_id_validation(self, test_variable=None):
+def _snapshot_id_validation(self, context, test_variable=None):
     if not test_variable:
         raise ValidationException("snapshot_id not specified : {}".format(test_variable))
 
     try:
-        self.snapshot_details = self._get_snapshot(snapshot_id=test_variable)
-        if self.snapshot_details['isCorrupted']:
+        context.snapshot_details = context.facts.get(('snapshot', test_variable),
+                                                    lambda: self._get_snapshot(snapshot_id=test_variable))
+        if context.snapshot_details['isCorrupted']:
             raise ValidationException("snapshot_id appears to be corrupted : {}".format(test_variable))
-        if self.snapshot_details['isDeletedFromSource']:
+        if context.snapshot_details['isDeletedFromSource']:
             raise ValidationException("snapshot_id has been deleted from the source : {}".format(test_variable))
-        if self.snapshot_details['isExpired']:
+        if context.snapshot_details['isExpired']:
             raise ValidationException("snapshot_id is expired : {}".format(test_variable))
     except Exception as e:
         raise ValidationException("not a valid snapshot_id : {}".format(test_variable))
     return test_variable
 
 
-def _aws_regions_validation(self, test_variable=None):
-    regions = self.get_enum_values(name="AwsNativeRegion")
+def _aws_regions_validation(self, context, test_variable=None):
+    regions = _enum_values(self, context, "AwsNativeRegion", test_variable)
     if not test_variable or test_variable not in regions:
         raise ValidationException("{} not found, valid regions are {}".format(test_variable, list(regions)))
     return test_variable
 
 
-def _aws_instance_type_validation(self, test_variable=None):
-    instance_details = self.get_compute_ec2(object_id=self.snapshot_details['snappableId'])
-    instance_types = self.get_enum_values(name="AwsNativeEc2InstanceType")
+def _aws_region_validation(self, context, test_variable=None):
+    return _aws_regions_validation(self, context, test_variable=test_variable)
+
+
+def _aws_instance_type_validation(self, context, test_variable=None):
+    instance_types = _enum_values(self, context, "AwsNativeEc2InstanceType", test_variable)
     if not test_variable or test_variable not in instance_types:
-        self.instance_type = instance_details['instanceType']
+        # Exported instances keep the type of the original instance
+        instance_details = _ec2_instance(self, context)
+        return instance_details['instanceType']
+    return test_variable
 
 
-def _aws_instance_name_validation(self, test_variable=None):
-    instance_details = self.get_compute_ec2(object_id=self.snapshot_details['snappableId'])
-    if not test_variable:
-        self.instance_name = instance_details['instanceName']
+def _aws_instance_name_validation(self, context, test_variable=None):
+    if not test_variable or test_variable == "NONE":
+        instance_details = _ec2_instance(self, context)
+        return instance_details['instanceName']
+    return test_variable
 
 
-def _aws_vpc_validation(self, test_variable=None):
-    self.aws_vpcs = self._get_aws_region_vpcs(self.aws_region, self.aws_account_map[self.aws_account_number]['id'])
-    if not test_variable or test_variable not in self.aws_vpcs:
-        raise ValidationException("{} not found, valid vpcs are {}".format(test_variable, list(self.aws_vpcs)))
+def _aws_vpc_validation(self, context, test_variable=None):
+    aws_native_account_id = context.aws_account_map[context.aws_account_number]['id']
+    context.aws_vpcs = context.facts.get(('aws_vpcs', context.aws_region, aws_native_account_id),
+                                         _aws_vpcs_loader(self, context.facts, context.aws_region,
+                                                          aws_native_account_id))
+    if not test_variable or test_variable not in context.aws_vpcs:
+        raise ValidationException("{} not found, valid vpcs are {}".format(test_variable, list(context.aws_vpcs)))
     return test_variable
 
 
-def _aws_subnet_validation(self, test_variable=None):
-    if not test_variable or test_variable not in self.aws_vpcs[self.aws_vpc]['subnets']:
+def _aws_subnet_validation(self, context, test_variable=None):
+    if not test_variable or test_variable not in context.aws_vpcs[context.aws_vpc]['subnets']:
         raise ValidationException(
-            "{} not found, valid subnets are {}".format(test_variable, list(self.aws_vpcs[self.aws_vpc]['subnets'])))
+            "{} not found, valid subnets are {}".format(test_variable, list(context.aws_vpcs[context.aws_vpc]['subnets'])))
     return test_variable
 
 
-def _aws_security_group_validation(self, test_variable=None):
-    if not test_variable or test_variable not in self.aws_vpcs[self.aws_vpc]['security_groups']:
+def _aws_security_group_validation(self, context, test_variable=None):
+    if not test_variable or test_variable not in context.aws_vpcs[context.aws_vpc]['security_groups']:
         raise ValidationException("{} not found, valid security_groups are {}".format(test_variable, list(
-            self.aws_vpcs[self.aws_vpc]['security_groups'])))
+            context.aws_vpcs[context.aws_vpc]['security_groups'])))
     return test_variable
 
 
-def _copy_tags_validation(self, test_variable=None):
+def _copy_tags_validation(self, context, test_variable=None):
     if not test_variable:
         test_variable = True
     return test_variable
 
 
-def _use_replica_validation(self, test_variable=None):
+def _use_replica_validation(self, context, test_variable=None):
     if not test_variable:
         test_variable = False
     return test_variable
 
 
-def _azure_cloud_type_validation(self, test_variable=None):
-    test = self.get_enum_values(name="AzureCloudType")
+def _azure_cloud_type_validation(self, context, test_variable=None):
+    test = _enum_values(self, context, "AzureCloudType", test_variable)
     if not test_variable or test_variable not in test:
         raise ValidationException("{} not found, valid cloud types are {}".format(test_variable, list(test)))
     return test_variable
 
 
-def _azure_regions_validation(self, test_variable=None):
-    test = self.get_enum_values(name="AzureCloudAccountRegion")
+def _azure_regions_validation(self, context, test_variable=None):
+    test = _enum_values(self, context, "AzureCloudAccountRegion", test_variable)
     if not test_variable or test_variable not in test:
         raise ValidationException("{} not found, valid regions are {}".format(test_variable, list(test)))
     return test_variable
 
 
-def _cloud_account_action_validation(self, test_variable=None):
-    test = self.get_enum_values(name="CloudAccountAction")
+def _cloud_account_action_validation(self, context, test_variable=None):
+    test = _enum_values(self, context, "CloudAccountAction", test_variable)
     if not test_variable or test_variable not in test:
         raise ValidationException("{} not found, valid features are {}".format(test_variable, list(test)))
     return test_variable
 
 
-def _cloud_account_features_validation(self, test_variable=None):
-    test = self.get_enum_values(name="CloudAccountFeature")
+def _cloud_account_features_validation(self, context, test_variable=None):
+    test = _enum_values(self, context, "CloudAccountFeature", test_variable)
     if not test_variable or test_variable not in test:
         raise ValidationException("{} not found, valid features are {}".format(test_variable, list(test)))
     return test_variable
@@ -191,7 +432,7 @@ def _azure_subscription_ids(self, test_variable=None):
     return test_variable
 
 
-def _cdm_cluster_id_validation(self, test_variable=None):
+def _cdm_cluster_id_validation(self, context, test_variable=None):
     if not test_variable:
         raise ValidationException("cdm_cluster_id not specified: {}".format(test_variable))
     if not _uuid_validation(test_variable=test_variable):
@@ -199,7 +440,7 @@ def _cdm_cluster_id_validation(self, test_variable=None):
     return test_variable
 
 
-def _host_list_validation(self, test_variable=None):
+def _host_list_validation(self, context, test_variable=None):
     if not test_variable:
         raise ValidationException("host_list not specified : {}".format(test_variable))
     if isinstance(test_variable, list):
@@ -208,7 +449,7 @@ def _host_list_validation(self, test_variable=None):
     return hosts
 
 
-def _rbs_port_ranges_validation(self, test_variable=None):
+def _rbs_port_ranges_validation(self, context, test_variable=None):
     if not test_variable:
         raise ValidationException("rbs_port_ranges not specified : {}".format(test_variable))
 
@@ -219,7 +460,7 @@ def _rbs_port_ranges_validation(self, test_variable=None):
     return test_variable
 
 
-def _user_port_ranges_validation(self, test_variable=None):
+def _user_port_ranges_validation(self, context, test_variable=None):
     if not test_variable:
         raise ValidationException("user_port_ranges not specified : {}".format(test_variable))
 
@@ -230,14 +471,14 @@ def _user_port_ranges_validation(self, test_variable=None):
     return test_variable
 
 
-def _kupr_cluster_type_validation(self, test_variable=None):
-    test = self.get_enum_values(name="K8sClusterProtoType")
+def _kupr_cluster_type_validation(self, context, test_variable=None):
+    test = _enum_values(self, context, "K8sClusterProtoType", test_variable)
     if not test_variable or test_variable not in test:
         raise ValidationException("{} not found, valid kupr cluster types are {}".format(test_variable, list(test)))
     return test_variable
 
 
-def _kupr_cluster_id_validation(self, test_variable=None):
+def _kupr_cluster_id_validation(self, context, test_variable=None):
     if not UUID(test_variable):
         raise ValidationException("{} not a UUID".format(test_variable))
     return test_variable
@@ -318,7 +559,7 @@ def check_enum(self, value, field_name, enum_name):
     Returns:
         Optional[list, str]: Verified value(s)
     """
-    list_of_enum = self.get_enum_values(name=enum_name)
+    list_of_enum = _get_enum_values_for(self, enum_name, value if isinstance(value, list) else [value])
 
     if isinstance(value, str):
         if value and value not in list_of_enum:
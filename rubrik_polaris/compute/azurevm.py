@@ -28,7 +28,7 @@ def get_compute_object_ids_azure(self, match_all=True, **kwargs):
     """Retrieves all Azure VM object IDs that match query
 
     Args:
-        match_all (bool): Set to false to match ANY defined criteria
+        match_all (bool): Set to false to match ANY defined criteria, objects matching all of them included
         kwargs (str): Any top level object from the get_compute_ec2 call
 
     Returns:
@@ -38,14 +38,18 @@ def get_compute_object_ids_azure(self, match_all=True, **kwargs):
         RequestException: If the query to Polaris returned an error
     """
     try:
-        return self._get_compute_object_ids(self.get_compute_azure(), kwargs, match_all=match_all)
+        return self._get_compute_object_ids("azure_vm", self.get_compute_azure, kwargs, match_all=match_all)
     except Exception:
         raise
 
 
-def get_compute_azure(self):
+def get_compute_azure(self, filters=None, fields=None):
     """Retrieves all Azure IAAS object details
 
+    Args:
+        filters (dict): Optional `AzureNativeVirtualMachineFilters` applied by Polaris
+        fields (list|str): Optional dotted paths of the fields to request, or a projection profile such as "ids-only"
+
     Returns:
         dict: details of Azure IAAS objects
 
@@ -54,10 +58,10 @@ def get_compute_azure(self):
     """
     try:
         query_name = "compute_azure_iaas"
-        self._validate(
+        context = self._validate(
             query_name=query_name
         )
-        return self._query(self.query_name, None)
+        return self._query(context.query_name, {"filters": filters} if filters else None, fields=fields)
     except Exception:
         raise
 
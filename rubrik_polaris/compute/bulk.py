@@ -0,0 +1,172 @@
+# Copyright 2020 Rubrik, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+
+
+
+"""
+Collection of functions that restore or export compute instances in bulk.
+
+A bulk submission validates every item against a single store of validation
+facts, so the lookups the items have in common (accounts, enums, VPCs) are
+fetched once, and the snapshots and EC2 instances of the items are resolved
+with batched requests. The mutations are then submitted with bounded
+parallelism and the submitted tasks are tracked by a single `monitor_tasks`
+scheduler.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from inspect import signature
+from rubrik_polaris.exceptions import ValidationException
+from rubrik_polaris.common.monitor import DEFAULT_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL
+from rubrik_polaris.common.validations import ValidationFacts
+
+DEFAULT_BULK_WORKERS = 8
+
+# Action of a bulk item -> (function preparing its mutation, fixed arguments)
+BULK_ACTIONS = {
+    'export_ec2': ('_prepare_compute_export_ec2', {}),
+    'restore_ec2': ('_prepare_compute_restore', {'mutation_name': "compute_restore_ec2"}),
+    'restore_azure': ('_prepare_compute_restore', {'mutation_name': "compute_restore_azure"}),
+    'restore_gce': ('_prepare_compute_restore', {'mutation_name': "compute_restore_gce"}),
+}
+
+
+def submit_compute_bulk(self, items, wait=False, max_workers=DEFAULT_BULK_WORKERS, callback=None,
+                        poll_interval=DEFAULT_POLL_INTERVAL, max_poll_interval=DEFAULT_MAX_POLL_INTERVAL):
+    """Submits restores or exports of many compute instances
+
+    Each item is a dict with an `action`, one of "export_ec2", "restore_ec2", "restore_azure" or
+    "restore_gce", and the arguments of the matching `submit_compute_export_ec2` or `submit_compute_restore_*`
+    method, e.g. `{"action": "restore_ec2", "snapshot_id": "...", "should_power_on": False}`.
+
+    The progress of every item is reported as a dict with its `index` in `items`, its `action`, `snapshot_id` and
+    `status`: "INVALID" when it fails validation, along with the `error`, "ERROR" when a lookup or its submission
+    fails, along with the `error` and the `exception` raised if any, or "SUBMITTED" along with the `jobId` of its
+    task. The failure of an item doesn't stop the others. With `wait`, the item is reported again once its task is
+    "SUCCEEDED" or "FAILED", along with the `elapsed` seconds of the monitoring.
+
+    The items are submitted as soon as the method is called, whether the reports are read or not. The tasks are
+    only monitored, and `callback` only called, while the returned iterator is consumed.
+
+    Args:
+        items (list): Restores and exports to submit
+        wait (bool): Monitor the submitted tasks until they complete. Defaults to False
+        max_workers (int): Maximum number of items validated and submitted concurrently
+        callback (callable): Optional function called with each progress report
+        poll_interval (float): Initial number of seconds between two status checks of a task
+        max_poll_interval (float): Maximum number of seconds between two status checks of a task
+
+    Returns:
+        iterator: The progress reports, in the order they happen
+
+    Raises:
+        PolarisException: If the status of a task can't be retrieved
+
+    Examples:
+        >>> items = [{"action": "restore_ec2", "snapshot_id": snapshot_id} for snapshot_id in snapshot_ids]
+        >>> for report in client.submit_compute_bulk(items, wait=True):
+        ...     print(report['index'], report['status'], report.get('error'))
+    """
+    facts = ValidationFacts()
+    _prefetch_bulk_facts(self, facts, items)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(_submit_bulk_item, self, facts, index, item) for index, item in enumerate(items)]
+    # The workers keep submitting the queued items once shut down
+    executor.shutdown(wait=False)
+    return _bulk_reports(self, futures, wait, callback, poll_interval, max_poll_interval)
+
+
+def _bulk_reports(self, futures, wait, callback, poll_interval, max_poll_interval):
+    """ Yield the report of each item as its submission completes, then with
+    `wait` the reports of the submitted tasks as they complete.
+    """
+    submitted = []
+    for future in as_completed(futures):
+        report = future.result()
+        if wait and report['status'] == "SUBMITTED":
+            submitted.append(report)
+        yield _report(report, callback)
+
+    if submitted:
+        for report in self.monitor_tasks([dict(report) for report in submitted], poll_interval=poll_interval,
+                                         max_poll_interval=max_poll_interval):
+            del report['taskchainUuid']
+            yield _report(report, callback)
+
+
+def _report(report, callback):
+    # Each report is a copy, so the reports already returned don't change as the item progresses
+    report = dict(report)
+    if callback:
+        callback(report)
+    return report
+
+
+def _submit_bulk_item(self, facts, index, item):
+    arguments = dict(item)
+    action = arguments.pop('action', None)
+    report = {'index': index, 'action': action, 'snapshot_id': arguments.get('snapshot_id')}
+    try:
+        if action not in BULK_ACTIONS:
+            raise ValidationException("action not found : {}".format(action))
+        prepare, fixed_arguments = BULK_ACTIONS[action]
+        prepare = getattr(self, prepare)
+        unknown = set(arguments) - set(signature(prepare).parameters) - set(fixed_arguments) - {'facts'}
+        if unknown:
+            raise ValidationException("unknown arguments for {} : {}".format(action, ", ".join(sorted(unknown))))
+        mutation_name, variables = prepare(facts=facts, **fixed_arguments, **arguments)
+    except ValidationException as e:
+        report.update(status="INVALID", error=str(e))
+        return report
+    except Exception as e:
+        # A failed lookup only fails its own item
+        report.update(status="ERROR", error=str(e), exception=e)
+        return report
+
+    try:
+        result = self._query(mutation_name, variables)
+    except Exception as e:
+        report.update(status="ERROR", error=str(e), exception=e)
+        return report
+    if 'errors' in result and result['errors']:
+        report.update(status="ERROR", error=result['errors'][0]['message'])
+        return report
+    report.update(status="SUBMITTED", jobId=result.get('jobId'))
+    return report
+
+
+def _prefetch_bulk_facts(self, facts, items):
+    """ Resolve the snapshots of the items, and the EC2 instances of the exports
+    that keep their instance name or type, with batched requests. When a batch
+    fails, each item looks its own facts up and reports its own error.
+    """
+    facts.load_many('snapshot', [item['snapshot_id'] for item in items if item.get('snapshot_id')],
+                    self._get_snapshots)
+
+    object_ids = []
+    for item in items:
+        if item.get('action') != 'export_ec2' or (item.get('aws_instance_name') and item.get('aws_instance_type')):
+            continue
+        snapshot = facts.peek(('snapshot', item.get('snapshot_id')))
+        if snapshot and snapshot.get('snappableId'):
+            object_ids.append(snapshot['snappableId'])
+    if object_ids:
+        facts.load_many('ec2_instance', object_ids, lambda ids: self.get_compute_ec2(object_id=ids))
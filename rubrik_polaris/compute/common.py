@@ -22,24 +22,101 @@ Collection of functions that manipulate compute components
 """
 
 
-def _get_compute_object_ids(self, instances, criterias, match_all=True):
+def _tag_filter(tags):
+    return {"tagFilterParams": [{"filterType": "TAG_KEY_VALUE", "tagKey": key, "tagValue": value}
+                                for key, value in tags.items()]}
+
+
+# Criteria Polaris can filter on, per kind of object: criterion -> (filter field, filter input, exact). The
+# criteria whose filter isn't an exact match (substrings, tags) are also matched locally on the filtered listing.
+FILTER_PUSHDOWN = {
+    'aws_ec2': {
+        'region': lambda v: ('regionFilter', {"regions": [v]}, True),
+        'isRelic': lambda v: ('relicFilter', {"relic": v}, True),
+        'account_id': lambda v: ('accountFilter', {"accountIds": [v]}, True),
+        'sla_id': lambda v: ('effectiveSlaFilter', {"effectiveSlaIds": [v]}, True),
+        'instanceName': lambda v: ('nameOrIdSubstringFilter', {"nameOrIdSubstring": v}, False),
+        'tags': lambda v: ('tagFilter', _tag_filter(v), False),
+    },
+    'aws_ebs': {
+        'region': lambda v: ('regionFilter', {"regions": [v]}, True),
+        'isRelic': lambda v: ('relicFilter', {"relic": v}, True),
+        'account_id': lambda v: ('accountFilter', {"accountIds": [v]}, True),
+        'sla_id': lambda v: ('effectiveSlaFilter', {"effectiveSlaIds": [v]}, True),
+        'volumeName': lambda v: ('nameOrIdSubstringFilter', {"nameOrIdSubstring": v}, False),
+        'tags': lambda v: ('tagFilter', _tag_filter(v), False),
+    },
+    'azure_vm': {
+        'region': lambda v: ('regionFilter', {"regions": [v]}, True),
+        'isRelic': lambda v: ('relicFilter', {"relic": v}, True),
+        'account_id': lambda v: ('subscriptionFilter', {"subscriptionIds": [v]}, True),
+        'sla_id': lambda v: ('effectiveSlaFilter', {"effectiveSlaIds": [v]}, True),
+        'name': lambda v: ('nameSubstringFilter', {"nameSubstring": v}, False),
+        'tags': lambda v: ('tagFilter', _tag_filter(v), False),
+    },
+    'gcp_gce': {
+        'region': lambda v: ('regionFilter', {"regions": [v]}, True),
+        'isRelic': lambda v: ('relicFilter', {"relic": v}, True),
+        'account_id': lambda v: ('projectFilter', {"projectIds": [v]}, True),
+        'sla_id': lambda v: ('effectiveSlaFilter', {"effectiveSlaIds": [v]}, True),
+        'nativeName': lambda v: ('nameOrIdSubstringFilter', {"nameOrIdSubstring": v}, False),
+    },
+    'vsphere_vm': {
+        'name': lambda v: (None, {"field": "NAME", "texts": [v]}, False),
+    },
+}
+
+
+def _get_compute_object_ids(self, kind, load, criterias, match_all=True):
+    """ Return the ids of the objects of `kind` matching the criterias. The
+    objects are listed with `load` and matched through an ObjectIndex, cached
+    by the client, unless it has a fresh local inventory of them to query instead.
+
+    Without an inventory, the criterias Polaris can filter on are sent along
+    with the listing when all of them must match, and only the others are
+    matched locally. When none is left only the ids of the objects are listed.
+    """
     try:
-        object_ids = []
-        for instance in instances:
-            num_criteria = len(criterias)
-            num_unmatched_criteria = num_criteria
-            for key in criterias:
-                if key in instance and instance[key] == criterias[key]:
-                    num_unmatched_criteria -= 1
-            if match_all and num_unmatched_criteria == 0:
-                object_ids.append(instance['id'])
-            elif not match_all and num_criteria > num_unmatched_criteria >= 1:
-                object_ids.append(instance['id'])
-        return object_ids
+        inventory = self._get_inventory()
+        if inventory is not None:
+            if not inventory.is_fresh(kind):
+                inventory.refresh(kind, load())
+            return inventory.find(kind, criterias, match_all=match_all)
+
+        if match_all:
+            filters, criterias = _push_down_criterias(kind, criterias)
+            if filters and not criterias:
+                return [obj['id'] for obj in load(filters=filters, fields="ids-only")]
+            if filters:
+                return self._get_object_index(kind, load, filters).match(criterias)
+
+        return self._get_object_index(kind, load).match(criterias, match_all=match_all)
     except Exception:
         raise
 
 
+def _push_down_criterias(kind, criterias):
+    """ Split the criterias into the filters of the listing of `kind` objects
+    and the criterias left to match locally.
+    """
+    pushdown = FILTER_PUSHDOWN.get(kind, {})
+    filters = {}
+    filter_list = []
+    local_criterias = {}
+    for key, value in criterias.items():
+        if key not in pushdown:
+            local_criterias[key] = value
+            continue
+        field, filter_input, exact = pushdown[key](value)
+        if field is None:
+            filter_list.append(filter_input)
+        else:
+            filters[field] = filter_input
+        if not exact:
+            local_criterias[key] = value
+    return filter_list or filters, local_criterias
+
+
 def _submit_compute_restore(self, snapshot_id=None, mutation_name=None,  should_power_on=True, should_restore_tags=True, **kwargs):
     """Submits a Restore of a compute instance
 
@@ -51,19 +128,12 @@ def _submit_compute_restore(self, snapshot_id=None, mutation_name=None,  should_
         wait {bool} -- Return once complete Defaults to False
     """
 
-    self._validate(
-        snapshot_id=snapshot_id,
-        mutation_name=mutation_name
-    )
+    mutation_name, variables = self._prepare_compute_restore(snapshot_id=snapshot_id, mutation_name=mutation_name,
+                                                             should_power_on=should_power_on,
+                                                             should_restore_tags=should_restore_tags)
 
     try:
-        variables = {
-            "snapshot_id": snapshot_id,
-            "should_power_on": should_power_on,
-            "should_restore_tags": should_restore_tags
-        }
-
-        result = self._query(self.mutation_name, variables)
+        result = self._query(mutation_name, variables)
         if 'errors' in result and result['errors']:
             return {'errors': result['errors'][0]['message']}
 
@@ -76,13 +146,30 @@ def _submit_compute_restore(self, snapshot_id=None, mutation_name=None,  should_
         raise
 
 
+def _prepare_compute_restore(self, snapshot_id=None, mutation_name=None, should_power_on=True,
+                             should_restore_tags=True, facts=None):
+    """ Validate a restore of a compute instance and return its mutation name and variables.
+    """
+    context = self._validate(
+        facts=facts,
+        snapshot_id=snapshot_id,
+        mutation_name=mutation_name
+    )
+    variables = {
+        "snapshot_id": snapshot_id,
+        "should_power_on": should_power_on,
+        "should_restore_tags": should_restore_tags
+    }
+    return context.mutation_name, variables
+
+
 def _submit_compute_export(self, mutation_name=None, variables=None, wait=False):
     try:
 
-        self._validate(
+        context = self._validate(
             mutation_name=mutation_name
         )
-        result = self._query(self.mutation_name, variables)
+        result = self._query(context.mutation_name, variables)
         if 'errors' in result and result['errors']:
             return {'errors': result['errors'][0]['message']}
         results = []
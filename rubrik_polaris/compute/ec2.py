@@ -28,7 +28,7 @@ def get_compute_object_ids_ec2(self, match_all=True, **kwargs):
     """Retrieves all AWS EC2 object IDs that match query
 
     Args:
-        match_all (bool): Set to false to match ANY defined criteria
+        match_all (bool): Set to false to match ANY defined criteria, objects matching all of them included
         tags (dict): Tags in {Name: Value} format to filter on
         kwargs (str): Any top level object from the get_compute_ec2 call
 
@@ -39,57 +39,50 @@ def get_compute_object_ids_ec2(self, match_all=True, **kwargs):
         RequestException: If the query to Polaris returned an error
     """
     try:
-        object_ids = []
-        num_criteria = len(kwargs)
-        if 'tags' in kwargs:
-            num_criteria = num_criteria + len(kwargs['tags']) - 1
-        for instance in self.get_compute_ec2():
-            num_unmatched_criteria = num_criteria
-            for key in kwargs:
-                if key == 'tags' and 'tags' in instance:
-                    for instance_tag in instance['tags']:
-                        if instance_tag['key'] in kwargs['tags'] and \
-                                instance_tag['value'] == kwargs['tags'][instance_tag['key']]:
-                            num_unmatched_criteria -= 1
-                elif key in instance and instance[key] == kwargs[key]:
-                    num_unmatched_criteria -= 1
-            if match_all and num_unmatched_criteria == 0:
-                object_ids.append(instance['id'])
-            elif not match_all and num_criteria > num_unmatched_criteria >= 1:
-                object_ids.append(instance['id'])
-        return object_ids
+        return self._get_compute_object_ids("aws_ec2", self.get_compute_ec2, kwargs, match_all=match_all)
     except Exception:
         raise
 
 
-def get_compute_ec2(self, object_id=None):
+def get_compute_ec2(self, object_id=None, filters=None, fields=None):
     """Retrieves all AWS EC2 object details
 
     Args:
-        object_id (str): optional specific object id to return
+        object_id (str|list): optional specific object id to return, or list of object ids resolved with batched
+            requests
+        filters (dict): Optional `AwsNativeEc2InstanceFilters` applied by Polaris when listing all objects
+        fields (list|str): Optional dotted paths of the fields to request, or a projection profile such as "ids-only"
 
     Returns:
-        dict: details of AWS instance objects
+        dict: details of AWS instance objects, keyed by object id when `object_id` is a list
 
     Raises:
         RequestException: If the query to Polaris returned an error
     """
     try:
+        if isinstance(object_id, list):
+            object_ids = list(dict.fromkeys(object_id))
+            responses = self._query_batch("compute_aws_ec2_detail", [{"object_id": i} for i in object_ids])
+            for response in responses:
+                if isinstance(response, Exception):
+                    raise response
+            return dict(zip(object_ids, responses))
+
         if object_id:
             query_name = "compute_aws_ec2_detail"
-            self._validate(
+            context = self._validate(
                 query_name=query_name
             )
             variables = {
                 "object_id": object_id
             }
-            return self._query(self.query_name, variables)
+            return self._query(context.query_name, variables)
 
         query_name = "compute_aws_ec2"
-        self._validate(
+        context = self._validate(
             query_name=query_name
         )
-        return self._query(self.query_name, None)
+        return self._query(context.query_name, {"filters": filters} if filters else None, fields=fields)
     except Exception:
         raise
 
@@ -112,12 +105,12 @@ def submit_compute_restore_ec2(self, snapshot_id, **kwargs):
 def _get_aws_region_kmskeys(self, aws_region, aws_native_account_id):
     try:
         query_name = "compute_aws_region_kmskeys"
-        self._validate(
+        context = self._validate(
             query_name=query_name,
             aws_region=aws_region
         )
         variables = {"region": aws_region, "aws_native_account_id": aws_native_account_id}
-        return self._query(self.query_name, variables)
+        return self._query(context.query_name, variables)
     except Exception:
         raise
 
@@ -125,30 +118,31 @@ def _get_aws_region_kmskeys(self, aws_region, aws_native_account_id):
 def _get_aws_region_sshkeypairs(self, aws_region=None, aws_native_account_id=None):
     try:
         query_name = "compute_aws_region_sshkeypairs"
-        self._validate(
+        context = self._validate(
             query_name=query_name,
             aws_region=aws_region
         )
         variables = {
-            "region": self.aws_region,
-            "aws_native_account_id": self.aws_native_account_id
+            "region": context.aws_region,
+            "aws_native_account_id": aws_native_account_id
         }
-        return self._query(self.query_name, variables)
+        return self._query(context.query_name, variables)
     except Exception:
         raise
 
 
-def _get_aws_region_vpcs(self, aws_region, aws_native_account_id):
+def _get_aws_region_vpcs(self, aws_region, aws_native_account_id, facts=None):
     try:
         output = {}
         query_name = "compute_aws_region_vpcs"
-        self._validate(
+        context = self._validate(
+            facts=facts,
             query_name=query_name,
             aws_native_account_id=aws_native_account_id,
             aws_region=aws_region
         )
         variables = {"region": aws_region, "aws_native_account_id": aws_native_account_id}
-        vpcs = self._query(self.query_name, variables)
+        vpcs = self._query(context.query_name, variables)
         for vpc in vpcs:
             output[vpc['id']] = {}
             output[vpc['id']]['vpc_name'] = vpc['name']
@@ -182,10 +176,23 @@ def submit_compute_export_ec2(self, snapshot_id=None, aws_account_number=None, a
     Returns:
         dict -- List of errors if any occurred during the export
     """
-    from rubrik_polaris.exceptions import ValidationException
+    mutation_name, variables = self._prepare_compute_export_ec2(
+        snapshot_id=snapshot_id, aws_account_number=aws_account_number, aws_region=aws_region, aws_vpc=aws_vpc,
+        aws_security_groups=aws_security_groups, aws_subnet=aws_subnet, aws_instance_type=aws_instance_type,
+        aws_instance_name=aws_instance_name, copy_tags=copy_tags, use_replica=use_replica)
+
+    result = self._submit_compute_export(mutation_name=mutation_name, variables=variables, wait=wait)
+    return result
 
+
+def _prepare_compute_export_ec2(self, snapshot_id=None, aws_account_number=None, aws_region=None, aws_vpc=None,
+                                aws_security_groups=None, aws_subnet=None, aws_instance_type=None,
+                                aws_instance_name=None, copy_tags=True, use_replica=False, facts=None):
+    """ Validate an export of an EC2 instance and return its mutation name and variables.
+    """
     mutation_name = 'compute_export_ec2'
-    self._validate(
+    context = self._validate(
+        facts=facts,
         mutation_name=mutation_name,
         aws_account_number=aws_account_number,
         aws_region=aws_region,
@@ -200,19 +207,18 @@ def submit_compute_export_ec2(self, snapshot_id=None, aws_account_number=None, a
     )
 
     variables = {
-        "snapshot_id": self.snapshot_id,
-        "account_id": self.aws_account_map[aws_account_number]['id'],
-        "security_group_ids": self.aws_security_groups,
-        "subnet_id": self.aws_subnet,
-        "region": self.aws_region,
-        "instance_name": self.aws_instance_name,
-        "instance_type": self.aws_instance_type,
-        "copy_tags": self.copy_tags,
-        "use_replica": self.use_replica
+        "snapshot_id": context.snapshot_id,
+        "account_id": context.aws_account_map[aws_account_number]['id'],
+        "security_group_ids": aws_security_groups,
+        "subnet_id": context.aws_subnet,
+        "region": context.aws_region,
+        "instance_name": context.aws_instance_name,
+        "instance_type": context.aws_instance_type,
+        "copy_tags": context.copy_tags,
+        "use_replica": context.use_replica
         # Will need validations for these when requests come in.
         # "ssh_keypair_name":
         # "kms_key_id":
     }
 
-    result = self._submit_compute_export(self, mutation_name=self.mutation_name, variables=variables, wait=wait)
-    return result
+    return context.mutation_name, variables
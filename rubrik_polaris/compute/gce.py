@@ -28,7 +28,7 @@ def get_compute_object_ids_gce(self, match_all=True, **kwargs):
     """Retrieves all GCP GCE object IDs that match query
 
     Args:
-        match_all (bool): Set to false to match ANY defined criteria
+        match_all (bool): Set to false to match ANY defined criteria, objects matching all of them included
         kwargs (str): Any top level object from the get_compute_gce call
 
     Returns:
@@ -38,14 +38,18 @@ def get_compute_object_ids_gce(self, match_all=True, **kwargs):
         RequestException: If the query to Polaris returned an error
     """
     try:
-        return self._get_compute_object_ids(self.get_compute_gce(), kwargs, match_all=match_all)
+        return self._get_compute_object_ids("gcp_gce", self.get_compute_gce, kwargs, match_all=match_all)
     except Exception:
         raise
 
 
-def get_compute_gce(self):
+def get_compute_gce(self, filters=None, fields=None):
     """Retrieves all GCP GCE object details
 
+    Args:
+        filters (dict): Optional `GcpNativeGceInstanceFilters` applied by Polaris
+        fields (list|str): Optional dotted paths of the fields to request, or a projection profile such as "ids-only"
+
     Returns:
         dict: details of GCP GCE objects
 
@@ -54,10 +58,10 @@ def get_compute_gce(self):
     """
     try:
         query_name = "compute_gcp_gce"
-        self._validate(
+        context = self._validate(
             query_name=query_name
         )
-        return self._query(self.query_name, None)
+        return self._query(context.query_name, {"filters": filters} if filters else None, fields=fields)
     except Exception:
         raise
 
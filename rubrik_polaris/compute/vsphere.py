@@ -28,18 +28,22 @@ def get_compute_object_ids_vsphere(self, match_all=True, **kwargs):
     """Retrieves all vSphere objects that match query
 
     Arguments:
-        match_all {bool} -- Set to false to match ANY defined criteria
-        kwargs {} -- Any top level object from the get_compute_ec2 call
+        match_all {bool} -- Set to false to match ANY defined criteria, objects matching all of them included
+        kwargs {} -- Any top level object from the get_compute_vsphere call
     """
     try:
-        return self._get_object_ids_instances(self.get_instances_vsphere(), kwargs, match_all=match_all)
+        return self._get_compute_object_ids("vsphere_vm", self.get_compute_vsphere, kwargs, match_all=match_all)
     except Exception:
         raise
 
 
-def get_compute_vsphere(self):
+def get_compute_vsphere(self, filters=None, fields=None):
     """Retrieves all VMware VM object details (Under development)
 
+    Args:
+        filters (list): Optional list of `Filter` applied by Polaris
+        fields (list|str): Optional dotted paths of the fields to request, or a projection profile such as "ids-only"
+
     Returns:
         dict: details of VMware VM objects
 
@@ -51,7 +55,7 @@ def get_compute_vsphere(self):
         # self._validate(
         #     query_name=query_name
         # )
-        variables = {"filter": [], "first": 500}
-        return self._query(query_name, variables)
+        variables = {"filter": filters or [], "first": 500}
+        return self._query(query_name, variables, fields=fields)
     except Exception:
         raise
\ No newline at end of file
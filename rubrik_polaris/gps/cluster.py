@@ -64,14 +64,14 @@ def list_clusters(self, first: int = None, after: str = None, filters: dict = No
             variables['after'] = after.strip()
 
         if sort_by:
-            supported_sla_sort_by = self.get_enum_values(name="ClusterSortByEnum")
+            supported_sla_sort_by = self.get_enum_values(name="ClusterSortByEnum", values=[sort_by])
             if sort_by not in supported_sla_sort_by:
                 raise ValueError(ERROR_MESSAGES['INVALID_FIELD_TYPE'].format(sort_by, 'sort_by', supported_sla_sort_by))
 
             variables['sortBy'] = sort_by
 
         if sort_order:
-            supported_sla_sort_order = self.get_enum_values(name="SortOrder")
+            supported_sla_sort_order = self.get_enum_values(name="SortOrder", values=[sort_order])
             if sort_order not in supported_sla_sort_order:
                 raise ValueError(
                     ERROR_MESSAGES['INVALID_FIELD_TYPE'].format(sort_order, 'sort_order', supported_sla_sort_order))
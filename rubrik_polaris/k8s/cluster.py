@@ -60,7 +60,7 @@ def create_k8s_cluster(
     """
     try:
         _query_name = "k8s_add"
-        self._validate(
+        context = self._validate(
             mutation_name=_query_name,
             cdm_cluster_id=cdm_cluster_id,
             host_list=host_list,
@@ -69,16 +69,16 @@ def create_k8s_cluster(
             kupr_cluster_type=kupr_cluster_type,
         )
         _variables = {
-            "cdm_cluster_id": self.cdm_cluster_id,
-            "host_list": self.host_list,
+            "cdm_cluster_id": context.cdm_cluster_id,
+            "host_list": context.host_list,
             "k8s_cluster_name": k8s_cluster_name,
             "kupr_ingress_port": kupr_ingress_port,
-            "user_port_ranges": [self.user_port_ranges],
-            "rbs_port_ranges": [self.rbs_port_ranges],
-            "cluster_type": self.kupr_cluster_type,
+            "user_port_ranges": [context.user_port_ranges],
+            "rbs_port_ranges": [context.rbs_port_ranges],
+            "cluster_type": context.kupr_cluster_type,
             "proxy_url": proxy_url
         }
-        return self._query(self.mutation_name, _variables)
+        return self._query(context.mutation_name, _variables)
     except Exception as e:
         raise PolarisException("Failed to create cluster: {}".format(e))
 
@@ -98,14 +98,14 @@ def refresh_k8s_cluster(self, kupr_cluster_id, wait=False):
     """
     try:
         _query_name = "k8s_refresh"
-        self._validate(
+        context = self._validate(
             mutation_name=_query_name,
             kupr_cluster_id=kupr_cluster_id,
         )
         _variables = {
-            "kupr_cluster_id": self.kupr_cluster_id
+            "kupr_cluster_id": context.kupr_cluster_id
         }
-        _response = self._query(self.mutation_name, _variables)
+        _response = self._query(context.mutation_name, _variables)
         if wait:
             return self._monitor_task({'taskchainUuid': _response.get('taskchainId')})
         return _response
@@ -126,10 +126,10 @@ def list_k8s_clusters(self):
     """
     try:
         _query_name = "k8s_list"
-        self._validate(
+        context = self._validate(
             query_name=_query_name,
         )
-        return self._query(self.query_name)
+        return self._query(context.query_name)
     except Exception as e:
         raise PolarisException("Failed to list k8s clusters: {}".format(e))
 
@@ -148,13 +148,13 @@ def get_k8s_status(self, kupr_cluster_id):
     """
     try:
         _query_name = "k8s_status"
-        self._validate(
+        context = self._validate(
             query_name=_query_name,
             kupr_cluster_id=kupr_cluster_id,
         )
         _variables = {
-            "kupr_cluster_id": self.kupr_cluster_id,
+            "kupr_cluster_id": context.kupr_cluster_id,
         }
-        return self._query(self.query_name, _variables)
+        return self._query(context.query_name, _variables)
     except Exception as e:
         raise PolarisException("Failed to get k8s cluster status: {}".format(e))
@@ -38,13 +38,13 @@ def get_k8s_namespaces(self, query_filter=None):
     """
     try:
         _query_name = "k8s_namespaces"
-        self._validate(
+        context = self._validate(
             query_name=_query_name,
         )
         _variables = {
             "filter": query_filter,
         }
-        _request = self._query(self.query_name)
+        _request = self._query(context.query_name)
         return _request
     except Exception as e:
         raise PolarisException("Failed to create cluster: {}".format(e))
@@ -64,13 +64,13 @@ def get_k8s_namespace(self, polaris_id):
     """
     try:
         _query_name = "k8s_namespaces"
-        self._validate(
+        context = self._validate(
             query_name=_query_name,
         )
         _variables = {
             "polaris_id": polaris_id,
         }
-        _request = self._query(self.query_name, _variables)
+        _request = self._query(context.query_name, _variables)
         return _request
     except Exception as e:
         raise PolarisException("Failed to create cluster: {}".format(e))
@@ -124,7 +124,7 @@ def trigger_ioc_scan(self, object_ids: Union[str, List[str]], cluster_id: str,
         if requested_hash_types:
             if not isinstance(requested_hash_types, list):
                 requested_hash_types = [requested_hash_types]
-            supported_hash_types = self.get_enum_values(name="HashType")
+            supported_hash_types = self.get_enum_values(name="HashType", values=requested_hash_types)
             if not set(requested_hash_types).issubset(supported_hash_types):
                 raise ValueError(
                     ERROR_MESSAGES['INVALID_FIELD_TYPE'].format(requested_hash_types, 'requested_hash_types',
@@ -24,8 +24,12 @@ import urllib3
 import re
 import json
 import logging
-from .exceptions import RequestException
+import threading
+from .exceptions import RequestException, AuthenticationException
 from .logger import logging_setup
+from .common.connection import PAGINATION_STATS
+from .common.retry import RetryPolicy, TokenBucket
+from .common.token import TokenManager, DEFAULT_TOKEN_REFRESH_MARGIN, _build_token_cache, _token_cache_key
 
 """Instantiates Polaris connection context
 Args:
@@ -35,6 +39,29 @@ Args:
     root_domain (str): Polaris root domain only if not *.my.rubrik.com
     insecure (bool): Allow unverified SSL keys
     json_keyfile (str): Service account credential file (used exclusive of first 4 options.
+    pool_size (int): Number of keep-alive connections kept in the HTTP connection pool (default 10)
+    max_retries (int): Number of times a failed request is sent again, used as `RetryPolicy(max_attempts=max_retries + 1)`
+        when `retry_policy` isn't provided, or as the connection error retries of the transport when it is None (default 3)
+    keep_alive (bool): Reuse connections across requests (default True)
+    enum_cache_ttl (int): Seconds enum values retrieved through introspection are cached for, 0 to disable (default 3600)
+    schema_path (str): GraphQL schema (e.g. the repository's schema.graphql) or prebuilt index to validate enums offline
+    schema_cache_dir (str): Directory where the parsed schema index is cached (default ~/.cache/rubrik_polaris)
+    batch_size (int): Number of lookups resolved by a single batched request (default 50)
+    coalesce (bool): Share identical in-flight queries between threads and batch the distinct ones (default False)
+    coalesce_window (float): Seconds concurrent queries are collected for before being sent (default 0.005)
+    inventory_path (str): SQLite database (or ":memory:") where listed objects are kept to match object-ID lookups
+    inventory_ttl (int): Seconds after which the objects in the inventory are listed again (default 900)
+    object_index_ttl (int): Seconds the index of a listing matched by object-ID lookups is reused, 0 to disable (default 0)
+    adaptive_page_size (bool): Adjust the page size of paginated queries to the latency and size of pages (default False)
+    max_page_size (int): Largest page size reached with `adaptive_page_size` (default 1000)
+    target_page_latency (float): Seconds a page should take to be received with `adaptive_page_size` (default 2.0)
+    target_page_bytes (int): Bytes a page body should stay under with `adaptive_page_size` (default 4194304)
+    retry_policy (RetryPolicy): How transient request failures are retried, None to disable (default RetryPolicy())
+    rate_limit (float): Requests per second sent at most on average, shared by all threads (default unlimited)
+    rate_limit_burst (int): Requests sent at once above `rate_limit` after a pause (default `rate_limit`)
+    token_cache (str): JSON file, or "keyring", where access tokens are shared between processes (default None)
+    token_refresh_margin (int): Seconds before its expiry from which the access token is refreshed (default 300)
+    account_map_ttl (int): Seconds the AWS account map used by validations is kept for (default 300)
 Returns:
     object: Polaris connection context
 Raises:
@@ -43,7 +70,7 @@ Raises:
 class PolarisClient:
     # Public
     from .common.core import get_sla_domains, submit_on_demand, submit_assign_sla, get_task_status, \
-        get_snapshots, get_event_series_list, get_report_data, get_polaris_version
+        get_task_statuses, get_snapshots, get_event_series_list, get_report_data, get_polaris_version
     from .accounts.aws import get_accounts_aws, get_accounts_aws_detail, get_account_aws_native_id, add_account_aws, \
         delete_account_aws
     from .accounts.azure import get_accounts_azure_native, add_account_azure, delete_account_azure, \
@@ -55,8 +82,13 @@ class PolarisClient:
     from .compute.azurevm import get_compute_object_ids_azure, get_compute_azure, submit_compute_restore_azure
     from .compute.gce import get_compute_object_ids_gce, get_compute_gce, submit_compute_restore_gce
     from .compute.vsphere import get_compute_vsphere, get_compute_object_ids_vsphere
+    from .compute.bulk import submit_compute_bulk
     from .storage.ebs import get_storage_object_ids_ebs, get_storage_ebs
-    from .common.graphql import get_enum_values
+    from .common.graphql import get_enum_values, warm_enum_cache, invalidate_enum_cache
+    from .common.connection import get_connection_stats, get_pagination_stats
+    from .common.monitor import monitor_tasks
+    from .common.inventory import invalidate_inventory
+    from .common.paging import get_page_sizes
     from .cluster import get_cdm_cluster_location, get_cdm_cluster_connection_status
     from .appflows import get_appflows_blueprints
     from .common.validations import check_first_arg, to_boolean, validate_id, check_enum
@@ -73,25 +105,32 @@ class PolarisClient:
     from .gps.cluster import list_clusters
     from .radar.anomaly import get_analysis_status
     from .radar.ioc import trigger_ioc_scan, get_ioc_scan_list, get_ioc_scan_result
-    from .common.core import list_event_series
+    from .common.core import list_event_series, sync_event_series
     from .common.object import list_objects
     from .common.object import list_object_snapshots
     from .k8s.cluster import create_k8s_cluster, refresh_k8s_cluster, list_k8s_clusters, get_k8s_status
     from .k8s.namespace import get_k8s_namespaces, get_k8s_namespace
 
     # Private
-    from .common.connection import _query, _query_paginated, _query_raw, _named_raw_query, _get_access_token_basic, _get_access_token_keyfile
+    from .common.connection import _query, _query_paginated, _query_raw, _named_raw_query, _get_access_token_basic, \
+        _get_access_token_keyfile, _build_session, _query_paginated_partitioned
     from .common.validations import _validate
     from .compute.ec2 import _get_aws_region_vpcs, _get_aws_region_kmskeys, _get_aws_region_sshkeypairs
-    from .compute.common import _submit_compute_restore, _get_compute_object_ids, _submit_compute_export
-    from .common.monitor import _monitor_job, _monitor_threader, _monitor_task
+    from .compute.common import _submit_compute_restore, _get_compute_object_ids, _submit_compute_export, \
+        _prepare_compute_restore
+    from .compute.ec2 import _prepare_compute_export_ec2
+    from .common.monitor import _monitor_task
     from .common.graphql import _dump_nodes, _get_details_from_graphql_query
-    from .common.core import _get_snapshot
+    from .common.schema import _get_schema_index
+    from .common.inventory import _get_inventory
+    from .common.filters import _get_object_index, _invalidate_object_indexes
+    from .common.core import _get_snapshot, _get_snapshots
+    from .common.batch import _query_batch
     from .common.user import get_user_downloads
     from .accounts.aws import _invoke_account_delete_aws, _invoke_aws_stack, _commit_account_delete_aws, \
         _update_account_aws, \
         _destroy_aws_stack, _disable_account_aws, _get_aws_profiles, _add_account_aws, _delete_account_aws, \
-        _update_account_aws_initiate, _get_account_map_aws
+        _update_account_aws_initiate, _get_account_map_aws, _get_aws_accounts, _invalidate_account_map_aws
     from .accounts.gcp import _get_gcp_native_project, _delete_account_gcp_project, \
         _disable_account_gcp_project, _get_account_gcp_project, _get_account_gcp_permissions_cnp, \
         _get_account_gcp_project_uuid_by_string
@@ -125,6 +164,55 @@ class PolarisClient:
         self._kwargs = kwargs
         self._data_path = "{}/graphql/".format(os.path.dirname(os.path.realpath(__file__)))
 
+        # Retries of transient failures and pacing of the requests sent to Polaris
+        if 'retry_policy' in self._kwargs:
+            self._retry_policy = self._kwargs['retry_policy']
+        elif 'max_retries' in self._kwargs:
+            self._retry_policy = RetryPolicy(max_attempts=self._kwargs['max_retries'] + 1)
+        else:
+            self._retry_policy = RetryPolicy()
+        self._rate_limiter = None
+        if self._kwargs.get('rate_limit'):
+            self._rate_limiter = TokenBucket(self._kwargs['rate_limit'], self._kwargs.get('rate_limit_burst'))
+
+        # Pooled HTTP session shared by all requests of this client
+        self._session = self._build_session()
+
+        self._stats_lock = threading.Lock()
+        self._pagination_stats = dict.fromkeys(PAGINATION_STATS, 0)
+
+        self._enum_cache = {}
+        self._enum_cache_lock = threading.Lock()
+
+        # Opt-in sharing and batching of the queries of concurrent callers
+        self._coalescer = None
+        if self._kwargs.get('coalesce'):
+            from .common.coalesce import QueryCoalescer, DEFAULT_COALESCE_WINDOW
+            self._coalescer = QueryCoalescer(self, self._kwargs.get('coalesce_window', DEFAULT_COALESCE_WINDOW))
+
+        # Opt-in adaptive sizing of the pages of paginated queries
+        self._page_sizes = None
+        if self._kwargs.get('adaptive_page_size'):
+            from .common.paging import PageSizeController, DEFAULT_MAX_PAGE_SIZE, DEFAULT_TARGET_PAGE_LATENCY, \
+                DEFAULT_TARGET_PAGE_BYTES
+            self._page_sizes = PageSizeController(
+                max_size=self._kwargs.get('max_page_size', DEFAULT_MAX_PAGE_SIZE),
+                target_latency=self._kwargs.get('target_page_latency', DEFAULT_TARGET_PAGE_LATENCY),
+                target_bytes=self._kwargs.get('target_page_bytes', DEFAULT_TARGET_PAGE_BYTES)
+            )
+
+        # AWS account map shared by the validations, listed again after `account_map_ttl` seconds
+        self._aws_accounts = None
+        self._aws_accounts_lock = threading.Lock()
+
+        # Local inventory of listed objects, opened on first use
+        self._inventory = None
+        self._inventory_lock = threading.Lock()
+
+        # Indexes of the listings matched by object-ID lookups without an inventory
+        self._object_indexes = {}
+        self._object_indexes_lock = threading.Lock()
+
         # Switch off SSL checks if needed
         if 'insecure' in self._kwargs and self._kwargs['insecure']:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -136,18 +224,28 @@ class PolarisClient:
             self._baseurl = "https://{}.my.rubrik.com/api".format(self._domain)
 
         try:
-            self._access_token = None
             self._user_agent = self._kwargs.get('user_agent')
-            self._headers = {}
 
+            account = self._username
             if self._json_keyfile:
                 with open(self._json_keyfile) as f:
                     json_key = json.load(f)
                 self._baseurl = re.sub(r"/client_token", "", json_key['access_token_uri'])
+                account = json_key['client_id']
 
             elif self._json_data:
                 json_data = json.loads(self._json_data)
                 self._baseurl = re.sub(r"/client_token", "", json_data['access_token_uri'])
+                account = json_data['client_id']
+
+            # Access token fetched on first use, refreshed before it expires
+            self._token_manager = TokenManager(
+                self._request_access_token,
+                cache=_build_token_cache(self._kwargs.get('token_cache')),
+                cache_key=_token_cache_key(self._baseurl, account),
+                refresh_margin=self._kwargs.get('token_refresh_margin', DEFAULT_TOKEN_REFRESH_MARGIN),
+                logger=self.logger
+            )
 
             # Get graphql content
             (self._graphql_query_map) = _build_graphql_maps(self)
@@ -160,6 +258,19 @@ class PolarisClient:
             self.logger.error(e)
             raise
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections of the client, and its local inventory."""
+        self._session.close()
+        if self._inventory is not None:
+            self._inventory.close()
+            self._inventory = None
+
     @staticmethod
     def _get_cred(env_key, override=None):
         cred = None
@@ -173,33 +284,40 @@ class PolarisClient:
         return cred
 
     def authenticate(self):
+        """Fetch a new access token, unless a process sharing the token cache already did, and return it."""
+        return self._token_manager.refresh()
+
+    def _request_access_token(self):
+        # The credentials are kept for the token to be fetched again once it expires
         if self._json_keyfile:
             with open(self._json_keyfile) as f:
                 json_key = json.load(f)
-            self._access_token = self._get_access_token_keyfile(json_key=json_key)
+            access_token = self._get_access_token_keyfile(json_key=json_key)
             self.logger.info("Retrieved access token using json key file.")
 
         elif self._json_data:
             json_data = json.loads(self._json_data)
-            self._access_token = self._get_access_token_keyfile(json_key=json_data)
+            access_token = self._get_access_token_keyfile(json_key=json_data)
             self.logger.info("Retrieved access token using json data.")
 
         elif self._username and self._password:
-            self._access_token = self._get_access_token_basic()
-            del (self._username, self._password)
+            access_token = self._get_access_token_basic()
             self.logger.info("Retrieved access token using username and password.")
 
-        return self._access_token
+        else:
+            self.logger.critical("Required credentials are missing!")
+            raise AuthenticationException('Required credentials are missing! No json key file, JSON data or username '
+                                          'and password to retrieve an access token with.')
+
+        return access_token
 
     def prepare_headers(self):
+        """Return the headers of a request to Polaris, built anew for every request so threads don't share them."""
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Authorization': 'Bearer ' + self._token_manager.get()
+        }
         if self._user_agent:
-            self._headers['User-Agent'] = self._user_agent
-        self._headers['Content-Type'] = 'application/json'
-        self._headers['Accept'] = 'application/json'
-
-        if self._access_token:
-            self._headers['Authorization'] = 'Bearer ' + self._access_token
-        else:
-            self._headers['Authorization'] = 'Bearer ' + self.authenticate()
-
-        return self._headers
+            headers['User-Agent'] = self._user_agent
+        return headers
@@ -28,7 +28,7 @@ def get_storage_object_ids_ebs(self, match_all=True, **kwargs):
     """Retrieves ObjectIds for EBS Snappables from Polaris
 
     Args:
-        match_all (bool): Set to False to match ANY defined criteria
+        match_all (bool): Set to False to match ANY defined criteria, objects matching all of them included
         tags (dict): Optional allows simple qualification of tags
         kwargs (dict): Optional any top level object from the get_storage_ebs call
 
@@ -47,35 +47,17 @@ def get_storage_object_ids_ebs(self, match_all=True, **kwargs):
     """
 
     try:
-        object_ids = []
-
-        for volume in self.get_storage_ebs():
-            num_criteria = len(kwargs)
-            if 'tags' in kwargs:
-                num_criteria = num_criteria + len(kwargs['tags']) - 1
-            num_unmatched_criteria = num_criteria
-
-            for key in kwargs:
-                if key == 'tags' and 'tags' in volume:
-                    for volume_tag in volume['tags']:
-                        if volume_tag['key'] in kwargs['tags'] and \
-                           volume_tag['value'] == kwargs['tags'][volume_tag['key']]:
-                            num_unmatched_criteria -= 1
-                elif key in volume and volume[key] == kwargs[key]:
-                    num_unmatched_criteria -= 1
-            if match_all and num_unmatched_criteria == 0:
-                object_ids.append(volume['id'])
-            elif not match_all and num_criteria > num_unmatched_criteria >= 1:
-                object_ids.append(volume['id'])
-        return object_ids
+        return self._get_compute_object_ids("aws_ebs", self.get_storage_ebs, kwargs, match_all=match_all)
     except Exception:
         raise
 
 
-def get_storage_ebs(self):
+def get_storage_ebs(self, filters=None, fields=None):
     """Retrieves details for all EBS Snappables from Polaris
 
     Args:
+        filters (dict): Optional `AwsNativeEbsVolumeFilters` applied by Polaris
+        fields (list|str): Optional dotted paths of the fields to request, or a projection profile such as "ids-only"
 
     Returns:
         dict: Dictionary of all EBS Snappable details
@@ -88,6 +70,6 @@ def get_storage_ebs(self):
     """
     try:
         query_name = "storage_aws_ebs"
-        return self._query(query_name, None)
+        return self._query(query_name, {"filters": filters} if filters else None, fields=fields)
     except Exception:
         raise
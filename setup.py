@@ -52,6 +52,10 @@ setuptools.setup(
         'pyasn1<0.5.0,>=0.4.6',
         'httplib2 <1dev, >=0.15.0'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'stream': ['ijson']
+    },
     include_package_data=True,
     data_files = [
         ('rubrik_polaris/graphql', glob('rubrik_polaris/common/graphql/*'))
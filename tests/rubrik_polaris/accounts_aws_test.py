@@ -0,0 +1,66 @@
+import pytest
+
+from rubrik_polaris.exceptions import ValidationException
+
+ACCOUNT_DETAIL = {"awsCloudAccounts": [
+    {"awsCloudAccount": {"nativeId": "111111111111", "id": "polaris-1", "accountName": "prod"},
+     "featureDetails": [{"feature": "CLOUD_NATIVE_PROTECTION", "status": "CONNECTED", "awsRegions": ["US_EAST_1"]}]},
+    {"awsCloudAccount": {"nativeId": "222222222222", "id": "polaris-2", "accountName": "dev"},
+     "featureDetails": [{"feature": "CLOUD_NATIVE_PROTECTION", "status": "DISCONNECTED", "awsRegions": []}]},
+]}
+
+
+@pytest.fixture()
+def account_lookups(monkeypatch, client):
+    lookups = []
+
+    def get_accounts_aws_detail(filter):
+        lookups.append(filter)
+        return ACCOUNT_DETAIL
+    monkeypatch.setattr(client, "get_accounts_aws_detail", get_accounts_aws_detail)
+    return lookups
+
+
+def test_validate_when_account_map_is_shared(client, account_lookups):
+    """ Test case scenario when both account validations of a call use a single listing """
+    context = client._validate(aws_account_number="111111111111", aws_native_account_id="polaris-1")
+    client._validate(aws_native_account_id="polaris-1")
+
+    assert context.aws_account_map["111111111111"] == {
+        "id": "polaris-1", "account_name": "prod", "status": "CONNECTED", "regions": {"US_EAST_1": {}}
+    }
+    assert client._get_aws_accounts().by_id == {"polaris-1": "111111111111", "polaris-2": "222222222222"}
+    assert client._get_aws_accounts().by_status == {"connected": ["111111111111"], "disconnected": ["222222222222"]}
+    assert account_lookups == [""]
+
+
+def test_validate_when_account_is_not_connected(client, account_lookups):
+    """ Test case scenario when the error lists the connected accounts """
+    with pytest.raises(ValidationException) as e:
+        client._validate(aws_account_number="222222222222")
+    assert "['111111111111']" in str(e.value)
+
+
+def test_get_account_map_aws_when_map_expires(monkeypatch, client, account_lookups):
+    """ Test case scenario when the accounts are listed again after the TTL """
+    now = [1000.0]
+    monkeypatch.setattr("rubrik_polaris.accounts.aws.time", lambda: now[0])
+
+    client._get_account_map_aws()
+    now[0] += 299
+    client._get_account_map_aws()
+    now[0] += 1
+    client._get_account_map_aws()
+
+    assert len(account_lookups) == 2
+
+
+def test_delete_account_aws_when_account_map_is_cached(monkeypatch, client, account_lookups):
+    """ Test case scenario when removing an account invalidates the account map """
+    monkeypatch.setattr(client, "_delete_account_aws", lambda **kwargs: None)
+
+    client._get_account_map_aws()
+    client.delete_account_aws(aws_access_key_id="key", aws_secret_access_key="secret")
+    client._get_account_map_aws()
+
+    assert len(account_lookups) == 2
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import util_load_json
+
+pytest.importorskip("aiohttp")
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body, dict(self.headers)))
+        if self.path == "/api/session":
+            payload = {"access_token": "dummy"}
+        else:
+            payload = self.server.responder(body)
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), GraphQLHandler)
+    httpd.requests = []
+    httpd.responder = lambda body: {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture()
+def async_client(server):
+    from rubrik_polaris.async_polaris import AsyncPolarisClient
+
+    client_obj = AsyncPolarisClient(domain="rubrik-se-beta", username="dummy_username", password="dummy_password")
+    client_obj._baseurl = "http://127.0.0.1:{}/api".format(server.server_port)
+    return client_obj
+
+
+def test_query_when_many_concurrent_queries_are_awaited(server, async_client):
+    """ Test case scenario when concurrent queries share a single authentication """
+    server.responder = lambda body: {"data": {"polarisSnapshot": {"snappableId": body['variables']['snapshot_id']}}}
+
+    async def run():
+        async with async_client:
+            return await asyncio.gather(*[
+                async_client._query("core_snappable_snapshot", {"snapshot_id": str(i)}) for i in range(20)
+            ])
+
+    response = asyncio.run(run())
+
+    assert response == [{"snappableId": str(i)} for i in range(20)]
+    paths = [path for path, _, _ in server.requests]
+    assert paths.count("/api/session") == 1
+    assert paths.count("/api/graphql") == 20
+    assert all(headers['Authorization'] == 'Bearer dummy' for path, _, headers in server.requests
+               if path == "/api/graphql")
+
+
+def test_query_paginated_when_response_has_several_pages(server, async_client):
+    """ Test case scenario when the async generator follows the page cursor """
+    def responder(body):
+        after = body['variables'].get('after')
+        return {"data": {"snappableConnection": {
+            "edges": [{"node": {"fid": after or "first"}}],
+            "pageInfo": {"endCursor": "second", "hasNextPage": after is None}
+        }}}
+    server.responder = responder
+
+    async def run():
+        async with async_client:
+            return [node async for node in async_client._query_paginated("core_report_data", {"first": 1})]
+
+    assert asyncio.run(run()) == [{"fid": "first"}, {"fid": "second"}]
+
+
+def test_named_raw_query_when_error_is_returned(server, async_client):
+    """ Test case scenario when Polaris returns a GraphQL error """
+    from rubrik_polaris.exceptions import RequestException
+
+    server.responder = lambda body: {"errors": [{
+        "message": "denied", "path": ["polarisSnapshot"],
+        "extensions": {"code": 403, "trace": {"traceId": "abc"}}
+    }]}
+
+    async def run():
+        async with async_client:
+            return await async_client._named_raw_query("core_snappable_snapshot", {"snapshot_id": "1"})
+
+    with pytest.raises(RequestException) as e:
+        asyncio.run(run())
+    assert "denied" in str(e.value)
+
+
+def test_named_raw_query_when_valid_values_are_provided(server, async_client):
+    """ Test case scenario when the raw response is returned unchanged """
+    expected_response = util_load_json(
+        os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_data/query_result.json")
+    )
+    server.responder = lambda body: expected_response
+
+    async def run():
+        async with async_client:
+            return await async_client._named_raw_query("polaris_object_search", {"first": 1})
+
+    assert asyncio.run(run()) == expected_response
+    _, body, _ = server.requests[-1]
+    assert body['operationName'] == async_client._graphql_query_map['polaris_object_search']['operation_name']
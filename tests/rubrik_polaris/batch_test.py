@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import BASE_URL, _graphql_requests
+from rubrik_polaris.exceptions import RequestException
+
+
+def test_build_batch_query_when_query_has_alias_and_fragments(client):
+    """ Test case scenario when an aliased field and its fragments are batched """
+    from rubrik_polaris.common.batch import _build_batch_query
+
+    q = client._graphql_query_map["polaris_vm_object_metadata"]
+    batch_query, operation_name, keys = _build_batch_query(q['query_text'], q['operation_name'], 2)
+
+    assert operation_name == "SdkPythonPolarisVmObjectMetadataBatch"
+    assert keys == ("vSphereDetailData",)
+    assert "($id_0 : UUID !, $id_1 : UUID !)" in batch_query
+    assert "b0_vSphereDetailData : vSphereVmNew ( fid : $id_0 )" in batch_query
+    assert "b1_vSphereDetailData : vSphereVmNew ( fid : $id_1 )" in batch_query
+    assert batch_query.count("fragment EffectiveSLADomainFragment on SlaDomain") == 1
+
+
+def test_query_batch_when_lookups_are_chunked(requests_mock, client):
+    """ Test case scenario when results and per-alias errors are returned in order """
+    responses = [
+        {'json': {"data": {
+            "b0_polarisSnapshot": {"snappableId": "s0"},
+            "b1_polarisSnapshot": None
+        }, "errors": [{"message": "missing", "path": ["b1_polarisSnapshot"], "extensions": {"code": 404, "trace": {}}}]}},
+        {'json': {"data": {"b0_polarisSnapshot": {"snappableId": "s2"}}}},
+    ]
+    requests_mock.post(BASE_URL + "/graphql", responses)
+
+    results = client._query_batch("core_snappable_snapshot", [{"snapshot_id": str(i)} for i in range(3)],
+                                  chunk_size=2)
+
+    assert results[0] == {"snappableId": "s0"}
+    assert isinstance(results[1], RequestException) and "missing" in str(results[1])
+    assert results[2] == {"snappableId": "s2"}
+    requests = _graphql_requests(requests_mock)
+    assert [r.json()['variables'] for r in requests] == [{"snapshot_id_0": "0", "snapshot_id_1": "1"}, {"snapshot_id_0": "2"}]
+
+
+def test_query_batch_when_whole_request_fails(requests_mock, client):
+    """ Test case scenario when an error isn't tied to a single lookup """
+    requests_mock.post(BASE_URL + "/graphql", json={"data": None, "errors": [
+        {"message": "denied", "extensions": {"code": 403, "trace": {}}}
+    ]})
+
+    with pytest.raises(RequestException) as e:
+        client._query_batch("core_snappable_snapshot", [{"snapshot_id": "1"}])
+    assert "denied" in str(e.value)
+
+
+def test_get_compute_ec2_when_list_of_ids_is_provided(requests_mock, client):
+    """ Test case scenario when EC2 details are resolved in a single request """
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {
+        "b0_awsNativeEc2Instance": {"id": "a", "instanceName": "one"},
+        "b1_awsNativeEc2Instance": {"id": "b", "instanceName": "two"},
+    }})
+
+    response = client.get_compute_ec2(object_id=["a", "b", "a"])
+
+    assert response == {"a": {"id": "a", "instanceName": "one"}, "b": {"id": "b", "instanceName": "two"}}
+    assert len(_graphql_requests(requests_mock)) == 1
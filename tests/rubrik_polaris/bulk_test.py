@@ -0,0 +1,161 @@
+import threading
+from time import sleep
+
+import pytest
+
+ACCOUNT_DETAIL = {"awsCloudAccounts": [
+    {"awsCloudAccount": {"nativeId": "111111111111", "id": "polaris-1", "accountName": "prod"},
+     "featureDetails": [{"feature": "CLOUD_NATIVE_PROTECTION", "status": "CONNECTED", "awsRegions": ["US_EAST_1"]}]},
+]}
+ENUMS = {"AwsNativeRegion": ["US_EAST_1", "US_WEST_2"], "AwsNativeEc2InstanceType": ["T2_MICRO"]}
+VPCS = [{"id": "vpc-1", "name": "main", "securityGroups": [{"id": "sg-1", "name": "default"}],
+         "subnets": [{"id": "subnet-1", "name": "a", "availabilityZone": "us-east-1a"}]}]
+
+
+def _snapshot(snapshot_id):
+    return {"snappableId": "ec2-" + snapshot_id, "isCorrupted": snapshot_id == "bad",
+            "isDeletedFromSource": False, "isExpired": False}
+
+
+class _Calls(list):
+    peak = 0
+
+
+@pytest.fixture()
+def polaris(monkeypatch, client):
+    calls = _Calls()
+    active = []
+    lock = threading.Lock()
+
+    def get_snapshots(snapshot_ids):
+        calls.append(("snapshots", tuple(snapshot_ids)))
+        return {snapshot_id: _snapshot(snapshot_id) for snapshot_id in snapshot_ids}
+
+    def get_compute_ec2(object_id=None, **kwargs):
+        calls.append(("ec2", tuple(object_id) if isinstance(object_id, list) else object_id))
+        instance = lambda i: {"instanceName": "name-" + i, "instanceType": "T2_MICRO"}
+        return {i: instance(i) for i in object_id} if isinstance(object_id, list) else instance(object_id)
+
+    def query(query_name, variables=None, **kwargs):
+        if query_name == "compute_aws_region_vpcs":
+            calls.append(("vpcs", variables["aws_native_account_id"]))
+            return VPCS
+        with lock:
+            active.append(query_name)
+            calls.peak = max(calls.peak, len(active))
+        sleep(0.01)
+        with lock:
+            active.remove(query_name)
+        calls.append((query_name, variables["snapshot_id"]))
+        if variables["snapshot_id"] == "rejected":
+            return {"errors": [{"message": "denied"}]}
+        return {"jobId": "job-" + variables["snapshot_id"]}
+
+    monkeypatch.setattr(client, "_get_snapshots", get_snapshots)
+    monkeypatch.setattr(client, "_get_snapshot", lambda snapshot_id: calls.append(("snapshot", snapshot_id)))
+    monkeypatch.setattr(client, "get_compute_ec2", get_compute_ec2)
+    monkeypatch.setattr(client, "get_accounts_aws_detail", lambda filter: calls.append(("accounts",)) or ACCOUNT_DETAIL)
+    monkeypatch.setattr(client, "get_enum_values", lambda name=None, offline=True, values=None: ENUMS[name])
+    monkeypatch.setattr(client, "_query", query)
+    return calls
+
+
+def _export(snapshot_id):
+    return {"action": "export_ec2", "snapshot_id": snapshot_id, "aws_account_number": "111111111111",
+            "aws_region": "US_EAST_1", "aws_vpc": "vpc-1", "aws_subnet": "subnet-1", "aws_security_groups": ["sg-1"]}
+
+
+def test_submit_compute_bulk_when_exports_share_lookups(client, polaris):
+    """ Test case scenario when the lookups of many exports are shared and batched """
+    items = [_export("s{}".format(i)) for i in range(10)]
+
+    reports = list(client.submit_compute_bulk(items, max_workers=4))
+
+    assert sorted(report['index'] for report in reports) == list(range(10))
+    assert all(report['status'] == "SUBMITTED" and report['jobId'] == "job-" + report['snapshot_id']
+               for report in reports)
+    assert [call for call in polaris if call[0] in ("snapshots", "snapshot", "ec2", "accounts", "vpcs")] == [
+        ("snapshots", tuple(item['snapshot_id'] for item in items)),
+        ("ec2", tuple("ec2-" + item['snapshot_id'] for item in items)),
+        ("accounts",),
+        ("vpcs", "polaris-1"),
+    ]
+    assert len([call for call in polaris if call[0] == "compute_export_ec2"]) == 10
+    assert 1 <= polaris.peak <= 4
+
+
+def test_submit_compute_bulk_when_reports_are_not_read(client, polaris):
+    """ Test case scenario when the items are submitted without the reports being iterated """
+    reports = client.submit_compute_bulk([_export("s{}".format(i)) for i in range(5)], max_workers=2)
+
+    for _ in range(500):
+        if len([call for call in polaris if call[0] == "compute_export_ec2"]) == 5:
+            break
+        sleep(0.01)
+    assert len([call for call in polaris if call[0] == "compute_export_ec2"]) == 5
+    assert sorted(report['index'] for report in reports) == list(range(5))
+
+
+def test_submit_compute_bulk_when_items_fail(client, polaris):
+    """ Test case scenario when invalid and rejected items are reported without stopping the others """
+    items = [{"action": "restore_ec2", "snapshot_id": "good"}, {"action": "restore_ec2", "snapshot_id": "bad"},
+             {"action": "restore_gce", "snapshot_id": "rejected"}, {"action": "unknown", "snapshot_id": "other"},
+             {"action": "restore_azure", "snapshot_id": "good", "unknown_argument": True}]
+
+    reports = {report['index']: report for report in client.submit_compute_bulk(items)}
+
+    assert reports[0]['status'] == "SUBMITTED" and reports[0]['action'] == "restore_ec2"
+    assert reports[1]['status'] == "INVALID" and "snapshot_id" in reports[1]['error']
+    assert reports[2] == {"index": 2, "action": "restore_gce", "snapshot_id": "rejected", "status": "ERROR",
+                          "error": "denied"}
+    assert reports[3]['status'] == "INVALID" and "action not found" in reports[3]['error']
+    assert reports[4]['status'] == "INVALID" and "unknown_argument" in reports[4]['error']
+
+
+def test_submit_compute_bulk_when_item_lookup_fails(monkeypatch, client, polaris):
+    """ Test case scenario when a failed lookup only fails its own item """
+    from rubrik_polaris.exceptions import RequestException
+
+    query = client._query
+
+    def failing_query(query_name, variables=None, **kwargs):
+        if query_name == "compute_aws_region_vpcs" and variables["region"] == "US_WEST_2":
+            raise RequestException("connection reset")
+        return query(query_name, variables, **kwargs)
+    monkeypatch.setattr(client, "_query", failing_query)
+    items = [_export("s{}".format(i)) for i in range(6)]
+    items[2]['aws_region'] = "US_WEST_2"
+
+    reports = {report['index']: report for report in client.submit_compute_bulk(items, max_workers=3)}
+
+    assert reports[2]['status'] == "ERROR" and "connection reset" in reports[2]['error']
+    assert isinstance(reports[2]['exception'], RequestException)
+    assert all(reports[i]['status'] == "SUBMITTED" for i in range(6) if i != 2)
+    assert len([call for call in polaris if call[0] == "compute_export_ec2"]) == 5
+
+
+def test_submit_compute_bulk_when_tasks_are_monitored(monkeypatch, client, polaris):
+    """ Test case scenario when the submitted tasks are tracked by one monitor """
+    monitored = []
+
+    def monitor_tasks(tasks, **kwargs):
+        monitored.append([task['jobId'] for task in tasks])
+        for task in tasks:
+            task['taskchainUuid'] = task['jobId']
+            task.update(status="FAILED" if task['snapshot_id'] == "s1" else "SUCCEEDED", elapsed=1.0)
+            yield task
+    monkeypatch.setattr(client, "monitor_tasks", monitor_tasks)
+    progress = []
+
+    reports = list(client.submit_compute_bulk(
+        [{"action": "restore_ec2", "snapshot_id": "s{}".format(i)} for i in range(3)] +
+        [{"action": "restore_ec2", "snapshot_id": "bad"}], wait=True, callback=progress.append))
+
+    assert progress == reports
+    assert len(monitored) == 1 and sorted(monitored[0]) == ["job-s0", "job-s1", "job-s2"]
+    statuses = {}
+    for report in reports:
+        statuses.setdefault(report['snapshot_id'], []).append(report['status'])
+    assert statuses == {"s0": ["SUBMITTED", "SUCCEEDED"], "s1": ["SUBMITTED", "FAILED"],
+                        "s2": ["SUBMITTED", "SUCCEEDED"], "bad": ["INVALID"]}
+    assert all("taskchainUuid" not in report for report in reports)
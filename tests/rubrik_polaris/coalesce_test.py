@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+
+from conftest import BASE_URL, _graphql_requests
+
+
+@pytest.fixture()
+def coalescing_client(make_client):
+    return make_client(coalesce=True, coalesce_window=0.2)
+
+
+def _snapshot_responder(request, context):
+    variables = request.json().get('variables', {})
+    if 'snapshot_id' in variables:
+        return {"data": {"polarisSnapshot": {"snappableId": variables['snapshot_id']}}}
+    return {"data": {"b{}_polarisSnapshot".format(name.rsplit('_', 1)[1]): {"snappableId": value}
+                     for name, value in variables.items()}}
+
+
+def _run_concurrently(targets):
+    results = [None] * len(targets)
+    barrier = threading.Barrier(len(targets))
+
+    def run(i):
+        barrier.wait()
+        results[i] = targets[i]()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(targets))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_query_when_concurrent_callers_overlap(monkeypatch, requests_mock, coalescing_client):
+    """ Test case scenario when identical queries are shared and distinct ones are batched """
+    import rubrik_polaris.common.connection as connection
+
+    held, released = threading.Event(), threading.Event()
+    query_direct = connection._query_direct
+
+    def hold(client, query_name, variables, timeout):
+        held.set()
+        released.wait(5)
+        return query_direct(client, query_name, variables, timeout)
+    monkeypatch.setattr(connection, "_query_direct", hold)
+    requests_mock.post(BASE_URL + "/graphql", json=_snapshot_responder)
+    coalescing_client.prepare_headers()
+    # A query kept in flight makes the callers below wait for the window
+    holder = threading.Thread(target=coalescing_client._query,
+                              args=("core_snappable_snapshot", {"snapshot_id": "held"}))
+    holder.start()
+    held.wait(5)
+    ids = ["a", "b", "a", "c", "b", "a"]
+
+    results = _run_concurrently([
+        lambda snapshot_id=snapshot_id: coalescing_client._query("core_snappable_snapshot",
+                                                                 {"snapshot_id": snapshot_id})
+        for snapshot_id in ids
+    ])
+    released.set()
+    holder.join()
+
+    assert results == [{"snappableId": snapshot_id} for snapshot_id in ids]
+    assert results[0] is not results[2]
+    graphql_requests = [r.json() for r in _graphql_requests(requests_mock)]
+    assert sorted(sorted(r['variables'].values()) for r in graphql_requests) == [["a", "b", "c"], ["held"]]
+
+
+def test_query_when_caller_is_alone(requests_mock, make_client):
+    """ Test case scenario when a single caller doesn't wait for the window """
+    from time import monotonic
+
+    client = make_client(coalesce=True, coalesce_window=5)
+    requests_mock.post(BASE_URL + "/graphql", json=_snapshot_responder)
+    client.prepare_headers()
+
+    started = monotonic()
+    assert client._query("core_snappable_snapshot", {"snapshot_id": "a"}) == {"snappableId": "a"}
+    assert client._query("core_snappable_snapshot", {"snapshot_id": "b"}) == {"snappableId": "b"}
+    assert monotonic() - started < 1
+
+
+def test_query_when_dispatch_is_interrupted(monkeypatch, coalescing_client):
+    """ Test case scenario when the waiters of an interrupted request are handed the interruption """
+    import rubrik_polaris.common.connection as connection
+
+    arrived, interrupted = threading.Event(), threading.Event()
+    waiter_errors = []
+
+    def query_direct(client, query_name, variables, timeout):
+        arrived.wait(5)
+        interrupted.set()
+        raise KeyboardInterrupt()
+    monkeypatch.setattr(connection, "_query_direct", query_direct)
+
+    def wait():
+        try:
+            coalescing_client._query("core_snappable_snapshot", {"snapshot_id": "a"})
+        except BaseException as e:
+            waiter_errors.append(e)
+
+    def lead():
+        with pytest.raises(KeyboardInterrupt):
+            coalescing_client._query("core_snappable_snapshot", {"snapshot_id": "a"})
+    leader = threading.Thread(target=lead)
+    leader.start()
+    while not coalescing_client._coalescer._in_flight:
+        pass
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    while coalescing_client._coalescer._callers < 2:
+        pass
+    arrived.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert not waiter.is_alive()
+    assert len(waiter_errors) == 1 and isinstance(waiter_errors[0], KeyboardInterrupt)
+    assert coalescing_client._coalescer._in_flight == {} and coalescing_client._coalescer._pending == {}
+
+
+def test_query_when_coalescing_is_disabled(requests_mock, client):
+    """ Test case scenario when each caller sends its own request """
+    requests_mock.post(BASE_URL + "/graphql", json=_snapshot_responder)
+    client.prepare_headers()
+
+    results = _run_concurrently([
+        lambda: client._query("core_snappable_snapshot", {"snapshot_id": "a"}) for _ in range(3)
+    ])
+
+    assert results == [{"snappableId": "a"}] * 3
+    assert len([r for r in requests_mock.request_history if r.url.endswith("/graphql")]) == 3
+
+
+def test_query_when_mutation_is_coalesced(coalescing_client):
+    """ Test case scenario when mutations bypass the coalescer """
+    assert coalescing_client._coalescer.accepts("core_snappable_snapshot")
+    assert not coalescing_client._coalescer.accepts("core_snappable_on_demand")
@@ -12,17 +12,26 @@ def util_load_json(path: str) -> dict:
         return json.loads(f.read())
 
 
+def _graphql_requests(requests_mock):
+    """Return the requests sent to the GraphQL endpoint."""
+    return [r for r in requests_mock.request_history if r.url.endswith("/graphql")]
+
+
 @pytest.fixture()
-def client(requests_mock):
+def make_client(requests_mock):
     data = {
         "access_token": "dummy",
         "mfa_token": "dummy_token"
     }
     requests_mock.post(BASE_URL + "/session", json=data)
-    client_obj = PolarisClient(
-        domain="rubrik-se-beta",
-        username="dummy_username",
-        password="dummy_password",
-        insecure=True
-    )
-    return client_obj
+
+    def _make_client(**kwargs):
+        arguments = dict(domain="rubrik-se-beta", username="dummy_username", password="dummy_password", insecure=True)
+        arguments.update(kwargs)
+        return PolarisClient(**arguments)
+    return _make_client
+
+
+@pytest.fixture()
+def client(make_client):
+    return make_client()
@@ -26,3 +26,287 @@ def test_query_raw_when_valid_values_are_provided(requests_mock, client):
     response = _query_raw(client, raw_query=raw_query, operation_name=None, variables={}, timeout=60)
 
     assert response == expected_response
+
+
+def test_query_raw_and_authentication_share_the_pooled_session(requests_mock, client):
+    """ Test case scenario when token and GraphQL requests go through the client session """
+    from rubrik_polaris.common.connection import _query_raw
+
+    expected_response = util_load_json(
+        os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_data/query_result.json")
+    )
+    requests_mock.post(BASE_URL + "/graphql", json=expected_response)
+
+    sent = []
+    original_send = client._session.send
+
+    def _send(request, **kwargs):
+        sent.append(request.url)
+        return original_send(request, **kwargs)
+
+    client._session.send = _send
+    _query_raw(client, raw_query=None, operation_name=None, variables={}, timeout=60)
+    _query_raw(client, raw_query=None, operation_name=None, variables={}, timeout=60)
+
+    assert sent == [BASE_URL + "/session", BASE_URL + "/graphql", BASE_URL + "/graphql"]
+
+
+def test_build_session_when_pool_options_are_provided(make_client):
+    """ Test case scenario when pool size and retry options are provided """
+    client = make_client(pool_size=32, max_retries=5, keep_alive=False, retry_policy=None)
+    adapter = client._session.get_adapter(BASE_URL)
+
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.connect == 5
+    assert client._session.headers['Connection'] == 'close'
+
+
+def test_build_session_when_retry_policy_is_active(make_client):
+    """ Test case scenario when connection errors are only retried by the retry policy """
+    client = make_client(max_retries=5)
+
+    assert client._retry_policy.max_attempts == 6
+    assert client._session.get_adapter(BASE_URL).max_retries.total == 0
+
+
+def test_get_connection_stats_counts_reused_connections():
+    """ Test case scenario when several requests are sent to the same host """
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from rubrik_polaris.rubrik_polaris import PolarisClient
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with PolarisClient(domain="rubrik-se-beta", username="dummy_username", password="dummy_password") as client:
+            assert client.get_connection_stats() == {'requests': 0, 'connections': 0, 'reused': 0}
+            for _ in range(3):
+                client._session.get("http://127.0.0.1:{}/".format(server.server_port), timeout=5)
+            assert client.get_connection_stats() == {'requests': 3, 'connections': 1, 'reused': 2}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _report_page(fids, end_cursor, has_next_page):
+    return {"data": {"snappableConnection": {
+        "edges": [{"node": {"fid": fid}} for fid in fids],
+        "pageInfo": {"endCursor": end_cursor, "hasNextPage": has_next_page}
+    }}}
+
+
+def test_query_paginated_when_prefetch_is_enabled(requests_mock, client):
+    """ Test case scenario when pages are fetched ahead by the background worker """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': _report_page(["a", "b"], "c1", True)},
+        {'json': _report_page(["c"], "c2", True)},
+        {'json': _report_page(["d"], None, False)},
+    ])
+
+    nodes = list(client._query_paginated("core_report_data", {"first": 2}, prefetch=2))
+
+    assert [node['fid'] for node in nodes] == ["a", "b", "c", "d"]
+    afters = [r.json().get('variables', {}).get('after') for r in requests_mock.request_history
+              if r.url.endswith("/graphql")]
+    assert afters == [None, "c1", "c2"]
+    stats = client.get_pagination_stats()
+    assert stats['pages'] == 3
+    assert stats['consumer_stalls'] >= 1
+
+
+def test_query_paginated_when_prefetch_fails(requests_mock, client):
+    """ Test case scenario when the background worker gets an error """
+    from rubrik_polaris.exceptions import RequestException
+
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': _report_page(["a"], "c1", True)},
+        {'status_code': 500, 'json': {"code": 500, "message": "boom"}},
+    ])
+
+    nodes = client._query_paginated("core_report_data", {"first": 1}, prefetch=1)
+
+    assert next(nodes)['fid'] == "a"
+    with pytest.raises(RequestException):
+        next(nodes)
+
+
+def test_query_paginated_when_prefetch_queue_is_full(requests_mock, client):
+    """ Test case scenario when the caller reads slower than the pages arrive """
+    import time
+
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': _report_page(["a"], "c1", True)},
+        {'json': _report_page(["b"], "c2", True)},
+        {'json': _report_page(["c"], None, False)},
+    ])
+
+    fids = []
+    for node in client._query_paginated("core_report_data", {"first": 1}, prefetch=1):
+        time.sleep(0.3)
+        fids.append(node['fid'])
+
+    assert fids == ["a", "b", "c"]
+    assert client.get_pagination_stats()['producer_stalls'] >= 1
+
+
+def test_query_paginated_when_stream_is_enabled(requests_mock, client):
+    """ Test case scenario when pages are decoded incrementally """
+    pytest.importorskip("ijson")
+
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': _report_page(["a", "b"], "c1", True)},
+        {'json': _report_page(["c"], None, False)},
+    ])
+
+    nodes = client._query_paginated("core_report_data", {"first": 2}, stream=True)
+
+    assert [node['fid'] for node in nodes] == ["a", "b", "c"]
+    assert requests_mock.request_history[-1].json()['variables']['after'] == "c1"
+
+
+def test_query_raw_stream_when_nodes_are_read(requests_mock, client):
+    """ Test case scenario when nodes are returned before the whole body is decoded """
+    pytest.importorskip("ijson")
+    from rubrik_polaris.common.connection import _query_raw_stream
+
+    page = _report_page(["a", "b"], "c1", False)
+    page['data']['snappableConnection']['edges'][0]['node']['activityConnection'] = {"nodes": [{"id": 1.5}]}
+    requests_mock.post(BASE_URL + "/graphql", json=page)
+
+    stream = _query_raw_stream(client, "query", "op", {}, 60)
+
+    assert next(stream) == {"fid": "a", "activityConnection": {"nodes": [{"id": 1.5}]}}
+    assert next(stream) == {"fid": "b"}
+    with pytest.raises(StopIteration) as e:
+        next(stream)
+    assert e.value.value == {"endCursor": "c1", "hasNextPage": False}
+
+
+def test_query_raw_stream_when_errors_are_returned(requests_mock, client):
+    """ Test case scenario when the streamed response contains GraphQL errors """
+    pytest.importorskip("ijson")
+    from rubrik_polaris.common.connection import _query_raw_stream
+    from rubrik_polaris.exceptions import RequestException
+
+    requests_mock.post(BASE_URL + "/graphql", json={
+        "errors": [{"message": "denied", "extensions": {"code": 403, "trace": {"traceId": "abc"}}}],
+        "data": None
+    })
+
+    with pytest.raises(RequestException) as e:
+        list(_query_raw_stream(client, "query", "op", {}, 60))
+    assert "denied" in str(e.value)
+
+
+def test_query_paginated_when_prefetch_and_stream_are_provided(client):
+    """ Test case scenario when incompatible pagination options are provided """
+    with pytest.raises(ValueError) as e:
+        list(client._query_paginated("core_report_data", {"first": 1}, prefetch=1, stream=True))
+    assert str(e.value) == ERROR_MESSAGES['PREFETCH_AND_STREAM']
+
+
+def test_get_report_data_when_prefetch_and_max_workers_are_provided(client):
+    """ Test case scenario when a parallel sweep is requested along with prefetching """
+    from rubrik_polaris.common.core import ERROR_MESSAGES as CORE_ERROR_MESSAGES
+
+    with pytest.raises(ValueError) as e:
+        client.get_report_data(cluster_ids=["c1", "c2"], prefetch=2, max_workers=2)
+    assert str(e.value) == CORE_ERROR_MESSAGES['PREFETCH_AND_MAX_WORKERS']
+
+
+def _partitioned_report_responder(pages):
+    """ Serve the pages of each cluster, keyed by (cluster id, after cursor) """
+    def responder(request, context):
+        variables = request.json()['variables']
+        cluster_id = variables['filter']['cluster']['id'][0]
+        fids, end_cursor = pages[(cluster_id, variables.get('after'))]
+        return _report_page(fids, end_cursor, end_cursor is not None)
+    return responder
+
+
+PARTITIONED_PAGES = {
+    ("c1", None): (["a1", "a3"], "n1"),
+    ("c1", "n1"): (["a5"], None),
+    ("c2", None): (["a2"], "n2"),
+    ("c2", "n2"): (["a4", "a6"], None),
+}
+
+
+def test_get_report_data_when_partitioned_by_cluster(requests_mock, client):
+    """ Test case scenario when the cursor chain of each cluster is walked concurrently """
+    requests_mock.post(BASE_URL + "/graphql", json=_partitioned_report_responder(PARTITIONED_PAGES))
+    client.prepare_headers()
+
+    nodes = list(client.get_report_data(object_type=["VmwareVirtualMachine"], cluster_ids=["c1", "c2"],
+                                        max_workers=2))
+
+    assert sorted(node['fid'] for node in nodes) == ["a1", "a2", "a3", "a4", "a5", "a6"]
+    filters = [r.json()['variables']['filter'] for r in requests_mock.request_history if r.url.endswith("/graphql")]
+    assert len(filters) == 4
+    assert all(f['objectType'] == ["VmwareVirtualMachine"] for f in filters)
+
+
+@pytest.mark.parametrize("order_by, expected", [
+    ("partition", ["a1", "a3", "a5", "a2", "a4", "a6"]),
+    (lambda node: node['fid'], ["a1", "a2", "a3", "a4", "a5", "a6"]),
+])
+def test_query_paginated_partitioned_when_ordered(requests_mock, client, order_by, expected):
+    """ Test case scenario when the partitions are returned in order or merged by key """
+    requests_mock.post(BASE_URL + "/graphql", json=_partitioned_report_responder(PARTITIONED_PAGES))
+    client.prepare_headers()
+    partitions = [{"filter": {"cluster": {"id": [cluster_id]}}} for cluster_id in ["c1", "c2"]]
+
+    nodes = client._query_paginated_partitioned("core_report_data", {"first": 2}, partitions, max_workers=1,
+                                                order_by=order_by)
+
+    assert [node['fid'] for node in nodes] == expected
+
+
+def test_query_paginated_partitioned_when_partition_fails(requests_mock, client):
+    """ Test case scenario when the error of a partition is raised to the reader """
+    from rubrik_polaris.exceptions import RequestException
+
+    pages = dict(PARTITIONED_PAGES)
+    del pages[("c2", "n2")]
+    requests_mock.post(BASE_URL + "/graphql", json=_partitioned_report_responder(pages))
+    client.prepare_headers()
+    partitions = [{"filter": {"cluster": {"id": [cluster_id]}}} for cluster_id in ["c1", "c2"]]
+
+    with pytest.raises(RequestException):
+        list(client._query_paginated_partitioned("core_report_data", {"first": 2}, partitions))
+
+
+def test_query_paginated_partitioned_when_reader_is_slow(requests_mock, client):
+    """ Test case scenario when the partitions waiting for their turn buffer a bounded number of entries """
+    import time
+
+    pages = dict(PARTITIONED_PAGES)
+    pages[("c2", None)] = (["b0"], "n0")
+    for i in range(10):
+        pages[("c2", "n{}".format(i))] = (["b{}".format(i + 1)], "n{}".format(i + 1) if i < 9 else None)
+    requests_mock.post(BASE_URL + "/graphql", json=_partitioned_report_responder(pages))
+    client.prepare_headers()
+    partitions = [{"filter": {"cluster": {"id": [cluster_id]}}} for cluster_id in ["c1", "c2"]]
+
+    nodes = client._query_paginated_partitioned("core_report_data", {"first": 1}, partitions, max_workers=2,
+                                                order_by="partition", buffer_size=1)
+    assert next(nodes)['fid'] == "a1"
+    time.sleep(0.3)
+    nodes.close()
+
+    c2_requests = [r for r in requests_mock.request_history
+                   if r.url.endswith("/graphql") and r.json()['variables']['filter']['cluster']['id'] == ["c2"]]
+    assert len(c2_requests) <= 3
@@ -70,3 +70,114 @@ def test_search_object_when_invalid_values_are_provided(client, first, severity,
         list_event_series(client, first=first, severity=severity, sort_order=sort_order)
     assert str(e.value) == error
 
+
+
+def test_get_task_statuses_when_tasks_are_batched(requests_mock, client):
+    """
+    Tests get_task_statuses method of PolarisClient when several tasks are resolved with aliased fields
+    """
+    responses = [
+        {'json': {"data": {
+            "b0_getKorgTaskchainStatus": {"taskchain": {"id": 1, "state": "RUNNING", "taskchainUuid": "a"}},
+            "b1_getKorgTaskchainStatus": None
+        }, "errors": [{"message": "not found", "path": ["b1_getKorgTaskchainStatus"],
+                       "extensions": {"code": 404, "trace": {}}}]}},
+        {'json': {"data": {
+            "b0_getKorgTaskchainStatus": {"taskchain": {"id": 3, "state": "SUCCEEDED", "taskchainUuid": "c"}}
+        }}},
+    ]
+    requests_mock.post(BASE_URL + "/graphql", responses)
+
+    response = client.get_task_statuses(["a", "b", "a", "c"], chunk_size=2)
+
+    assert response == {
+        "a": {"id": 1, "state": "RUNNING", "taskchainUuid": "a"},
+        "b": "FAILED",
+        "c": {"id": 3, "state": "SUCCEEDED", "taskchainUuid": "c"},
+    }
+    graphql_requests = [r for r in requests_mock.request_history if r.url.endswith("/graphql")]
+    first_request = graphql_requests[0].json()
+    assert first_request['variables'] == {"filter_0": "a", "filter_1": "b"}
+    assert first_request['operationName'] == "SdkPythonCoreTaskchainStatusBatch"
+    assert "b1_getKorgTaskchainStatus : getKorgTaskchainStatus ( taskchainId : $filter_1 )" in first_request['query']
+    assert "($filter_0 : String !, $filter_1 : String !)" in first_request['query']
+    assert len(graphql_requests) == 2
+
+
+def test_get_task_statuses_when_status_is_not_known_yet(requests_mock, client):
+    """
+    Tests get_task_statuses method of PolarisClient when Polaris has no status for a queued task yet
+    """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': {"data": {"b0_getKorgTaskchainStatus": None, "b1_getKorgTaskchainStatus": {"taskchain": None}}}},
+        {'json': {"data": {
+            "b0_getKorgTaskchainStatus": {"taskchain": {"state": "SUCCEEDED", "taskchainUuid": "a"}},
+            "b1_getKorgTaskchainStatus": {"taskchain": {"state": "SUCCEEDED", "taskchainUuid": "b"}},
+        }}},
+    ])
+
+    assert client.get_task_statuses(["a", "b"]) == {"a": None, "b": None}
+    tasks = list(client.monitor_tasks(["a", "b"], poll_interval=0.01))
+    assert [task['status'] for task in tasks] == ["SUCCEEDED", "SUCCEEDED"]
+
+
+def _event_series_page(series, end_cursor=None):
+    return {"data": {"activitySeriesConnection": {
+        "edges": [{"node": {"activitySeriesId": series_id, "lastUpdated": last_updated}}
+                  for series_id, last_updated in series],
+        "pageInfo": {"endCursor": end_cursor, "hasNextPage": end_cursor is not None, "hasPreviousPage": False}
+    }}}
+
+
+def test_sync_event_series_when_series_overlap_the_previous_sync(requests_mock, client, tmp_path):
+    """
+    Tests sync_event_series method of PolarisClient when the previous sync window is requested again
+    """
+    import json
+
+    state_path = str(tmp_path / "events.json")
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': _event_series_page([("a", "2021-10-17T12:00:00.000Z"), ("b", "2021-10-17T12:05:00.000Z")], "c1")},
+        {'json': _event_series_page([("c", "2021-10-17T12:10:00.000Z")])},
+        {'json': _event_series_page([("c", "2021-10-17T12:10:00.000Z"), ("b", "2021-10-17T12:10:30.000Z"),
+                                     ("d", "2021-10-17T12:11:00.000Z")])},
+    ])
+
+    first_sync = client.sync_event_series(state_path, first=2)
+    second_sync = client.sync_event_series(state_path, first=2)
+
+    assert [s['activitySeriesId'] for s in first_sync] == ["a", "b", "c"]
+    assert [(s['activitySeriesId'], s['lastUpdated']) for s in second_sync] == [
+        ("b", "2021-10-17T12:10:30.000Z"), ("d", "2021-10-17T12:11:00.000Z")]
+    graphql_requests = [r.json() for r in requests_mock.request_history if r.url.endswith("/graphql")]
+    assert "lastUpdatedTimeGt" not in graphql_requests[0]['variables']['filters']
+    assert graphql_requests[2]['variables']['filters']['lastUpdatedTimeGt'] == "2021-10-17T12:09:00.000Z"
+    assert graphql_requests[2]['variables']['sortOrder'] == "Asc"
+    with open(state_path) as f:
+        state = json.load(f)
+    assert state == {"last_updated": "2021-10-17T12:11:00.000Z", "seen": [
+        ["b", "2021-10-17T12:10:30.000Z"], ["c", "2021-10-17T12:10:00.000Z"], ["d", "2021-10-17T12:11:00.000Z"]]}
+
+
+def test_sync_event_series_when_sync_fails_midway(requests_mock, client, tmp_path):
+    """
+    Tests sync_event_series method of PolarisClient when a page fails after some series were retrieved
+    """
+    import os
+    from rubrik_polaris.exceptions import RequestException
+
+    state_path = str(tmp_path / "events.json")
+    first_page = {'json': _event_series_page([("a", "2021-10-17T12:00:00.000Z"),
+                                              ("b", "2021-10-17T12:05:00.000Z")], "c1")}
+    requests_mock.post(BASE_URL + "/graphql", [
+        first_page,
+        {'json': {"data": None, "errors": [{"message": "boom", "extensions": {"code": 400, "trace": {}}}]}},
+        first_page,
+        {'json': _event_series_page([("c", "2021-10-17T12:10:00.000Z")])},
+    ])
+
+    with pytest.raises(RequestException):
+        client.sync_event_series(state_path, first=2)
+    assert not os.path.exists(state_path)
+
+    assert [s['activitySeriesId'] for s in client.sync_event_series(state_path, first=2)] == ["a", "b", "c"]
@@ -0,0 +1,96 @@
+import pytest
+
+from conftest import BASE_URL, _graphql_requests
+from rubrik_polaris.common.filters import ObjectIndex
+
+OBJECTS = [
+    {"id": "i1", "region": "US_EAST_1", "effectiveSlaDomain": {"name": "Gold"}, "tags": [{"key": "env", "value": "prod"}]},
+    {"id": "i2", "region": "US_WEST_2", "effectiveSlaDomain": {"name": "Gold", "id": "gold-id"},
+     "tags": [{"key": "env", "value": "prod"}, {"key": "team", "value": "data"}]},
+    {"id": "i3", "region": "US_EAST_1", "effectiveSlaDomain": None, "tags": []},
+]
+
+
+@pytest.mark.parametrize("match_all, criteria, expected", [
+    (True, {}, ["i1", "i2", "i3"]),
+    (False, {}, []),
+    (True, {"region": "US_EAST_1"}, ["i1", "i3"]),
+    (True, {"effectiveSlaDomain": {"name": "Gold"}}, ["i1"]),
+    (True, {"sla_id": "gold-id", "tags": {"team": "data"}}, ["i2"]),
+    (True, {"tags": {"env": "prod", "team": "data"}}, ["i2"]),
+    (True, {"region": "US_EAST_1", "tags": {"team": "data"}}, []),
+    (False, {"region": "US_EAST_1", "tags": {"team": "data"}}, ["i1", "i2", "i3"]),
+    (False, {"effectiveSlaDomain": None, "unknown": 1}, ["i3"]),
+    (False, {"region": "US_WEST_2", "tags": {"team": "data"}}, ["i2"]),
+])
+def test_object_index_match(match_all, criteria, expected):
+    """ Test case scenario when criteria are answered with set intersections and unions """
+    assert ObjectIndex(OBJECTS).match(criteria, match_all=match_all) == expected
+
+
+def test_get_compute_object_ids_ec2_when_criteria_are_pushed_down(requests_mock, client):
+    """ Test case scenario when Polaris filters the listing and only inexact criteria are matched locally """
+    def responder(request, context):
+        regions = request.json()['variables']['filters']['regionFilter']['regions']
+        return {"data": {"awsNativeEc2Instances": {
+            "edges": [{"node": obj} for obj in OBJECTS if obj['region'] in regions]
+        }}}
+    requests_mock.post(BASE_URL + "/graphql", json=responder)
+
+    assert client.get_compute_object_ids_ec2(region="US_EAST_1", tags={"env": "prod"}) == ["i1"]
+    filters = requests_mock.request_history[-1].json()['variables']['filters']
+    assert filters == {
+        "regionFilter": {"regions": ["US_EAST_1"]},
+        "tagFilter": {"tagFilterParams": [{"filterType": "TAG_KEY_VALUE", "tagKey": "env", "tagValue": "prod"}]},
+    }
+
+
+def test_get_compute_object_ids_ec2_when_any_criterion_matches(requests_mock, client):
+    """ Test case scenario when criteria are matched locally on the whole listing """
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"awsNativeEc2Instances": {
+        "edges": [{"node": obj} for obj in OBJECTS]
+    }}})
+
+    assert client.get_compute_object_ids_ec2(match_all=False, region="US_WEST_2", sla_id="gold-id") == ["i2"]
+    assert client.get_compute_object_ids_ec2(match_all=False, region="US_EAST_1", tags={"env": "prod"}) == \
+        ["i1", "i2", "i3"]
+    assert "variables" not in requests_mock.request_history[-1].json()
+
+
+def test_get_compute_object_ids_vsphere_when_valid_values_are_provided(requests_mock, client):
+    """ Test case scenario when vSphere VMs are matched with the shared filter engine """
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"vSphereVmNewConnection": {
+        "edges": [{"node": {"id": "vm1", "name": "web", "isRelic": False}},
+                  {"node": {"id": "vm2", "name": "db", "isRelic": True}}]
+    }}})
+
+    assert client.get_compute_object_ids_vsphere(isRelic=True) == ["vm2"]
+    assert client.get_compute_object_ids_vsphere(match_all=False, name="web", isRelic=True) == ["vm1", "vm2"]
+
+
+def test_get_compute_object_ids_ec2_when_index_is_not_cached(requests_mock, client):
+    """ Test case scenario when each lookup lists the objects again by default """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': {"data": {"awsNativeEc2Instances": {"edges": [{"node": obj} for obj in OBJECTS]}}}},
+        {'json': {"data": {"awsNativeEc2Instances": {"edges": [{"node": obj} for obj in OBJECTS[:1]]}}}},
+    ])
+
+    assert client.get_compute_object_ids_ec2(match_all=False, region="US_WEST_2") == ["i2"]
+    assert client.get_compute_object_ids_ec2(match_all=False, region="US_WEST_2") == []
+    assert len(_graphql_requests(requests_mock)) == 2
+
+
+def test_get_compute_object_ids_ec2_when_index_is_reused(requests_mock, make_client):
+    """ Test case scenario when consecutive lookups match the same cached index """
+    client = make_client(object_index_ttl=60)
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"awsNativeEc2Instances": {
+        "edges": [{"node": obj} for obj in OBJECTS]
+    }}})
+
+    assert client.get_compute_object_ids_ec2(match_all=False, region="US_WEST_2") == ["i2"]
+    assert client.get_compute_object_ids_ec2(match_all=False, tags={"env": "prod"}) == ["i1", "i2"]
+    assert len(_graphql_requests(requests_mock)) == 1
+
+    client.invalidate_inventory("aws_ec2")
+    client.get_compute_object_ids_ec2(match_all=False, region="US_WEST_2")
+    assert len(_graphql_requests(requests_mock)) == 2
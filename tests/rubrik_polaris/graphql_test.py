@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from conftest import util_load_json, BASE_URL, _graphql_requests
+
+
+def _enum_response(file_name):
+    return util_load_json(os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_data", file_name))
+
+
+def test_get_enum_values_when_values_are_cached(requests_mock, client):
+    """ Test case scenario when the same enum is retrieved several times """
+    requests_mock.post(BASE_URL + "/graphql", json=_enum_response("sort_order_values.json"))
+
+    assert client.get_enum_values("SortOrder") == ["ASC", "DESC"]
+    assert client.get_enum_values("SortOrder") == ["ASC", "DESC"]
+    assert client.check_enum(value="ASC", field_name="sort_order", enum_name="SortOrder") == "ASC"
+
+    assert len(_graphql_requests(requests_mock)) == 1
+
+
+def test_get_enum_values_when_cache_is_expired_or_invalidated(requests_mock, client, monkeypatch):
+    """ Test case scenario when cached values expire or are invalidated """
+    import rubrik_polaris.common.graphql as graphql
+
+    requests_mock.post(BASE_URL + "/graphql", json=_enum_response("sort_order_values.json"))
+    monkeypatch.setattr(graphql, "monotonic", lambda: 1000)
+
+    client.get_enum_values("SortOrder")
+    monkeypatch.setattr(graphql, "monotonic", lambda: 1000 + graphql.DEFAULT_ENUM_CACHE_TTL)
+    client.get_enum_values("SortOrder")
+    assert len(_graphql_requests(requests_mock)) == 2
+
+    client.invalidate_enum_cache("SortOrder")
+    client.get_enum_values("SortOrder")
+    assert len(_graphql_requests(requests_mock)) == 3
+
+    client.invalidate_enum_cache()
+    assert client._enum_cache == {}
+
+
+def test_get_enum_values_when_cache_is_disabled(requests_mock, client):
+    """ Test case scenario when enum_cache_ttl is 0 """
+    requests_mock.post(BASE_URL + "/graphql", json=_enum_response("sort_order_values.json"))
+    client._kwargs['enum_cache_ttl'] = 0
+
+    client.get_enum_values("SortOrder")
+    client.get_enum_values("SortOrder")
+
+    assert len(_graphql_requests(requests_mock)) == 2
+
+
+def test_warm_enum_cache_when_schema_is_introspected(requests_mock, client):
+    """ Test case scenario when every enum is retrieved in one request """
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"__schema": {"types": [
+        {"name": "SortOrder", "kind": "ENUM", "enumValues": [{"name": "ASC"}, {"name": "DESC"}]},
+        {"name": "EventSeverity", "kind": "ENUM", "enumValues": [{"name": "Critical"}]},
+        {"name": "Query", "kind": "OBJECT", "enumValues": None},
+    ]}}})
+
+    assert client.warm_enum_cache() == 2
+    assert client.get_enum_values("SortOrder") == ["ASC", "DESC"]
+    assert client.get_enum_values("EventSeverity") == ["Critical"]
+    assert len(_graphql_requests(requests_mock)) == 1
+
+
+def test_build_graphql_maps_when_several_clients_are_created(monkeypatch, make_client):
+    """ Test case scenario when the GraphQL files are parsed once per process """
+    import rubrik_polaris.common.graphql as graphql
+
+    first = make_client()
+    monkeypatch.setattr(graphql, "_read_graphql_files", lambda self: pytest.fail("GraphQL files read again"))
+    second = make_client()
+
+    assert second._graphql_query_map is first._graphql_query_map
+    assert 'core_taskchain_status' in second._graphql_query_map
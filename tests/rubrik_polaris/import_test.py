@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+CLOUD_SDK_PACKAGES = {'boto3', 'botocore', 'google', 'googleapiclient', 'oauth2client', 'httplib2', 'aiohttp', 'ijson'}
+
+# Generous ceiling on the import time of the SDK's own modules (third party packages excluded),
+# it only catches regressions such as an expensive module level import or computation.
+SDK_IMPORT_BUDGET_US = 250000
+
+
+def _import_times(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def test_import_when_client_is_created():
+    """ Test case scenario when the package is imported and a client is created """
+    times = _import_times(
+        "from rubrik_polaris.rubrik_polaris import PolarisClient; "
+        "PolarisClient(domain='rubrik-se-beta', username='dummy_username', password='dummy_password')"
+    )
+
+    assert 'rubrik_polaris.rubrik_polaris' in times
+    loaded_sdks = {name.split('.')[0] for name in times} & CLOUD_SDK_PACKAGES
+    assert not loaded_sdks
+    assert sum(us for name, us in times.items() if name.startswith('rubrik_polaris')) < SDK_IMPORT_BUDGET_US
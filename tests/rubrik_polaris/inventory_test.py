@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import BASE_URL, _graphql_requests
+
+INSTANCES = [
+    {"id": "i1", "region": "US_EAST_1", "instanceName": "web", "tags": [{"key": "env", "value": "prod"}]},
+    {"id": "i2", "region": "US_WEST_2", "instanceName": "db", "tags": [{"key": "env", "value": "prod"},
+                                                                     {"key": "team", "value": "data"}]},
+    {"id": "i3", "region": "US_EAST_1", "instanceName": "batch", "tags": []},
+]
+
+
+def _ec2_page(instances):
+    return {"data": {"awsNativeEc2Instances": {"edges": [{"node": instance} for instance in instances]}}}
+
+
+@pytest.fixture()
+def inventory_client(make_client):
+    return make_client(inventory_path=":memory:")
+
+
+@pytest.mark.parametrize("match_all, criteria, expected", [
+    (True, {"region": "US_EAST_1"}, ["i1", "i3"]),
+    (True, {"region": "US_EAST_1", "tags": {"env": "prod"}}, ["i1"]),
+    (True, {"tags": {"env": "prod", "team": "data"}}, ["i2"]),
+    (False, {"instanceName": "batch", "tags": {"team": "data"}}, ["i2", "i3"]),
+    (False, {"instanceName": "db", "tags": {"team": "data"}}, ["i2"]),
+    (True, {"region": "EU_WEST_1"}, []),
+])
+def test_get_compute_object_ids_ec2_when_inventory_is_enabled(requests_mock, inventory_client, match_all, criteria,
+                                                             expected):
+    """ Test case scenario when object ids are matched against the local inventory """
+    requests_mock.post(BASE_URL + "/graphql", json=_ec2_page(INSTANCES))
+
+    assert inventory_client.get_compute_object_ids_ec2(match_all=match_all, **criteria) == expected
+    assert inventory_client.get_compute_object_ids_ec2(match_all=match_all, **criteria) == expected
+    assert len(_graphql_requests(requests_mock)) == 1
+
+
+def test_get_compute_object_ids_ec2_when_inventory_is_invalidated(requests_mock, inventory_client):
+    """ Test case scenario when a stale inventory is listed again """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': _ec2_page(INSTANCES)},
+        {'json': _ec2_page(INSTANCES[1:] + [{"id": "i4", "region": "US_EAST_1", "tags": []}])},
+    ])
+
+    assert inventory_client.get_compute_object_ids_ec2(region="US_EAST_1") == ["i1", "i3"]
+    inventory_client.invalidate_inventory("aws_ec2")
+    assert inventory_client.get_compute_object_ids_ec2(region="US_EAST_1") == ["i3", "i4"]
+    assert len(_graphql_requests(requests_mock)) == 2
+
+
+def test_inventory_store_when_objects_change():
+    """ Test case scenario when only the changed objects are written """
+    from rubrik_polaris.common.inventory import InventoryStore
+
+    store = InventoryStore(ttl=0)
+    assert store.refresh("aws_ebs", INSTANCES) == 3
+    assert store.refresh("aws_ebs", INSTANCES) == 0
+    assert store.refresh("aws_ebs", [dict(INSTANCES[0], region="EU_WEST_1")] + INSTANCES[1:2]) == 2
+    assert store.find("aws_ebs", {"region": "EU_WEST_1"}) == ["i1"]
+    assert not store.is_fresh("aws_ebs")
+    store.close()
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from rubrik_polaris.exceptions import PolarisException
+
+
+def _fake_task_statuses(polls_until_done, state="SUCCEEDED"):
+    """ Return a get_task_statuses replacement that completes each task after the given number of polls """
+    polls = {}
+    requests = []
+    lock = threading.Lock()
+
+    def get_task_statuses(task_chain_ids, chunk_size=100):
+        statuses = {}
+        with lock:
+            requests.append(list(task_chain_ids))
+            for task_chain_id in task_chain_ids:
+                polls[task_chain_id] = polls.get(task_chain_id, 0) + 1
+                done = polls[task_chain_id] >= polls_until_done[task_chain_id]
+                statuses[task_chain_id] = {"state": state if done else "RUNNING", "taskchainUuid": task_chain_id}
+        return statuses
+
+    get_task_statuses.polls = polls
+    get_task_statuses.requests = requests
+    return get_task_statuses
+
+
+def test_monitor_tasks_when_tasks_complete_out_of_order(client, monkeypatch):
+    """ Test case scenario when tasks are returned as soon as they complete """
+    fake = _fake_task_statuses({"slow": 4, "fast": 1, "medium": 2})
+    monkeypatch.setattr(client, "get_task_statuses", fake)
+    completed = []
+
+    tasks = list(client.monitor_tasks([{"taskchainUuid": "slow"}, "fast", {"jobId": "medium"}],
+                                      callback=completed.append, poll_interval=0.01, max_poll_interval=0.02))
+
+    assert [task["taskchainUuid"] for task in tasks] == ["fast", "medium", "slow"]
+    assert completed == tasks
+    assert all(task["status"] == "SUCCEEDED" and task["elapsed"] >= 0 for task in tasks)
+    assert fake.polls == {"slow": 4, "fast": 1, "medium": 2}
+    assert fake.requests[0] == ["slow", "fast", "medium"]
+
+
+def test_monitor_tasks_when_many_tasks_are_monitored(client, monkeypatch):
+    """ Test case scenario when the tasks due together are resolved in a few bounded batches """
+    active = []
+    peak = []
+    batches = []
+    lock = threading.Lock()
+
+    def get_task_statuses(task_chain_ids, chunk_size=100):
+        with lock:
+            active.append(task_chain_ids)
+            peak.append(len(active))
+            batches.append(len(task_chain_ids))
+        with lock:
+            active.remove(task_chain_ids)
+        return {task_chain_id: "FAILED" for task_chain_id in task_chain_ids}
+
+    monkeypatch.setattr(client, "get_task_statuses", get_task_statuses)
+    threads_before = threading.active_count()
+
+    tasks = list(client.monitor_tasks([str(i) for i in range(1000)], max_workers=4, poll_interval=0.01,
+                                      batch_size=250))
+
+    assert len(tasks) == 1000
+    assert all(task["status"] == "FAILED" for task in tasks)
+    assert batches == [250, 250, 250, 250]
+    assert max(peak) <= 4
+    assert threading.active_count() == threads_before
+
+
+def test_monitor_task_when_single_or_several_tasks_are_provided(client, monkeypatch):
+    """ Test case scenario when _monitor_task keeps its return shape and the order of the tasks """
+    monkeypatch.setattr(client, "get_task_statuses", _fake_task_statuses({"a": 1, "b": 1}))
+
+    assert client._monitor_task({"taskchainUuid": "a"})["status"] == "SUCCEEDED"
+    assert [task["taskchainUuid"] for task in client._monitor_task(["b", "a"])] == ["b", "a"]
+
+
+def test_monitor_tasks_when_status_request_fails(client, monkeypatch):
+    """ Test case scenario when the status of a task can't be retrieved """
+    def get_task_statuses(task_chain_ids, chunk_size=100):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(client, "get_task_statuses", get_task_statuses)
+
+    with pytest.raises(PolarisException) as e:
+        list(client.monitor_tasks(["a", "b"]))
+    assert str(e.value) == "Failed to get status of tasks a, b"
+
+
+def test_monitor_task_when_no_task_is_given(client, monkeypatch):
+    """ Test case scenario when there is nothing to monitor """
+    monkeypatch.setattr(client, "get_task_statuses", _fake_task_statuses({}))
+
+    assert client._monitor_task([]) == []
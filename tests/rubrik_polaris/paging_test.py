@@ -0,0 +1,70 @@
+import pytest
+import requests
+
+from conftest import BASE_URL
+from rubrik_polaris.common.paging import PageSizeController
+from rubrik_polaris.exceptions import RequestException
+
+
+@pytest.fixture()
+def adaptive_client(make_client):
+    return make_client(adaptive_page_size=True, max_page_size=4000, retry_policy=None)
+
+
+def _page(fid, has_next_page):
+    return {'json': {"data": {"snappableConnection": {
+        "edges": [{"cursor": fid, "node": {"fid": fid}}],
+        "pageInfo": {"endCursor": fid, "hasNextPage": has_next_page}}}}}
+
+
+def _page_sizes(requests_mock):
+    return [r.json()['variables']['first'] for r in requests_mock.request_history if r.url.endswith("/graphql")]
+
+
+def test_page_size_controller_when_pages_are_observed():
+    """ Test case scenario when fast pages grow the size and slow or large ones shrink it """
+    controller = PageSizeController(min_size=10, max_size=1000, target_latency=2.0, target_bytes=1000)
+
+    assert controller.observe("q", 100, 0.1, 100) == 200
+    assert controller.observe("q", 200, 1.5, 100) == 200
+    assert controller.observe("q", 200, 8.0, 100) == 50
+    assert controller.observe("q", 50, 0.1, 5000) == 10
+    assert controller.observe("q", 800, 0.1, 100) == 1000
+    assert controller.sizes() == {"q": 1000}
+    assert controller.start("q", 20) == 1000
+    assert controller.shrink("q", 1000) == 500
+    assert controller.shrink("q", 10) is None
+
+
+def test_get_report_data_when_pages_are_fast(requests_mock, adaptive_client):
+    """ Test case scenario when the page size doubles and is kept for the next call """
+    requests_mock.post(BASE_URL + "/graphql", [_page("a", True), _page("b", True), _page("c", False),
+                                               _page("d", False)])
+
+    assert [entry['fid'] for entry in adaptive_client.get_report_data()] == ["a", "b", "c"]
+    assert adaptive_client.get_page_sizes() == {"core_report_data": 4000}
+    list(adaptive_client.get_report_data())
+    assert _page_sizes(requests_mock) == [1000, 2000, 4000, 4000]
+
+
+@pytest.mark.parametrize("failure", [
+    {'status_code': 503, 'text': "Service Unavailable"},
+    {'exc': requests.exceptions.ReadTimeout},
+])
+def test_get_report_data_when_page_fails(requests_mock, adaptive_client, failure):
+    """ Test case scenario when a page that failed on the server is requested again with a smaller size """
+    requests_mock.post(BASE_URL + "/graphql", [failure, _page("a", False)])
+
+    assert [entry['fid'] for entry in adaptive_client.get_report_data()] == ["a"]
+    assert _page_sizes(requests_mock) == [1000, 500]
+
+
+def test_get_report_data_when_page_is_rejected(requests_mock, adaptive_client):
+    """ Test case scenario when a client error isn't retried """
+    requests_mock.post(BASE_URL + "/graphql", status_code=400, json={"data": None, "errors": [
+        {"message": "bad filter", "extensions": {"code": 400, "trace": {}}}
+    ]})
+
+    with pytest.raises(RequestException):
+        list(adaptive_client.get_report_data())
+    assert _page_sizes(requests_mock) == [1000]
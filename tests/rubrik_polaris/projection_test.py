@@ -0,0 +1,95 @@
+import pytest
+
+from conftest import BASE_URL, _graphql_requests
+from rubrik_polaris.common.projection import _project_query
+
+QUERY = """
+query Op($first: Int, $after: String, $sla: String) {
+  objects(first: $first, after: $after) {
+    edges {
+      cursor
+      node {
+        id
+        name
+        tags(key: $sla) { key value }
+        sla { ...SlaFragment }
+        owner { ...OwnerFragment }
+      }
+    }
+    pageInfo { endCursor hasNextPage }
+  }
+}
+
+fragment SlaFragment on SlaDomain {
+  id
+  name
+  ... on ClusterSlaDomain { fid __typename }
+}
+
+fragment OwnerFragment on User {
+  id
+  email
+}
+"""
+
+
+def test_project_query_when_nested_fields_are_selected():
+    """ Test case scenario when fragments are narrowed and unused variables and fragments are dropped """
+    projected = _project_query(QUERY, ("id", "sla.fid"))
+
+    assert projected.startswith("query Op ($first : Int, $after : String) {")
+    assert "edges { cursor node { id sla { ... on SlaDomain { ... on ClusterSlaDomain { fid __typename } } } } }" \
+        in projected
+    assert "pageInfo { endCursor hasNextPage }" in projected
+    assert "fragment" not in projected and "$sla" not in projected
+
+
+def test_project_query_when_field_is_selected_whole():
+    """ Test case scenario when the fragment of a field selected as a whole is kept """
+    projected = _project_query(QUERY, ("owner",))
+
+    assert "node { owner { ... OwnerFragment } }" in projected
+    assert "fragment OwnerFragment on User { id email }" in projected
+    assert "SlaFragment" not in projected
+
+
+def test_project_query_when_field_is_not_selected():
+    """ Test case scenario when the projection asks for a field the query doesn't select """
+    with pytest.raises(ValueError) as e:
+        _project_query(QUERY, ("id", "owner.phone"))
+    assert "owner.phone" in str(e.value)
+
+
+def test_get_report_data_when_ids_only_profile_is_used(requests_mock, client):
+    """ Test case scenario when only the ids of the report entries are requested across pages """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': {"data": {"snappableConnection": {
+            "edges": [{"cursor": "c1", "node": {"fid": "a"}}],
+            "pageInfo": {"endCursor": "c1", "hasNextPage": True}}}}},
+        {'json': {"data": {"snappableConnection": {
+            "edges": [{"cursor": "c2", "node": {"fid": "b"}}],
+            "pageInfo": {"endCursor": "c2", "hasNextPage": False}}}}},
+    ])
+
+    assert list(client.get_report_data(fields="ids-only")) == [{"fid": "a"}, {"fid": "b"}]
+    requests = [r.json() for r in _graphql_requests(requests_mock)]
+    assert "node { fid }" in requests[0]['query'] and "protectionStatus" not in requests[0]['query']
+    assert requests[1]['variables']['after'] == "c1"
+
+
+def test_get_event_series_list_when_profile_is_unknown(client):
+    """ Test case scenario when the projection profile doesn't exist """
+    with pytest.raises(ValueError) as e:
+        client.get_event_series_list(fields="everything")
+    assert "ids-only" in str(e.value)
+
+
+def test_get_compute_object_ids_ec2_when_all_criteria_are_pushed_down(requests_mock, client):
+    """ Test case scenario when the lookup only lists the ids of the filtered objects """
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"awsNativeEc2Instances": {
+        "edges": [{"node": {"id": "i1"}}, {"node": {"id": "i2"}}]
+    }}})
+
+    assert client.get_compute_object_ids_ec2(region="US_EAST_1") == ["i1", "i2"]
+    query = _graphql_requests(requests_mock)[-1].json()['query']
+    assert "node { id }" in query and "instanceName" not in query
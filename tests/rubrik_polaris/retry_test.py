@@ -0,0 +1,137 @@
+import pytest
+import requests
+
+from conftest import BASE_URL, _graphql_requests
+from rubrik_polaris.common.connection import _query_raw
+from rubrik_polaris.common.retry import RetryPolicy, TokenBucket, _parse_retry_after
+from rubrik_polaris.exceptions import RequestException
+
+QUERY = "query RubrikPolarisSDKRequest { polarisSnapshot { id } }"
+MUTATION = "# comment\nmutation RubrikPolarisSDKRequest { takeOnDemandSnapshot { taskchainUuids } }"
+
+
+@pytest.fixture()
+def retrying_client(make_client):
+    return make_client(retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+
+
+@pytest.mark.parametrize("failure", [
+    {'status_code': 503, 'text': "Service Unavailable"},
+    {'status_code': 429, 'headers': {'Retry-After': "0"}, 'text': "Too Many Requests"},
+    {'exc': requests.exceptions.ConnectionError},
+])
+def test_query_raw_when_query_fails_transiently(requests_mock, retrying_client, failure):
+    """ Test case scenario when a query is sent again after a transient failure """
+    requests_mock.post(BASE_URL + "/graphql", [failure, {'json': {"data": {"polarisSnapshot": {"id": "a"}}}}])
+
+    response = _query_raw(retrying_client, QUERY, None, None, 60)
+
+    assert response == {"data": {"polarisSnapshot": {"id": "a"}}}
+    assert len(_graphql_requests(requests_mock)) == 2
+
+
+def test_query_raw_when_query_keeps_failing(requests_mock, retrying_client):
+    """ Test case scenario when the attempts of the policy run out """
+    requests_mock.post(BASE_URL + "/graphql", status_code=502, text="Bad Gateway")
+
+    with pytest.raises(RequestException):
+        _query_raw(retrying_client, QUERY, None, None, 60)
+    assert len(_graphql_requests(requests_mock)) == 3
+
+
+def test_query_raw_when_mutation_fails(requests_mock, retrying_client):
+    """ Test case scenario when a mutation Polaris may have processed isn't replayed """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'status_code': 429, 'text': "Too Many Requests"},
+        {'status_code': 503, 'text': "Service Unavailable"},
+    ])
+
+    with pytest.raises(RequestException):
+        _query_raw(retrying_client, MUTATION, None, None, 60)
+    assert len(_graphql_requests(requests_mock)) == 2
+
+
+def test_get_report_data_when_page_fails(requests_mock, retrying_client):
+    """ Test case scenario when the error of a failed page carries the cursor to resume from """
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'json': {"data": {"snappableConnection": {
+            "edges": [{"cursor": "c1", "node": {"fid": "a"}}],
+            "pageInfo": {"endCursor": "c1", "hasNextPage": True}}}}},
+        {'status_code': 400, 'json': {"data": None, "errors": [
+            {"message": "bad cursor", "extensions": {"code": 400, "trace": {}}}]}},
+    ])
+
+    entries = []
+    with pytest.raises(RequestException) as e:
+        for entry in retrying_client.get_report_data():
+            entries.append(entry)
+    assert entries == [{"fid": "a"}]
+    assert e.value.cursor == "c1"
+
+
+def test_retry_policy_delay_when_attempts_are_retried():
+    """ Test case scenario when delays are jittered, follow Retry-After and are capped """
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+    response = requests.Response()
+
+    assert 1 <= policy.delay(None) <= 3
+    assert 1 <= policy.delay(2) <= 6
+    assert policy.delay(20) <= 10
+    response.headers['Retry-After'] = "7"
+    assert policy.delay(None, response) == 7
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert _parse_retry_after("soon") is None
+
+
+def test_token_bucket_when_burst_is_exceeded(monkeypatch):
+    """ Test case scenario when requests wait for the bucket to refill """
+    waits = []
+    monkeypatch.setattr("rubrik_polaris.common.retry.sleep", waits.append)
+    monkeypatch.setattr("rubrik_polaris.common.retry.monotonic", lambda: 100.0)
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    assert waits == [0.5, 1.0]
+
+
+def _stream_page(fids, end_cursor):
+    return {'json': {"data": {"snappableConnection": {
+        "edges": [{"cursor": fid, "node": {"fid": fid}} for fid in fids],
+        "pageInfo": {"endCursor": end_cursor, "hasNextPage": end_cursor is not None}}}}}
+
+
+def test_query_paginated_when_streamed_page_fails_transiently(requests_mock, retrying_client):
+    """ Test case scenario when a streamed page is retried and re-authenticated before its body is read """
+    pytest.importorskip("ijson")
+    retrying_client.prepare_headers()
+    requests_mock.post(BASE_URL + "/graphql", [
+        _stream_page(["a"], "c1"),
+        {'status_code': 503, 'text': "Service Unavailable"},
+        {'status_code': 401, 'text': "Unauthorized"},
+        _stream_page(["b"], None),
+    ])
+
+    entries = list(retrying_client._query_paginated("core_report_data", {"first": 1}, stream=True))
+
+    assert entries == [{"fid": "a"}, {"fid": "b"}]
+    assert len(_graphql_requests(requests_mock)) == 4
+    assert len([r for r in requests_mock.request_history if r.url.endswith("/session")]) == 2
+
+
+def test_query_paginated_when_streamed_page_fails(requests_mock, retrying_client):
+    """ Test case scenario when the error of a failed streamed page carries the cursor to resume from """
+    pytest.importorskip("ijson")
+    requests_mock.post(BASE_URL + "/graphql", [
+        _stream_page(["a"], "c1"),
+        {'status_code': 502, 'text': "Bad Gateway"},
+    ])
+
+    entries = []
+    with pytest.raises(RequestException) as e:
+        for entry in retrying_client._query_paginated("core_report_data", {"first": 1}, stream=True):
+            entries.append(entry)
+    assert entries == [{"fid": "a"}]
+    assert e.value.cursor == "c1"
+    assert len(_graphql_requests(requests_mock)) == 4
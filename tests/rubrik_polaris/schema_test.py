@@ -0,0 +1,162 @@
+import os
+
+import pytest
+
+from conftest import BASE_URL
+
+SDL = '''
+"Sort order"
+enum SortOrder {
+    "The items are sorted in ascending order."
+    ASC
+    DESC
+    OLD @deprecated(reason: "Use ASC instead.")
+}
+
+input SnappableFilterInput {
+    """
+    Filter by name.
+    """
+    name: String = "default"
+    objectType: [HierarchyObjectTypeEnum!]
+}
+
+type Query implements Node & Other @key(fields: "id") {
+    snappableConnection(
+        "Cursor"
+        after: String,
+        filter: SnappableFilterInput = {name: "x", objectType: [VmwareVm]}
+    ): SnappableConnection! @deprecated(reason: "Use (this) instead.")
+    ids: [[UUID!]!]
+}
+
+scalar UUID
+union Result = A | B
+'''
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "schema.graphql")
+
+
+@pytest.fixture(autouse=True)
+def clear_index_memo():
+    from rubrik_polaris.common import schema
+    schema._index_memo.clear()
+    yield
+    schema._index_memo.clear()
+
+
+def test_parse_schema_when_sdl_is_provided():
+    """ Test case scenario when enums, input types and types are parsed """
+    from rubrik_polaris.common.schema import parse_schema
+
+    index = parse_schema(SDL)
+
+    assert index['enums'] == {'SortOrder': ['ASC', 'DESC']}
+    assert index['inputs'] == {'SnappableFilterInput': {'name': 'String', 'objectType': '[HierarchyObjectTypeEnum!]'}}
+    assert index['types'] == {'Query': {'snappableConnection': 'SnappableConnection!', 'ids': '[[UUID!]!]'}}
+
+
+def test_parse_schema_when_repository_schema_is_provided():
+    """ Test case scenario when the bundled schema.graphql is parsed """
+    from rubrik_polaris.common.schema import parse_schema
+
+    if not os.path.exists(SCHEMA_PATH):
+        pytest.skip("schema.graphql not available")
+    with open(SCHEMA_PATH) as f:
+        index = parse_schema(f.read())
+
+    assert index['enums']['SortOrder'] == ['ASC', 'DESC']
+    assert index['inputs']['AwsNativeEc2InstanceFilters']['regionFilter'] == 'AwsNativeRegionFilter'
+    assert index['types']['Query']['activitySeriesConnection'] == 'ActivitySeriesConnection!'
+
+
+def test_load_schema_index_when_index_is_cached(tmp_path, monkeypatch):
+    """ Test case scenario when the parsed index is reused from the cache directory """
+    from rubrik_polaris.common import schema
+
+    schema_path = tmp_path / "schema.graphql"
+    schema_path.write_text(SDL)
+    cache_dir = tmp_path / "cache"
+
+    index = schema.load_schema_index(str(schema_path), str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 1
+
+    schema._index_memo.clear()
+    monkeypatch.setattr(schema, "parse_schema", lambda text: pytest.fail("schema parsed again"))
+    assert schema.load_schema_index(str(schema_path), str(cache_dir)) == index
+
+
+def test_load_schema_index_when_prebuilt_index_is_provided(tmp_path):
+    """ Test case scenario when the index was built ahead of time """
+    from rubrik_polaris.common.schema import build_schema_index, load_schema_index
+
+    schema_path = tmp_path / "schema.graphql"
+    schema_path.write_text(SDL)
+    index_path = tmp_path / "schema-index.json"
+
+    index = build_schema_index(str(schema_path), str(index_path))
+
+    assert load_schema_index(str(index_path)) == index
+
+
+def test_load_schema_index_when_stored_index_is_not_trusted(tmp_path, monkeypatch):
+    """ Test case scenario when a cached file isn't a JSON index and a provided one has no format header """
+    import pickle
+    from rubrik_polaris.common import schema
+
+    schema_path = tmp_path / "schema.graphql"
+    schema_path.write_text(SDL)
+    cache_dir = tmp_path / "cache"
+    schema.load_schema_index(str(schema_path), str(cache_dir))
+    cache_path = next(cache_dir.iterdir())
+    cache_path.write_bytes(pickle.dumps({"enums": {"SortOrder": ["INJECTED"]}, "inputs": {}, "types": {}}))
+    schema._index_memo.clear()
+
+    assert schema.load_schema_index(str(schema_path), str(cache_dir))['enums']['SortOrder'] == ['ASC', 'DESC']
+
+    index_path = tmp_path / "index.json"
+    index_path.write_text('{"enums": {}, "inputs": {}, "types": {}}')
+    with pytest.raises(ValueError):
+        schema.load_schema_index(str(index_path))
+
+
+def test_check_enum_when_offline_schema_is_configured(requests_mock, client, tmp_path):
+    """ Test case scenario when enums are validated without introspection requests """
+    schema_path = tmp_path / "schema.graphql"
+    schema_path.write_text(SDL)
+    client._kwargs['schema_path'] = str(schema_path)
+    client._kwargs['schema_cache_dir'] = str(tmp_path / "cache")
+
+    assert client.check_enum(value="ASC", field_name="sort_order", enum_name="SortOrder") == "ASC"
+    assert client.get_enum_values("SortOrder") == ["ASC", "DESC"]
+    assert not [r for r in requests_mock.request_history if r.url.endswith("/graphql")]
+
+
+def test_check_enum_when_offline_schema_is_outdated(requests_mock, client, tmp_path):
+    """ Test case scenario when a value unknown to the offline schema is checked against Polaris """
+    schema_path = tmp_path / "schema.graphql"
+    schema_path.write_text(SDL)
+    client._kwargs['schema_path'] = str(schema_path)
+    client._kwargs['schema_cache_dir'] = str(tmp_path / "cache")
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"__type": {"states": [
+        {"name": "ASC"}, {"name": "DESC"}, {"name": "RANDOM"}
+    ]}}})
+
+    assert client.check_enum(value=["RANDOM"], field_name="sort_order", enum_name="SortOrder") == ["RANDOM"]
+    with pytest.raises(ValueError):
+        client.check_enum(value="UNKNOWN", field_name="sort_order", enum_name="SortOrder")
+    assert len([r for r in requests_mock.request_history if r.url.endswith("/graphql")]) == 1
+
+
+def test_get_enum_values_when_offline_schema_lacks_checked_value(requests_mock, client, tmp_path):
+    """ Test case scenario when a direct caller checks a value unknown to the offline schema """
+    schema_path = tmp_path / "schema.graphql"
+    schema_path.write_text(SDL)
+    client._kwargs['schema_path'] = str(schema_path)
+    client._kwargs['schema_cache_dir'] = str(tmp_path / "cache")
+    requests_mock.post(BASE_URL + "/graphql", json={"data": {"__type": {"states": [{"name": "Asc"}, {"name": "Desc"}]}}})
+
+    assert client.get_enum_values("SortOrder", values=["ASC"]) == ["ASC", "DESC"]
+    assert not [r for r in requests_mock.request_history if r.url.endswith("/graphql")]
+    assert client.get_enum_values("SortOrder", values=["Asc"]) == ["Asc", "Desc"]
+    assert len([r for r in requests_mock.request_history if r.url.endswith("/graphql")]) == 1
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import BASE_URL
+
+WORKERS = 64
+
+
+def _responder(request, context):
+    body = request.json()
+    if "azureNativeVirtualMachines" in body['query']:
+        name = "azureNativeVirtualMachines"
+    elif "gcpNativeGceInstances" in body['query']:
+        name = "gcpNativeGceInstances"
+    else:
+        name = "awsNativeEc2Instance"
+        return {"data": {name: {"id": body['variables']['object_id']}}}
+    return {"data": {name: {"edges": [{"node": {"id": name}}]}}}
+
+
+def test_client_when_shared_by_worker_pool(requests_mock, client):
+    """ Test case scenario when concurrent calls of different methods share one client and its authentication """
+    requests_mock.post(BASE_URL + "/graphql", json=_responder)
+    calls = [
+        (lambda i: client.get_compute_azure(), lambda i: [{"id": "azureNativeVirtualMachines"}]),
+        (lambda i: client.get_compute_gce(), lambda i: [{"id": "gcpNativeGceInstances"}]),
+        (lambda i: client.get_compute_ec2(object_id="i-{}".format(i)), lambda i: {"id": "i-{}".format(i)}),
+    ]
+
+    def run(i):
+        call, expected = calls[i % len(calls)]
+        return call(i) == expected(i)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(executor.map(run, range(WORKERS * 4)))
+
+    assert all(results)
+    assert len([r for r in requests_mock.request_history if r.url.endswith("/session")]) == 1
+    assert not hasattr(client, 'query_name')
+
+
+def test_validate_when_called_concurrently(client):
+    """ Test case scenario when each validation returns its own context """
+    names = ["compute_azure_iaas", "compute_gcp_gce", "compute_aws_ec2", "core_snappable_snapshot"]
+
+    def run(i):
+        context = client._validate(query_name=names[i % len(names)])
+        return context.query_name == names[i % len(names)]
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        assert all(executor.map(run, range(WORKERS * 4)))
+
+
+def test_prepare_headers_when_headers_are_modified(client):
+    """ Test case scenario when the headers of a request don't leak into the next one """
+    headers = client.prepare_headers()
+    headers['Authorization'] = "Bearer tampered"
+    headers['X-Extra'] = "1"
+
+    assert client.prepare_headers() == {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json',
+        'Authorization': 'Bearer dummy'
+    }
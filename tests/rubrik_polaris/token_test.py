@@ -0,0 +1,111 @@
+import base64
+import json
+import os
+import stat
+import threading
+from time import sleep, time
+
+import pytest
+
+from conftest import BASE_URL, _graphql_requests
+from rubrik_polaris.common.token import TokenManager, _decode_expiry
+from rubrik_polaris.exceptions import AuthenticationException
+
+
+def _jwt(expires_at, subject="user"):
+    def encode(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+    return "{}.{}.signature".format(encode({"alg": "HS256"}), encode({"sub": subject, "exp": expires_at}))
+
+
+def _session_requests(requests_mock):
+    return [r for r in requests_mock.request_history if r.url.endswith("/session")]
+
+
+def test_decode_expiry_when_token_is_jwt_or_opaque():
+    """ Test case scenario when the expiry is read from the `exp` claim """
+    assert _decode_expiry(_jwt(1700000000)) == 1700000000
+    assert _decode_expiry("dummy") is None
+    assert _decode_expiry(None) is None
+
+
+def test_prepare_headers_when_threads_authenticate_concurrently(requests_mock, client):
+    """ Test case scenario when concurrent first requests fetch a single token """
+    barrier = threading.Barrier(8)
+    headers = []
+
+    def run():
+        barrier.wait()
+        headers.append(dict(client.prepare_headers()))
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [h['Authorization'] for h in headers] == ["Bearer dummy"] * 8
+    assert len(_session_requests(requests_mock)) == 1
+
+
+def test_query_when_token_is_rejected(requests_mock, client):
+    """ Test case scenario when a request rejected with a 401 is sent once more with a new token """
+    requests_mock.post(BASE_URL + "/session", [{'json': {"access_token": "first"}},
+                                               {'json': {"access_token": "second"}}])
+    requests_mock.post(BASE_URL + "/graphql", [
+        {'status_code': 401, 'json': {"code": 401, "message": "UNAUTHENTICATED"}},
+        {'json': {"data": {"polarisSnapshot": {"snappableId": "a"}}}},
+    ])
+
+    assert client._query("core_snappable_snapshot", {"snapshot_id": "a"}) == {"snappableId": "a"}
+    assert [r.headers['Authorization'] for r in _graphql_requests(requests_mock)] == ["Bearer first", "Bearer second"]
+
+
+def test_prepare_headers_when_credentials_are_missing(requests_mock, client):
+    """ Test case scenario when no credentials are left to request an access token with """
+    client._password = None
+
+    with pytest.raises(AuthenticationException) as e:
+        client.prepare_headers()
+    assert "credentials are missing" in str(e.value)
+    assert _session_requests(requests_mock) == []
+
+
+def test_prepare_headers_when_token_is_about_to_expire(requests_mock, make_client):
+    """ Test case scenario when the token is refreshed in the background and expired ones synchronously """
+    expiring, renewed = _jwt(time() + 120, "expiring"), _jwt(time() + 3600, "renewed")
+    requests_mock.post(BASE_URL + "/session", [{'json': {"access_token": expiring}},
+                                               {'json': {"access_token": renewed}}])
+    client = make_client()
+
+    assert client.prepare_headers()['Authorization'] == "Bearer " + expiring
+    assert client.prepare_headers()['Authorization'] == "Bearer " + expiring
+    for _ in range(100):
+        if client._token_manager.get() == renewed:
+            break
+        sleep(0.01)
+    assert client.prepare_headers()['Authorization'] == "Bearer " + renewed
+    assert len(_session_requests(requests_mock)) == 2
+
+    manager = TokenManager(iter([_jwt(time() + 10), "fresh"]).__next__)
+    assert manager.get() != "fresh"
+    assert manager.get() == "fresh"
+
+
+def test_prepare_headers_when_token_cache_is_shared(requests_mock, make_client, tmp_path):
+    """ Test case scenario when a second client reuses the token cached by the first one """
+    token = _jwt(time() + 3600)
+    requests_mock.post(BASE_URL + "/session", json={"access_token": token})
+    cache_path = str(tmp_path / "tokens.json")
+
+    first = make_client(token_cache=cache_path)
+    second = make_client(token_cache=cache_path)
+
+    assert first.prepare_headers()['Authorization'] == "Bearer " + token
+    assert second.prepare_headers()['Authorization'] == "Bearer " + token
+    assert len(_session_requests(requests_mock)) == 1
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+    second._token_manager.invalidate(token)
+    with open(cache_path) as f:
+        assert json.load(f) == {}
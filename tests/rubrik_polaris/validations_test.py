@@ -0,0 +1,109 @@
+import pytest
+
+from conftest import BASE_URL
+from rubrik_polaris.exceptions import ValidationException
+
+ACCOUNT_DETAIL = {"awsCloudAccounts": [
+    {"awsCloudAccount": {"nativeId": "111111111111", "id": "polaris-1", "accountName": "prod"},
+     "featureDetails": [{"feature": "CLOUD_NATIVE_PROTECTION", "status": "CONNECTED", "awsRegions": ["US_EAST_1"]}]},
+]}
+SNAPSHOT = {"snappableId": "ec2-1", "isCorrupted": False, "isDeletedFromSource": False, "isExpired": False}
+ENUMS = {"AwsNativeRegion": ["US_EAST_1", "US_WEST_2"], "AwsNativeEc2InstanceType": ["T2_MICRO", "M5_LARGE"]}
+VPCS = [{"id": "vpc-1", "name": "main", "securityGroups": [{"id": "sg-1", "name": "default"}],
+         "subnets": [{"id": "subnet-1", "name": "a", "availabilityZone": "us-east-1a"}]}]
+
+
+@pytest.fixture()
+def lookups(monkeypatch, client):
+    calls = []
+
+    def record(name, result):
+        def lookup(*args, **kwargs):
+            calls.append(name)
+            return result(*args, **kwargs) if callable(result) else result
+        return lookup
+
+    def query(query_name, variables=None, **kwargs):
+        calls.append(query_name)
+        return VPCS
+
+    monkeypatch.setattr(client, "get_accounts_aws_detail", record("accounts", ACCOUNT_DETAIL))
+    monkeypatch.setattr(client, "_get_snapshot", record("snapshot", SNAPSHOT))
+    monkeypatch.setattr(client, "get_compute_ec2", record("ec2", {"instanceName": "web", "instanceType": "T2_MICRO"}))
+    monkeypatch.setattr(client, "get_enum_values", record("enum", lambda name=None, offline=True, values=None: ENUMS[name]))
+    monkeypatch.setattr(client, "_query", query)
+    return calls
+
+
+def _validate_export(client, **kwargs):
+    arguments = dict(mutation_name="compute_export_ec2", aws_account_number="111111111111", aws_region="US_EAST_1",
+                     aws_vpc="vpc-1", aws_subnet="subnet-1", aws_security_group=["sg-1"], snapshot_id="snap-1",
+                     aws_instance_name=None, aws_instance_type=None, copy_tags=True, use_replica=False)
+    arguments.update(kwargs)
+    return client._validate(**arguments)
+
+
+def test_validate_when_export_needs_remote_facts(client, lookups):
+    """ Test case scenario when each remote fact of an export is fetched once """
+    context = _validate_export(client)
+
+    assert context.aws_instance_name == "web"
+    assert context.aws_instance_type == "T2_MICRO"
+    assert context.aws_vpcs["vpc-1"]["subnets"] == {"subnet-1": {"name": "a", "availability_zone": "us-east-1a"}}
+    assert sorted(lookups) == ["accounts", "compute_aws_region_vpcs", "ec2", "enum", "enum", "snapshot"]
+    assert sorted(entry['fact'] for entry in context.facts.loads) == \
+        ["aws_accounts", "aws_vpcs", "ec2_instance", "enum", "enum", "snapshot"]
+    assert all(entry['seconds'] >= 0 for entry in context.facts.loads)
+
+
+def test_validate_when_instance_is_specified(client, lookups):
+    """ Test case scenario when the instance details aren't needed """
+    context = _validate_export(client, aws_instance_name="db", aws_instance_type="M5_LARGE")
+
+    assert (context.aws_instance_name, context.aws_instance_type) == ("db", "M5_LARGE")
+    assert "ec2" not in lookups
+
+
+def test_validate_when_facts_are_shared(client, lookups):
+    """ Test case scenario when validations sharing their facts fetch them once """
+    context = _validate_export(client)
+    _validate_export(client, facts=context.facts)
+
+    assert len(lookups) == 6
+    assert len(context.facts.loads) == 6
+
+
+def test_validate_when_fact_lookup_fails(monkeypatch, client, lookups):
+    """ Test case scenario when a failed lookup is reported by its validator and not fetched again """
+    def get_snapshot(snapshot_id):
+        lookups.append("snapshot")
+        raise KeyError(snapshot_id)
+    monkeypatch.setattr(client, "_get_snapshot", get_snapshot)
+
+    with pytest.raises(ValidationException) as e:
+        client._validate(snapshot_id="snap-1", aws_instance_name=None)
+
+    assert "not a valid snapshot_id" in str(e.value)
+    assert lookups.count("snapshot") == 1
+
+
+def test_validate_when_requests_are_traced(requests_mock, client):
+    """ Test case scenario when each GraphQL request sent by a lookup is traced, batched ones once """
+    from rubrik_polaris.common.validations import ValidationFacts
+
+    def responder(request, context):
+        variables = request.json()['variables']
+        return {"data": {"b{}_polarisSnapshot".format(name.rsplit('_', 1)[1]): dict(SNAPSHOT, id=value)
+                         for name, value in variables.items()}}
+    requests_mock.post(BASE_URL + "/graphql", json=responder)
+    client.prepare_headers()
+    facts = ValidationFacts()
+
+    facts.load_many('snapshot', ["s1", "s2", "s3"], client._get_snapshots)
+    context = client._validate(facts=facts, snapshot_id="s2")
+
+    assert context.snapshot_details['id'] == "s2"
+    assert len(context.trace) == 1
+    assert context.trace[0]['fact'] == "snapshot" and context.trace[0]['status'] == 200
+    assert context.trace[0]['operation'].endswith("Batch")
+    assert facts.loads[0]['count'] == 3 and facts.loads[0]['args'] == ()